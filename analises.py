@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# Análises de lead time a partir do log de status (historico_status_tb).
+# O SQL usa LEAD() por pedido para transformar o log em intervalos (entrada/saída de cada status),
+# apoiado no índice (pedido_id, data_mudanca) criado em esquema.py; os percentis são calculados
+# de forma vetorizada no pandas, igual para PostgreSQL e SQLite. Durações são diferenças entre
+# instantes (UTC); o período e a semana vêm do dia de produção já calculado no banco (dia_conclusao).
+PERCENTIS = (0.5, 0.85, 0.95)
+STATUS_EM_MONTAGEM = 3
+STATUS_CONCLUIDO = 4
+
+SQL_TRANSICOES = """
+    SELECT h.pedido_id, h.status_alterado as status_id, h.data_mudanca as entrada,
+           LEAD(h.data_mudanca) OVER (PARTITION BY h.pedido_id ORDER BY h.data_mudanca, h.id) as saida,
+           p.equipamento, p.dia_conclusao
+    FROM historico_status_tb h
+    JOIN pedidos_tb p ON p.id = h.pedido_id
+    WHERE p.status_id = :concluido AND p.dia_conclusao BETWEEN :inicio AND :fim
+"""
+
+
+def carregar_transicoes(conn, inicio, fim):
+    """Intervalos de status dos pedidos concluídos entre os dias de produção inicio e fim (inclusive)."""
+    linhas = conn.execute(text(SQL_TRANSICOES), {"concluido": STATUS_CONCLUIDO, "inicio": inicio, "fim": fim}).all()
+    df = pd.DataFrame(linhas, columns=['pedido_id', 'status_id', 'entrada', 'saida', 'equipamento', 'dia_conclusao'])
+    for coluna in ('entrada', 'saida'):
+        df[coluna] = pd.to_datetime(df[coluna], utc=True, format='ISO8601')
+    df['dia_conclusao'] = pd.to_datetime(df['dia_conclusao'])
+    return df
+
+
+def _resumo(horas):
+    horas = horas.dropna()
+    if horas.empty:
+        return {"n": 0, "media": None, **{f"p{int(q * 100)}": None for q in PERCENTIS}}
+    valores = np.quantile(horas.to_numpy(dtype=float), PERCENTIS)
+    resumo = {"n": int(horas.size), "media": round(float(horas.mean()), 1)}
+    resumo.update({f"p{int(q * 100)}": round(float(v), 1) for q, v in zip(PERCENTIS, valores)})
+    return resumo
+
+
+def _por_grupo(df, coluna_grupo, coluna_valor, rotulo):
+    return [{rotulo: chave, **_resumo(grupo[coluna_valor])}
+            for chave, grupo in df.groupby(coluna_grupo, sort=True)]
+
+
+def calcular_lead_time(conn, inicio, fim, nomes_status):
+    """Percentis (em horas) de lead time, espera na fila e tempo em cada status."""
+    df = carregar_transicoes(conn, inicio, fim)
+    if df.empty:
+        return {"pedidos": 0, "lead_time": {}, "espera_fila": {}, "tempo_em_status": []}
+
+    df.sort_values(['pedido_id', 'entrada'], inplace=True, kind='stable')
+    grupos = df.groupby('pedido_id', sort=False)
+    criacao = grupos['entrada'].min()
+    conclusao = df[df['status_id'] == STATUS_CONCLUIDO].groupby('pedido_id')['entrada'].min()
+    montagem = df[df['status_id'] == STATUS_EM_MONTAGEM].groupby('pedido_id')['entrada'].min()
+
+    pedidos = pd.DataFrame({'criacao': criacao, 'conclusao': conclusao, 'montagem': montagem,
+                            'equipamento': grupos['equipamento'].first(), 'dia_conclusao': grupos['dia_conclusao'].first()})
+    pedidos = pedidos.dropna(subset=['conclusao'])
+    pedidos['lead_time_h'] = (pedidos['conclusao'] - pedidos['criacao']).dt.total_seconds() / 3600
+    pedidos['espera_fila_h'] = (pedidos['montagem'] - pedidos['criacao']).dt.total_seconds() / 3600
+    # Semana (segunda-feira) da conclusão e o mesmo critério OP/PV usado no relatório
+    pedidos['semana'] = (pedidos['dia_conclusao'] - pd.to_timedelta(pedidos['dia_conclusao'].dt.weekday, unit='D')).dt.strftime('%Y-%m-%d')
+    pedidos['tipo'] = np.where(pedidos['equipamento'].fillna('').str.contains('teravix', case=False), 'OP', 'PV')
+
+    # Tempo em status: só os intervalos fechados antes da (primeira) conclusão
+    intervalos = df.join(conclusao.rename('fim_pedido'), on='pedido_id')
+    intervalos = intervalos[intervalos['saida'].notna() & (intervalos['entrada'] < intervalos['fim_pedido'])]
+    intervalos = intervalos.assign(
+        horas=(intervalos['saida'] - intervalos['entrada']).dt.total_seconds() / 3600,
+        status=intervalos['status_id'].map(nomes_status).fillna('Desconhecido'),
+    )
+
+    return {
+        "pedidos": int(len(pedidos)),
+        "lead_time": {
+            "geral": _resumo(pedidos['lead_time_h']),
+            "por_semana": _por_grupo(pedidos, 'semana', 'lead_time_h', 'semana'),
+            "por_tipo": _por_grupo(pedidos, 'tipo', 'lead_time_h', 'tipo'),
+        },
+        "espera_fila": {
+            "geral": _resumo(pedidos['espera_fila_h']),
+            "por_semana": _por_grupo(pedidos, 'semana', 'espera_fila_h', 'semana'),
+            "por_tipo": _por_grupo(pedidos, 'tipo', 'espera_fila_h', 'tipo'),
+        },
+        "tempo_em_status": _por_grupo(intervalos, 'status', 'horas', 'status'),
+    }
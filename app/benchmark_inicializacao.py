@@ -0,0 +1,128 @@
+"""Mede a abertura do painel de TV (prioridades.py): imports, primeira pintura e primeiros dados.
+
+Cada medição roda num processo novo (como o painel depois de uma queda de energia), com a
+plataforma Qt "offscreen" por padrão. Os tempos contam a partir do disparo do processo:
+
+  - import_ms: import do prioridades.py
+  - pintura_ms: primeira pintura da janela (snapshot local ou esqueleto vazio)
+  - dados_ms: fim do primeiro ciclo de atualização (dados do banco/servidor na tela, ou erro)
+
+Com --ansioso, o processo importa o painel_dados.py (pandas, NumPy, psycopg2) e espera a
+primeira consulta antes de mostrar a janela, como o painel fazia antes do carregamento adiado.
+
+Uso:
+    python app/benchmark_inicializacao.py --repeticoes 5
+    python app/benchmark_inicializacao.py --servidor http://localhost:5001 --ansioso
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import subprocess
+import statistics
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ETAPAS = ("import_ms", "pintura_ms", "dados_ms")
+
+
+def medir_no_processo(disparo, servidor, linha, ansioso, limite_s):
+    """Roda dentro do processo filho; devolve os tempos (ms desde `disparo`, em time.time())."""
+    def desde_disparo():
+        return round((time.time() - disparo) * 1000, 1)
+
+    sys.path.insert(0, RAIZ)
+    if ansioso:
+        importlib.import_module("painel_dados")
+    import prioridades
+    tempos = {"import_ms": desde_disparo(), "pandas_no_import": "pandas" in sys.modules}
+
+    from PySide6.QtCore import QEvent, QEventLoop, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    class PrimeiraPintura(QObject):
+        def eventFilter(self, objeto, evento):
+            if evento.type() == QEvent.Paint and "pintura_ms" not in tempos:
+                tempos["pintura_ms"] = desde_disparo()
+                terminar_se_pronto()
+            return False
+
+    def terminar_se_pronto():
+        if "pintura_ms" in tempos and "dados_ms" in tempos:
+            app.quit()
+
+    def primeiro_ciclo(ciclo, vm, erro):
+        if "dados_ms" not in tempos:
+            tempos["dados_ms"] = desde_disparo()
+            tempos["erro"] = str(erro).splitlines()[0] if erro else None
+            terminar_se_pronto()
+
+    app = QApplication([sys.argv[0]])
+    janela = prioridades.PainelMtec(prioridades.criar_fonte(servidor, linha))
+    janela.sinais.concluido.connect(primeiro_ciclo)
+    filtro = PrimeiraPintura()
+    janela.installEventFilter(filtro)
+    if ansioso:
+        # Comportamento antigo: a janela só aparece depois da primeira consulta
+        janela.update_timer.stop()
+        espera = QEventLoop()
+        janela.sinais.concluido.connect(espera.quit)
+        janela.atualizar_dados_e_ui()
+        espera.exec()
+    janela.show()
+    QTimer.singleShot(int(limite_s * 1000), app.quit)
+    app.exec()
+    return tempos
+
+
+def medir(args):
+    ambiente = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    comando = [sys.executable, os.path.abspath(__file__), "--filho", "--limite", str(args.limite)]
+    if args.servidor:
+        comando += ["--servidor", args.servidor]
+    if args.linha:
+        comando += ["--linha", args.linha]
+    if args.ansioso:
+        comando.append("--ansioso")
+    resultado = subprocess.run(comando + ["--disparo", repr(time.time())], env=ambiente,
+                               capture_output=True, text=True, timeout=args.limite + 30)
+    if resultado.returncode != 0:
+        raise RuntimeError(f"Processo de medição falhou:\n{resultado.stderr}")
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de abertura do painel de TV")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--servidor", help="URL do servidor_painel.py (sem ela, o painel consulta o banco)")
+    parser.add_argument("--linha", help="Linha de produção do painel")
+    parser.add_argument("--ansioso", action="store_true", help="Imports e primeira consulta antes de mostrar a janela")
+    parser.add_argument("--limite", type=float, default=30.0, help="Segundos máximos por medição")
+    parser.add_argument("--saida", help="Arquivo JSON com os resultados")
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--disparo", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        print(json.dumps(medir_no_processo(args.disparo, args.servidor, args.linha, args.ansioso, args.limite)))
+        return
+
+    execucoes = []
+    for numero in range(1, args.repeticoes + 1):
+        tempos = medir(args)
+        execucoes.append(tempos)
+        print(f"#{numero}  " + "  ".join(f"{etapa} {tempos.get(etapa, '-'):>7}" for etapa in ETAPAS)
+              + (f"  erro: {tempos['erro']}" if tempos.get("erro") else ""))
+    medianas = {etapa: statistics.median(t[etapa] for t in execucoes if etapa in t)
+                for etapa in ETAPAS if any(etapa in t for t in execucoes)}
+    print("mediana  " + "  ".join(f"{etapa} {valor:>7}" for etapa, valor in medianas.items()))
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"data": time.strftime("%Y-%m-%dT%H:%M:%S"), "ansioso": args.ansioso,
+                       "medianas": medianas, "execucoes": execucoes}, f, ensure_ascii=False, indent=2)
+        print(f"\nResultado gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
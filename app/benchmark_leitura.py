@@ -0,0 +1,123 @@
+"""Compara a API síncrona (crud.py) com a assíncrona (api_leitura.py) nas rotas de leitura.
+
+Para cada nível de concorrência, N clientes simultâneos repetem a mesma mistura de leituras
+(listagem, status, imagens, histórico, busca e relatório) contra cada API por --duracao segundos,
+sem pausa entre requisições. Mede vazão e percentis de latência. Para comparar "em um núcleo",
+rode os dois servidores presos a uma CPU (o cliente fica nas outras):
+
+    taskset -c 0 python crud.py
+    taskset -c 0 python api_leitura.py
+    taskset -c 1-3 python app/benchmark_leitura.py --usuario ... --senha ... --concorrencia 1,10,50,100
+
+As duas APIs precisam do mesmo banco: o login é feito no crud.py e a sessão (sessoes_tb) vale para ambas.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from datetime import date
+
+import aiohttp
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from teste_carga import entrar  # noqa: E402
+
+PERCENTIS = (50, 95, 99)
+MISTURA = {"pedidos": 40, "status": 10, "imagem": 10, "historico": 20, "busca": 15, "relatorio": 5}
+
+
+def requisicao(operacao, pedidos):
+    """(método, caminho, corpo JSON) de uma operação de leitura."""
+    pedido = random.choice(pedidos) if pedidos else {"id": 1, "pv": "PV"}
+    hoje = date.today()
+    if operacao == "pedidos":
+        return "GET", "/pedidos?filtro=andamento", None
+    if operacao == "status":
+        return "GET", "/status", None
+    if operacao == "imagem":
+        return "GET", "/imagem", None
+    if operacao == "historico":
+        return "GET", f"/pedidos/{pedido['id']}/historico", None
+    if operacao == "busca":
+        return "GET", f"/api/pedidos/busca?q={(pedido.get('pv') or 'PV')[:4]}&filtro=andamento", None
+    return "POST", "/api/gerar-relatorio", {"start_date": hoje.replace(day=1).isoformat(), "end_date": hoje.isoformat()}
+
+
+async def cliente(sessao, url, pedidos, fim, latencias, falhas):
+    operacoes, pesos = list(MISTURA), list(MISTURA.values())
+    while time.perf_counter() < fim:
+        metodo, caminho, corpo = requisicao(random.choices(operacoes, pesos)[0], pedidos)
+        inicio = time.perf_counter()
+        try:
+            async with sessao.request(metodo, url + caminho, json=corpo) as resposta:
+                await resposta.read()
+                ok = resposta.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            ok = False
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        if not ok:
+            falhas.append(caminho)
+
+
+async def medir(url, cookie, pedidos, concorrencia, duracao):
+    latencias, falhas = [], []
+    conector = aiohttp.TCPConnector(limit=concorrencia)
+    async with aiohttp.ClientSession(headers={"Cookie": cookie}, connector=conector,
+                                     timeout=aiohttp.ClientTimeout(total=60)) as sessao:
+        fim = time.perf_counter() + duracao
+        await asyncio.gather(*(cliente(sessao, url, pedidos, fim, latencias, falhas) for _ in range(concorrencia)))
+    valores = np.asarray(latencias) if latencias else np.zeros(1)
+    resultado = {"n": len(latencias), "por_s": round(len(latencias) / duracao, 1), "falhas": len(falhas)}
+    resultado.update({f"p{p}_ms": round(float(v), 1) for p, v in zip(PERCENTIS, np.percentile(valores, PERCENTIS))})
+    return resultado
+
+
+async def carregar_pedidos(url, cookie):
+    async with aiohttp.ClientSession(headers={"Cookie": cookie}) as sessao:
+        async with sessao.get(url + "/pedidos?filtro=andamento") as resposta:
+            return await resposta.json() if resposta.status == 200 else []
+
+
+async def executar(args, cookie):
+    pedidos = await carregar_pedidos(args.sincrona, cookie)
+    alvos = {"sincrona": args.sincrona, "assincrona": args.assincrona}
+    resultados = []
+    for concorrencia in args.concorrencia:
+        for nome, url in alvos.items():
+            # Aquecimento curto: pool de conexões e caches do banco já prontos na medição
+            await medir(url, cookie, pedidos, concorrencia, min(2.0, args.duracao))
+            resultado = await medir(url, cookie, pedidos, concorrencia, args.duracao)
+            resultado.update(api=nome, concorrencia=concorrencia)
+            resultados.append(resultado)
+            print(f"{nome:<11} {concorrencia:>5} clientes  {resultado['por_s']:>8} req/s  "
+                  f"p50 {resultado['p50_ms']:>7} ms  p95 {resultado['p95_ms']:>7} ms  p99 {resultado['p99_ms']:>7} ms  "
+                  f"falhas {resultado['falhas']}")
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das rotas de leitura: crud.py x api_leitura.py")
+    parser.add_argument("--sincrona", default="http://localhost:5000", help="Endereço do crud.py (também usado no login)")
+    parser.add_argument("--assincrona", default="http://localhost:5002", help="Endereço do api_leitura.py")
+    parser.add_argument("--usuario", default=os.environ.get("CARGA_USUARIO"))
+    parser.add_argument("--senha", default=os.environ.get("CARGA_SENHA"))
+    parser.add_argument("--concorrencia", type=lambda texto: [int(n) for n in texto.split(",")], default=[1, 10, 50])
+    parser.add_argument("--duracao", type=float, default=15.0, help="Segundos medidos por API e nível de concorrência")
+    parser.add_argument("--saida", help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+    if not args.usuario or not args.senha:
+        parser.error("Informe --usuario e --senha (ou CARGA_USUARIO/CARGA_SENHA).")
+
+    resultados = asyncio.run(executar(args, entrar(args.sincrona, args.usuario, args.senha)))
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"data": time.strftime("%Y-%m-%dT%H:%M:%S"), "resultados": resultados}, f, ensure_ascii=False, indent=2)
+        print(f"\nResultado gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Compara a memória do painel: DataFrame com todos os pedidos x armazém compacto (armazem_pedidos.py).
+
+Monta em memória o mesmo resultado que o banco devolveria para N pedidos (padrão 100 mil, poucos
+ativos e o resto concluído/cancelado ao longo de vários anos) e mede com tracemalloc, para cada
+caminho, o que fica residente entre os ciclos e o pico durante a montagem do view-model:
+
+  - atual: consulta com todos os pedidos num DataFrame + montar_view_model(df)
+  - armazém: só ativos + finalizados hoje em registros com __slots__, histórico resumido por dia
+
+Os dois view-models são comparados no fim (devem ser iguais, exceto o campo "linhas").
+
+Uso:
+    python app/benchmark_memoria.py --pedidos 100000 --ativos 1500
+"""
+import os
+import sys
+import json
+import argparse
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import painel_dados  # noqa: E402
+from armazem_pedidos import ArmazemPedidos  # noqa: E402
+from gerar_dados_sinteticos import EQUIPAMENTOS_PV, EQUIPAMENTOS_TERAVIX, SERVICOS  # noqa: E402
+
+NOMES_STATUS = {1: "Aguardando Chegada", 2: "Backlog", 3: "Em Montagem", 4: "Concluído", 5: "Pendente", 6: "Cancelado"}
+IMAGENS = ["Windows 11 Pro", "Windows 10 Pro", "Ubuntu 22.04", "Sem imagem"]
+
+
+def _copia(valor):
+    # O driver cria um objeto por célula (textos e datas); sem a cópia, as linhas compartilhariam objetos
+    if isinstance(valor, str):
+        return valor.encode().decode()
+    if isinstance(valor, (datetime, date)):
+        return valor.replace()
+    return valor
+
+
+def do_driver(linhas, filtro=None):
+    """Cópia das linhas como um fetchall as entregaria, feita dentro da medição."""
+    return [{campo: _copia(valor) for campo, valor in linha.items()} for linha in linhas if filtro is None or filtro(linha)]
+
+
+def gerar_linhas(n, ativos, finalizados_hoje, anos, semente):
+    """Linhas no formato de painel_dados.SQL_PEDIDOS (objetos Python, uma vez; ver do_driver)."""
+    rng = np.random.default_rng(semente)
+    agora = datetime.now(timezone.utc)
+    hoje = datetime.now(painel_dados.TZ).date()
+    status = np.where(rng.random(n) < 0.9, 4, 6)
+    status[:ativos] = rng.choice([1, 2, 3, 5], ativos)
+    # Conclusões espalhadas pelos anos; as de hoje ficam logo depois dos ativos
+    horas_atras = rng.uniform(24, anos * 365 * 24, n)
+    horas_atras[ativos:ativos + finalizados_hoje] = rng.uniform(0, min(8, agora.astimezone(painel_dados.TZ).hour + 0.5), finalizados_hoje)
+    teravix = rng.random(n) < 0.15
+    linhas = []
+    for i in range(n):
+        conclusao = None if status[i] not in (4, 6) else agora - timedelta(hours=float(horas_atras[i]))
+        linhas.append({
+            "id": i + 1, "versao": 1, "status_id": int(status[i]),
+            "equipamento": str(rng.choice(EQUIPAMENTOS_TERAVIX if teravix[i] else EQUIPAMENTOS_PV)),
+            "pv": f"{'OP-' if teravix[i] else 'PV'}{100000 + i}",
+            "descricao_servico": str(rng.choice(SERVICOS)),
+            "nome_status": NOMES_STATUS[int(status[i])],
+            "data_criacao": (conclusao or agora) - timedelta(days=float(rng.uniform(1, 10))),
+            "quantidade": int(rng.geometric(0.45)), "urgente": bool(rng.random() < 0.05), "prioridade": i + 1,
+            "data_conclusao": conclusao,
+            "dia_conclusao": None if conclusao is None else conclusao.astimezone(painel_dados.TZ).date(),
+            "image": str(rng.choice(IMAGENS)),
+        })
+    # Ordem da consulta do painel (urgentes primeiro, depois prioridade)
+    linhas.sort(key=lambda linha: (not linha["urgente"], linha["prioridade"]))
+    return linhas, hoje
+
+
+def historico_do_banco(linhas, hoje):
+    """O que consultar_historico_diario receberia do GROUP BY: (dia, pedidos, quantidade) até ontem."""
+    desde = painel_dados.inicio_historico(hoje)
+    por_dia = {}
+    for linha in linhas:
+        dia = linha["dia_conclusao"]
+        if linha["status_id"] == 4 and dia is not None and desde <= dia < hoje:
+            pedidos, quantidade = por_dia.get(dia, (0, 0))
+            por_dia[dia] = (pedidos + 1, quantidade + linha["quantidade"])
+    return [{"dia": dia, "pedidos": p, "quantidade": q} for dia, (p, q) in por_dia.items()]
+
+
+def medir(montar):
+    """(resultado, bytes residentes depois de montar, pico durante montar + view-model)."""
+    tracemalloc.start()
+    residente, vm = montar()
+    atual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return residente, vm, atual, pico
+
+
+def caminho_atual(linhas):
+    df = pd.DataFrame(do_driver(linhas))
+    return df, painel_dados.montar_view_model(df)
+
+
+def caminho_armazem(linhas, hoje, agregado):
+    armazem = ArmazemPedidos()
+    armazem.atualizar(do_driver(linhas, lambda linha: linha["status_id"] not in (4, 6) or linha["dia_conclusao"] == hoje))
+    historico = pd.DataFrame(agregado, columns=["dia", "pedidos", "quantidade"])
+    historico = historico.set_index(pd.to_datetime(historico.pop("dia")))
+    return (armazem, historico), painel_dados.montar_view_model(armazem.para_dataframe(), historico=historico)
+
+
+def mb(valor):
+    return round(valor / 1024 ** 2, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória do painel: DataFrame completo x armazém compacto")
+    parser.add_argument("--pedidos", type=int, default=100000)
+    parser.add_argument("--ativos", type=int, default=1500, help="Pedidos fora de Concluído/Cancelado")
+    parser.add_argument("--finalizados-hoje", type=int, default=40)
+    parser.add_argument("--anos", type=float, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+
+    linhas, hoje = gerar_linhas(args.pedidos, args.ativos, args.finalizados_hoje, args.anos, args.semente)
+    agregado = historico_do_banco(linhas, hoje)
+    # Calendário e imports do pandas carregados antes das medições
+    painel_dados.montar_view_model(pd.DataFrame(linhas[:10]))
+
+    df, vm_atual, residente_atual, pico_atual = medir(lambda: caminho_atual(linhas))
+    resultados = {"pedidos": args.pedidos, "ativos": args.ativos,
+                  "atual": {"linhas": len(df), "residente_mb": mb(residente_atual), "pico_mb": mb(pico_atual),
+                            "dataframe_mb": mb(df.memory_usage(deep=True).sum())}}
+    del df
+
+    (armazem, historico), vm_armazem, residente, pico = medir(lambda: caminho_armazem(linhas, hoje, agregado))
+    resultados["armazem"] = {"linhas": len(armazem), "dias_historico": len(historico), "residente_mb": mb(residente),
+                             "pico_mb": mb(pico), "registros_mb": mb(armazem.memoria_bytes())}
+    resultados["view_models_iguais"] = all(vm_atual[chave] == vm_armazem[chave] for chave in vm_atual if chave != "linhas")
+
+    for nome in ("atual", "armazem"):
+        r = resultados[nome]
+        print(f"{nome:<8} {r['linhas']:>7} linhas  residente {r['residente_mb']:>7} MB  pico {r['pico_mb']:>7} MB")
+    print(f"DataFrame completo (memory_usage deep): {resultados['atual']['dataframe_mb']} MB; "
+          f"registros do armazém: {resultados['armazem']['registros_mb']} MB")
+    print(f"View-models iguais: {resultados['view_models_iguais']}")
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"\nResultado gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
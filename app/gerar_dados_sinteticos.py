@@ -0,0 +1,227 @@
+"""Gera pedidos sintéticos (com histórico de status) para testes de desempenho.
+
+Preenche o banco de DATABASE_URL (PostgreSQL ou um SQLite local) com pedidos PV e OP TERAVIX
+distribuídos por vários anos, já com o caminho de status de cada um (chegada, fila, montagem,
+pendências, conclusão/cancelamento). Os pedidos gerados ficam marcados em perfil_alteracao e
+podem ser removidos com --limpar.
+
+Uso:
+    python app/gerar_dados_sinteticos.py --pedidos 200000 --anos 3
+    python app/gerar_dados_sinteticos.py --banco sqlite:///dados/sintetico.db --pedidos 20000 --linhas 3
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ORIGEM = "sintetico"
+TAMANHO_LOTE = 10000
+
+EQUIPAMENTOS_PV = ["Notebook Dell Latitude 5440", "Desktop Positivo Master D580", "All-in-One Lenovo M70a",
+                   "Notebook Lenovo ThinkPad E14", "Servidor Dell PowerEdge T150", "Desktop HP ProDesk 400"]
+EQUIPAMENTOS_TERAVIX = ["TERAVIX T100", "TERAVIX T300", "TERAVIX Mini"]
+SERVICOS = ["Montagem", "Montagem + Imagem", "Imagem + Etiqueta", "Upgrade de memória", "Configuração de BIOS"]
+OPERADORES = ["ana", "bruno", "carla", "diego", "elisa", "fabio"]
+
+# Duração de cada etapa em horas (lognormal: mediana, dispersão)
+ETAPAS_H = {
+    "chegada": (24, 0.8),      # Aguardando Chegada -> Backlog
+    "fila": (72, 1.0),         # Backlog -> Em Montagem
+    "pendencia": (48, 0.9),    # Em Montagem -> Pendente -> Em Montagem
+    "montagem": (8, 0.7),      # Em Montagem -> Concluído
+}
+AGUARDANDO, BACKLOG, MONTAGEM, CONCLUIDO, PENDENTE, CANCELADO = 1, 2, 3, 4, 5, 6
+
+
+def _duracao(rng, etapa, n):
+    mediana, sigma = ETAPAS_H[etapa]
+    return rng.lognormal(np.log(mediana), sigma, n)
+
+
+def gerar_criacao(rng, n, anos, agora, crescimento, calendario):
+    """Datas de criação: dias úteis do calendário de produção, com volume crescendo ao longo dos anos."""
+    dias = np.arange(np.datetime64(agora.date(), 'D') - int(365.25 * anos), np.datetime64(agora.date(), 'D') + 1)
+    peso = np.linspace(1.0, 1.0 + crescimento, len(dias))
+    # Fora dos dias úteis ainda entra algum pedido (3% do peso)
+    peso *= np.where(calendario.eh_dia_util(dias), 1.0, 0.03)
+    escolhidos = rng.choice(dias, size=n, p=peso / peso.sum())
+    horas = np.clip(rng.normal(11.5, 2.5, n), 7, 18)
+    locais = pd.to_datetime(escolhidos) + pd.to_timedelta(horas, unit='h')
+    criacao = pd.DatetimeIndex(locais).tz_localize('America/Sao_Paulo')
+    # Pedidos "de hoje" sorteados para depois de agora entram agora
+    return criacao.where(criacao <= agora, agora)
+
+
+def gerar_pedidos(rng, n, primeiro_id, anos, agora, args, linhas, imagens, calendario):
+    ids = np.arange(primeiro_id, primeiro_id + n)
+    criacao = gerar_criacao(rng, n, anos, agora, args.crescimento, calendario)
+    teravix = rng.random(n) < args.teravix
+    numero = rng.integers(100000, 999999, n)
+
+    pedidos = pd.DataFrame({
+        "id": ids,
+        "pv": np.where(teravix, np.char.add("OP-", numero.astype(str)), np.char.add("PV", numero.astype(str))),
+        "equipamento": np.where(teravix, rng.choice(EQUIPAMENTOS_TERAVIX, n), rng.choice(EQUIPAMENTOS_PV, n)),
+        "descricao_servico": rng.choice(SERVICOS, n),
+        "imagem_id": rng.choice(imagens, n),
+        "quantidade": np.where(teravix, np.ceil(rng.lognormal(np.log(12), 0.6, n)), rng.geometric(0.45, n)).astype(int),
+        "linha_id": rng.choice(linhas, n),
+        "data_criacao": criacao,
+    })
+    return pedidos
+
+
+def gerar_historico(rng, pedidos, agora, args):
+    """Transições de status de cada pedido; só as que já aconteceram (<= agora) são mantidas."""
+    n = len(pedidos)
+    inicia_aguardando = rng.random(n) < 0.4
+    pendencia = rng.random(n) < args.pendencias
+    cancela = rng.random(n) < args.cancelados
+    # Cancelamento enquanto está no Backlog ou durante a montagem
+    cancela_na_fila = cancela & (rng.random(n) < 0.6)
+    cancela_na_montagem = cancela & ~cancela_na_fila
+    segue = ~cancela_na_fila
+
+    # Linha do tempo de cada pedido em horas desde a criação
+    transicoes = []
+
+    def registrar(mascara, anterior, novo, horas):
+        indices = np.flatnonzero(mascara)
+        transicoes.append(pd.DataFrame({"indice": indices, "status_anterior": np.broadcast_to(anterior, n)[indices],
+                                        "status_alterado": np.broadcast_to(novo, n)[indices], "horas": horas[indices]}))
+
+    horas = np.zeros(n)
+    registrar(np.ones(n, dtype=bool), 0, np.where(inicia_aguardando, AGUARDANDO, BACKLOG), horas)
+    horas = horas + np.where(inicia_aguardando, _duracao(rng, "chegada", n), 0)
+    registrar(inicia_aguardando, AGUARDANDO, BACKLOG, horas)
+    horas = horas + _duracao(rng, "fila", n)
+    registrar(cancela_na_fila, BACKLOG, CANCELADO, horas)
+    registrar(segue, BACKLOG, MONTAGEM, horas)
+    horas = horas + _duracao(rng, "montagem", n) / 2
+    registrar(segue & pendencia, MONTAGEM, PENDENTE, horas)
+    horas = horas + np.where(pendencia, _duracao(rng, "pendencia", n), 0)
+    registrar(segue & pendencia, PENDENTE, MONTAGEM, horas)
+    horas = horas + _duracao(rng, "montagem", n)
+    registrar(cancela_na_montagem, MONTAGEM, CANCELADO, horas)
+    registrar(segue & ~cancela_na_montagem, MONTAGEM, CONCLUIDO, horas)
+
+    historico = pd.concat(transicoes, ignore_index=True)
+    criacao = pd.DatetimeIndex(pedidos["data_criacao"])
+    historico["data_mudanca"] = criacao[historico["indice"]] + pd.to_timedelta(historico["horas"].to_numpy(), unit="h")
+    historico["pedido_id"] = pedidos["id"].to_numpy()[historico["indice"]]
+    # Status anterior 0 = criação (NULL no banco)
+    historico["status_anterior"] = historico["status_anterior"].astype("Int64").replace(0, pd.NA)
+    historico = historico[historico["data_mudanca"] <= agora]
+    historico = historico.sort_values(["pedido_id", "data_mudanca"], kind="stable")
+    historico["alterado_por"] = rng.choice(OPERADORES, len(historico))
+    return historico[["pedido_id", "status_anterior", "status_alterado", "data_mudanca", "alterado_por"]]
+
+
+def aplicar_estado_atual(rng, pedidos, historico):
+    """Status atual, data de conclusão e urgência a partir da última transição de cada pedido."""
+    ultima = historico.groupby("pedido_id").tail(1).set_index("pedido_id").reindex(pedidos["id"])
+    pedidos["status_id"] = ultima["status_alterado"].to_numpy()
+    finalizado = np.isin(pedidos["status_id"], (CONCLUIDO, CANCELADO))
+    pedidos["data_conclusao"] = ultima["data_mudanca"].where(finalizado).to_numpy()
+    pedidos["urgente"] = ~finalizado & (rng.random(len(pedidos)) < 0.05)
+    return pedidos
+
+
+def _registros(df):
+    """Linhas do DataFrame como dicts de tipos Python (datas aware em UTC, nulos como None)."""
+    colunas = []
+    for nome in df.columns:
+        serie = df[nome]
+        if isinstance(serie.dtype, pd.DatetimeTZDtype):
+            # Em UTC: o SQLite guarda a data sem fuso, e o resto do sistema lê datas sem fuso como UTC
+            serie = serie.dt.tz_convert('UTC').dt.floor('s')
+            colunas.append([None if pd.isna(v) else v.to_pydatetime() for v in serie])
+        else:
+            colunas.append(serie.astype(object).where(serie.notna(), None).tolist())
+    return [dict(zip(df.columns, valores)) for valores in zip(*colunas)]
+
+
+def _inserir_em_lotes(conn, tabela, registros, rotulo):
+    for inicio in range(0, len(registros), TAMANHO_LOTE):
+        conn.execute(tabela.insert(), registros[inicio:inicio + TAMANHO_LOTE])
+        print(f"  {rotulo}: {min(inicio + TAMANHO_LOTE, len(registros))}/{len(registros)}", end="\r")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera pedidos sintéticos para testes de desempenho")
+    parser.add_argument("--banco", help="URL SQLAlchemy do banco (padrão: DATABASE_URL)")
+    parser.add_argument("--pedidos", type=int, default=50000, help="Quantidade de pedidos a gerar")
+    parser.add_argument("--anos", type=float, default=3, help="Período coberto pelas datas de criação")
+    parser.add_argument("--linhas", type=int, default=1, help="Linhas de produção (cria as que faltarem)")
+    parser.add_argument("--teravix", type=float, default=0.3, help="Fração de OPs TERAVIX")
+    parser.add_argument("--cancelados", type=float, default=0.04, help="Fração de pedidos cancelados")
+    parser.add_argument("--pendencias", type=float, default=0.1, help="Fração que passa por Pendente")
+    parser.add_argument("--crescimento", type=float, default=1.0, help="Aumento do volume diário do início ao fim do período (1.0 = dobra)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--limpar", action="store_true", help="Remove os pedidos sintéticos existentes antes de gerar")
+    args = parser.parse_args()
+
+    if args.banco:
+        os.environ["DATABASE_URL"] = args.banco
+    # Lotes de inserção são lentos por natureza: não poluem o log de SQL lento
+    os.environ.setdefault("SQL_LENTO_MS", "600000")
+    # O import cria tabelas, índices e gatilhos (create_all + preparar_esquema) e popula os lookups
+    import crud
+    from calendario import obter_calendario
+    from sqlalchemy import text
+
+    engine = crud.engine
+    postgres = engine.dialect.name == "postgresql"
+    rng = np.random.default_rng(args.semente)
+    agora = pd.Timestamp.now(tz="America/Sao_Paulo")
+    inicio = time.perf_counter()
+
+    with engine.begin() as conn:
+        if args.limpar:
+            # O gatilho BEFORE DELETE leva junto o histórico de cada pedido
+            removidos = conn.execute(crud.PedidosTb.__table__.delete().where(crud.PedidosTb.perfil_alteracao == ORIGEM)).rowcount
+            print(f"Removidos {removidos} pedidos sintéticos anteriores.")
+
+        linhas = [linha_id for (linha_id,) in conn.execute(text("SELECT id FROM linha_td ORDER BY id"))]
+        for numero in range(len(linhas) + 1, args.linhas + 1):
+            conn.execute(crud.LinhaTd.__table__.insert(), {"nome": f"Linha {numero}", "meta_semanal": 200})
+        linhas = [linha_id for (linha_id,) in conn.execute(text("SELECT id FROM linha_td ORDER BY id"))][:args.linhas]
+        imagens = [imagem_id for (imagem_id,) in conn.execute(text("SELECT id FROM imagem_td"))]
+        primeiro_id = (conn.execute(text("SELECT MAX(id) FROM pedidos_tb")).scalar() or 0) + 1
+        prioridade_base = dict(conn.execute(text("SELECT linha_id, MAX(prioridade) FROM pedidos_tb GROUP BY linha_id")).all())
+
+    print(f"Gerando {args.pedidos} pedidos em {args.anos:g} anos, {len(linhas)} linha(s)...")
+    pedidos = gerar_pedidos(rng, args.pedidos, primeiro_id, args.anos, agora, args, linhas, imagens, obter_calendario())
+    historico = gerar_historico(rng, pedidos, agora, args)
+    pedidos = aplicar_estado_atual(rng, pedidos, historico)
+    # Fila de cada linha em ordem de chegada, depois dos pedidos que já existiam
+    pedidos = pedidos.sort_values("data_criacao", kind="stable")
+    pedidos["prioridade"] = pedidos.groupby("linha_id").cumcount() + 1 + pedidos["linha_id"].map(prioridade_base).fillna(0).astype(int)
+    pedidos["perfil_alteracao"] = ORIGEM
+    pedidos = pedidos.sort_values("id")
+
+    with engine.begin() as conn:
+        _inserir_em_lotes(conn, crud.PedidosTb.__table__, _registros(pedidos), "pedidos")
+        # O gatilho de inserção grava uma linha de "criação" com o status final; troca pelo histórico gerado
+        conn.execute(text("DELETE FROM historico_status_tb WHERE pedido_id >= :primeiro"), {"primeiro": primeiro_id})
+        _inserir_em_lotes(conn, crud.HistoricoStatusTb.__table__, _registros(historico), "histórico")
+        if postgres:
+            # Ids explícitos: a sequência precisa continuar depois deles
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('public.pedidos_tb', 'id'), (SELECT MAX(id) FROM public.pedidos_tb))"))
+    if postgres:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE public.pedidos_tb, public.historico_status_tb"))
+
+    contagem = pedidos["status_id"].value_counts().sort_index().to_dict()
+    print(f"Concluído em {time.perf_counter() - inicio:.1f} s: {len(pedidos)} pedidos, {len(historico)} transições.")
+    print(f"Pedidos por status: {contagem}")
+
+
+if __name__ == "__main__":
+    main()
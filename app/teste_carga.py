@@ -0,0 +1,362 @@
+"""Teste de carga da interface web (crud.py) e do servidor dos painéis de TV.
+
+Usuários virtuais (threads) repetem uma mistura ponderada das operações do dia a dia
+(listar, buscar, ver histórico, editar, gerar relatório) com pausas entre elas, enquanto
+painéis virtuais consultam o servidor_painel.py no mesmo intervalo das TVs. Com --logins, outras
+threads fazem POST /login sem parar (tempestade de logins, como na troca de turno), disputando o
+executor de hash com as leituras dos usuários virtuais. No fim, imprime
+vazão e percentis de latência por operação e grava um JSON; com --base, compara com um
+resultado anterior e termina com código 1 se alguma operação piorou além da tolerância.
+
+Uso (com o banco preenchido por app/gerar_dados_sinteticos.py):
+    python app/teste_carga.py --usuario carga --senha ... --duracao 120 --usuarios 10 --paineis 30
+    python app/teste_carga.py ... --saida depois.json --base antes.json
+    python app/teste_carga.py ... --usuarios 10 --mistura listar_andamento=1 --pausa 0.2 --logins 8
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import http.client
+import urllib.parse
+from datetime import date
+
+import numpy as np
+
+MISTURA_PADRAO = {
+    "listar_andamento": 30,
+    "listar_concluidos": 8,
+    "buscar": 25,
+    "historico": 12,
+    "editar": 8,
+    "relatorio": 3,
+    "lead_time": 1,
+}
+PERCENTIS = (50, 90, 95, 99)
+
+
+class ClienteHttp:
+    """Uma conexão persistente por usuário virtual (como o navegador), reaberta após erro."""
+
+    def __init__(self, url_base, cookie=None, timeout=30):
+        partes = urllib.parse.urlsplit(url_base)
+        classe = http.client.HTTPSConnection if partes.scheme == "https" else http.client.HTTPConnection
+        self.criar_conexao = lambda: classe(partes.hostname, partes.port, timeout=timeout)
+        self.conexao = None
+        self.cookie = cookie
+
+    def requisitar(self, metodo, caminho, corpo=None, cabecalhos=None):
+        cabecalhos = dict(cabecalhos or {})
+        if self.cookie:
+            cabecalhos["Cookie"] = self.cookie
+        if corpo is not None and not isinstance(corpo, bytes):
+            corpo = json.dumps(corpo).encode("utf-8")
+            cabecalhos["Content-Type"] = "application/json"
+        try:
+            if self.conexao is None:
+                self.conexao = self.criar_conexao()
+            self.conexao.request(metodo, caminho, body=corpo, headers=cabecalhos)
+            resposta = self.conexao.getresponse()
+            return resposta.status, resposta.getheaders(), resposta.read()
+        except (OSError, http.client.HTTPException):
+            self.fechar()
+            raise
+
+    def fechar(self):
+        if self.conexao is not None:
+            self.conexao.close()
+            self.conexao = None
+
+
+def entrar(url_base, usuario, senha):
+    """Faz login uma vez e devolve o cookie de sessão compartilhado pelos usuários virtuais."""
+    cliente = ClienteHttp(url_base)
+    corpo = urllib.parse.urlencode({"username": usuario, "password": senha})
+    cliente.conexao = cliente.criar_conexao()
+    cliente.conexao.request("POST", "/login", body=corpo, headers={"Content-Type": "application/x-www-form-urlencoded"})
+    resposta = cliente.conexao.getresponse()
+    resposta.read()
+    cookies = [valor.split(";", 1)[0] for chave, valor in resposta.getheaders() if chave.lower() == "set-cookie"]
+    cliente.cookie = "; ".join(cookies)
+    status, cabecalhos, _ = cliente.requisitar("GET", "/status")
+    cliente.fechar()
+    if status != 200 or "json" not in dict((k.lower(), v) for k, v in cabecalhos).get("content-type", ""):
+        raise SystemExit("Login falhou: verifique --usuario/--senha (ou CARGA_USUARIO/CARGA_SENHA).")
+    return cliente.cookie
+
+
+class Registro:
+    """Latências (ms) e falhas por operação, só depois do aquecimento."""
+
+    def __init__(self, inicio_medicao):
+        self.inicio_medicao = inicio_medicao
+        self.lock = threading.Lock()
+        self.latencias = {}
+        self.falhas = {}
+        self.conflitos = {}
+
+    def anotar(self, operacao, inicio, ok=True, conflito=False):
+        if inicio < self.inicio_medicao:
+            return
+        duracao = (time.perf_counter() - inicio) * 1000
+        with self.lock:
+            self.latencias.setdefault(operacao, []).append(duracao)
+            if not ok:
+                self.falhas[operacao] = self.falhas.get(operacao, 0) + 1
+            if conflito:
+                self.conflitos[operacao] = self.conflitos.get(operacao, 0) + 1
+
+    def resumo(self, duracao_s):
+        operacoes = {}
+        for operacao, valores in sorted(self.latencias.items()):
+            valores = np.asarray(valores)
+            operacoes[operacao] = {
+                "n": int(valores.size),
+                "por_s": round(valores.size / duracao_s, 2),
+                "falhas": self.falhas.get(operacao, 0),
+                "conflitos": self.conflitos.get(operacao, 0),
+                **{f"p{p}_ms": round(float(v), 1) for p, v in zip(PERCENTIS, np.percentile(valores, PERCENTIS))},
+                "max_ms": round(float(valores.max()), 1),
+            }
+        return operacoes
+
+
+class Catalogo:
+    """Pedidos vistos nas listagens, usados como alvo de buscas, históricos e edições."""
+
+    def __init__(self):
+        self.pedidos = []
+
+    def atualizar(self, pedidos):
+        if pedidos:
+            self.pedidos = pedidos
+
+    def sortear(self):
+        pedidos = self.pedidos
+        return random.choice(pedidos) if pedidos else None
+
+
+def _termo_busca(pedido):
+    if random.random() < 0.3:
+        return random.choice((pedido.get("equipamento") or "").split() or ["TERAVIX"])
+    pv = pedido.get("pv") or ""
+    return pv[:random.randint(3, max(3, len(pv)))]
+
+
+def executar_operacao(operacao, cliente, catalogo, registro):
+    hoje = date.today()
+    pedido = catalogo.sortear()
+    inicio = time.perf_counter()
+    try:
+        if operacao == "listar_andamento":
+            status, _, corpo = cliente.requisitar("GET", "/pedidos?filtro=andamento")
+            if status == 200:
+                catalogo.atualizar(json.loads(corpo))
+        elif operacao == "listar_concluidos":
+            status, _, _ = cliente.requisitar("GET", f"/pedidos?filtro=concluido&mes={hoje.month}&ano={hoje.year}")
+        elif operacao == "buscar":
+            if pedido is None:
+                return
+            termo = urllib.parse.quote(_termo_busca(pedido))
+            status, _, _ = cliente.requisitar("GET", f"/api/pedidos/busca?q={termo}&filtro=andamento")
+        elif operacao == "historico":
+            if pedido is None:
+                return
+            status, _, _ = cliente.requisitar("GET", f"/pedidos/{pedido['id']}/historico")
+        elif operacao == "editar":
+            if pedido is None:
+                return
+            # Regrava o mesmo serviço: custo real de escrita sem mudar o conteúdo dos pedidos
+            status, _, corpo = cliente.requisitar("PUT", f"/pedidos/{pedido['id']}",
+                                                  {"versao": pedido.get("versao", 1), "descricao_servico": pedido.get("descricao_servico") or ""})
+            if status in (200, 409):
+                atual = json.loads(corpo).get("pedido")
+                if atual:
+                    pedido.update(atual)
+            registro.anotar(operacao, inicio, ok=status in (200, 409), conflito=status == 409)
+            return
+        elif operacao == "relatorio":
+            status, _, _ = cliente.requisitar("POST", "/api/gerar-relatorio",
+                                              {"start_date": hoje.replace(day=1).isoformat(), "end_date": hoje.isoformat()})
+        elif operacao == "lead_time":
+            status, _, _ = cliente.requisitar("GET", "/api/analises/lead-time")
+        else:
+            raise ValueError(f"Operação desconhecida: {operacao}")
+    except (OSError, http.client.HTTPException, ValueError):
+        registro.anotar(operacao, inicio, ok=False)
+        return
+    registro.anotar(operacao, inicio, ok=status == 200)
+
+
+def usuario_virtual(args, cookie, mistura, catalogo, registro, fim):
+    cliente = ClienteHttp(args.url, cookie)
+    operacoes, pesos = list(mistura), list(mistura.values())
+    try:
+        while time.perf_counter() < fim:
+            executar_operacao(random.choices(operacoes, pesos)[0], cliente, catalogo, registro)
+            # Tempo de "pensar" entre ações (exponencial, média --pausa)
+            time.sleep(min(random.expovariate(1 / args.pausa), max(0.0, fim - time.perf_counter())) if args.pausa > 0 else 0)
+    finally:
+        cliente.fechar()
+
+
+def painel_virtual(args, indice, registro, fim):
+    """Consulta /api/painel como o prioridades.py --servidor (ETag + intervalo fixo)."""
+    cliente = ClienteHttp(args.painel)
+    caminho = "/api/painel"
+    if args.linhas_painel:
+        caminho += "?linha=" + urllib.parse.quote(args.linhas_painel[indice % len(args.linhas_painel)])
+    etag = None
+    # Painéis espalhados no intervalo, como TVs ligadas em momentos diferentes
+    time.sleep(random.uniform(0, args.intervalo_painel))
+    try:
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            try:
+                status, cabecalhos, _ = cliente.requisitar("GET", caminho, cabecalhos={"If-None-Match": etag} if etag else None)
+                etag = dict((k.lower(), v) for k, v in cabecalhos).get("etag", etag)
+                registro.anotar("painel", inicio, ok=status in (200, 304))
+            except (OSError, http.client.HTTPException):
+                registro.anotar("painel", inicio, ok=False)
+            time.sleep(max(0.0, min(args.intervalo_painel - (time.perf_counter() - inicio), fim - time.perf_counter())))
+    finally:
+        cliente.fechar()
+
+
+def login_virtual(args, registro, fim):
+    """Repete o login com --usuario/--senha. Recusas do servidor (503 com o executor de hash cheio,
+    429 do limite de tentativas) entram como "login_recusado"; só outras respostas contam como falha."""
+    cliente = ClienteHttp(args.url)
+    corpo = urllib.parse.urlencode({"username": args.usuario, "password": args.senha}).encode("utf-8")
+    cabecalhos = {"Content-Type": "application/x-www-form-urlencoded"}
+    try:
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            try:
+                status, _, _ = cliente.requisitar("POST", "/login", corpo, cabecalhos)
+            except (OSError, http.client.HTTPException):
+                registro.anotar("login", inicio, ok=False)
+                continue
+            if status in (429, 503):
+                registro.anotar("login_recusado", inicio)
+            else:
+                # Sucesso é o redirecionamento para a página inicial
+                registro.anotar("login", inicio, ok=status == 302)
+            time.sleep(min(random.expovariate(1 / args.pausa_login), max(0.0, fim - time.perf_counter())) if args.pausa_login > 0 else 0)
+    finally:
+        cliente.fechar()
+
+
+def _mistura(texto):
+    if not texto:
+        return dict(MISTURA_PADRAO)
+    mistura = {}
+    for parte in texto.split(","):
+        nome, _, peso = parte.partition("=")
+        if nome.strip() not in MISTURA_PADRAO:
+            raise argparse.ArgumentTypeError(f"Operação desconhecida: {nome}")
+        mistura[nome.strip()] = float(peso or 1)
+    return mistura
+
+
+def imprimir(operacoes):
+    colunas = ["n", "por_s", "falhas", "conflitos"] + [f"p{p}_ms" for p in PERCENTIS] + ["max_ms"]
+    print(f"{'operação':<20}" + "".join(f"{c:>11}" for c in colunas))
+    for operacao, dados in operacoes.items():
+        print(f"{operacao:<20}" + "".join(f"{dados[c]:>11}" for c in colunas))
+
+
+def comparar(atual, base, tolerancia):
+    """Imprime a variação contra a linha de base; retorna as operações que pioraram."""
+    pioraram = []
+    print(f"\nComparação com a linha de base (tolerância {tolerancia:.0%}):")
+    for operacao, dados in atual.items():
+        anterior = base.get(operacao)
+        if not anterior:
+            continue
+        variacao_p95 = dados["p95_ms"] / anterior["p95_ms"] - 1 if anterior["p95_ms"] else 0.0
+        variacao_vazao = dados["por_s"] / anterior["por_s"] - 1 if anterior["por_s"] else 0.0
+        piorou = variacao_p95 > tolerancia or dados["falhas"] > anterior["falhas"]
+        if piorou:
+            pioraram.append(operacao)
+        print(f"  {operacao:<20} p95 {anterior['p95_ms']:>8} -> {dados['p95_ms']:>8} ms ({variacao_p95:+.0%})"
+              f"   vazão {variacao_vazao:+.0%}{'   <-- PIOROU' if piorou else ''}")
+    return pioraram
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da interface web e dos painéis")
+    parser.add_argument("--url", default="http://localhost:5000", help="Endereço do crud.py")
+    parser.add_argument("--painel", help="Endereço do servidor_painel.py (ex.: http://localhost:5001); sem ele, não há painéis")
+    parser.add_argument("--usuario", default=os.environ.get("CARGA_USUARIO"))
+    parser.add_argument("--senha", default=os.environ.get("CARGA_SENHA"))
+    parser.add_argument("--usuarios", type=int, default=10, help="Usuários virtuais da interface web")
+    parser.add_argument("--logins", type=int, default=0, help="Threads fazendo login sem parar (tempestade de logins)")
+    parser.add_argument("--pausa-login", type=float, default=0.0, help="Pausa média entre logins de cada thread (s)")
+    parser.add_argument("--paineis", type=int, default=0, help="TVs virtuais consultando o servidor do painel")
+    parser.add_argument("--linhas-painel", type=lambda texto: texto.split(","), help="Linhas (ids ou nomes) distribuídas entre as TVs")
+    parser.add_argument("--intervalo-painel", type=float, default=10.0, help="Segundos entre consultas de cada TV")
+    parser.add_argument("--duracao", type=float, default=60.0, help="Segundos medidos")
+    parser.add_argument("--aquecimento", type=float, default=5.0, help="Segundos iniciais descartados")
+    parser.add_argument("--pausa", type=float, default=1.0, help="Pausa média entre ações de um usuário (s)")
+    parser.add_argument("--mistura", type=_mistura, default=None, help="Pesos, ex.: listar_andamento=30,buscar=25,editar=5")
+    parser.add_argument("--semente", type=int)
+    parser.add_argument("--saida", help="Arquivo JSON com o resultado")
+    parser.add_argument("--base", help="Resultado JSON anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="Piora aceita no p95 em relação à base")
+    args = parser.parse_args()
+
+    if args.semente is not None:
+        random.seed(args.semente)
+    mistura = args.mistura or dict(MISTURA_PADRAO)
+    threads = []
+    registro = Registro(time.perf_counter() + args.aquecimento)
+    fim = time.perf_counter() + args.aquecimento + args.duracao
+
+    if (args.usuarios or args.logins) and (not args.usuario or not args.senha):
+        parser.error("Informe --usuario e --senha (ou CARGA_USUARIO/CARGA_SENHA) para os usuários virtuais e os logins.")
+    if args.usuarios:
+        cookie = entrar(args.url, args.usuario, args.senha)
+        catalogo = Catalogo()
+        # Primeira listagem antes de soltar os usuários: buscas e edições já têm alvos
+        executar_operacao("listar_andamento", ClienteHttp(args.url, cookie), catalogo, Registro(float("inf")))
+        threads += [threading.Thread(target=usuario_virtual, args=(args, cookie, mistura, catalogo, registro, fim), daemon=True)
+                    for _ in range(args.usuarios)]
+    threads += [threading.Thread(target=login_virtual, args=(args, registro, fim), daemon=True) for _ in range(args.logins)]
+    if args.paineis and args.painel:
+        threads += [threading.Thread(target=painel_virtual, args=(args, i, registro, fim), daemon=True)
+                    for i in range(args.paineis)]
+    if not threads:
+        parser.error("Nada a executar: use --usuarios, --logins e/ou --paineis com --painel.")
+
+    print(f"Executando {args.usuarios} usuário(s), {args.logins} thread(s) de login e {args.paineis if args.painel else 0} painel(is) "
+          f"por {args.duracao:g} s (+{args.aquecimento:g} s de aquecimento)...")
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(max(0.0, fim - time.perf_counter()) + 60)
+
+    operacoes = registro.resumo(args.duracao)
+    imprimir(operacoes)
+    resultado = {
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"usuarios": args.usuarios, "logins": args.logins, "paineis": args.paineis if args.painel else 0, "duracao_s": args.duracao,
+                   "pausa_s": args.pausa, "intervalo_painel_s": args.intervalo_painel, "mistura": mistura},
+        "operacoes": operacoes,
+    }
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"\nResultado gravado em {args.saida}")
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)["operacoes"]
+        if comparar(operacoes, base, args.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import sys
+
+import pandas as pd
+
+# Armazém compacto dos pedidos do painel. Em vez de reler todo o histórico num DataFrame a cada
+# ciclo, o painel guarda só os pedidos ativos e os finalizados hoje, um registro com __slots__
+# por pedido, e o atualiza no lugar: a cada ciclo o banco devolve (id, versao) desse conjunto e
+# só os pedidos novos ou com versão diferente são lidos por inteiro. Textos repetidos (status,
+# equipamento, serviço, imagem) são internados e viram categorias no DataFrame entregue à tela.
+# O histórico dos concluídos fica resumido por dia (ver consultar_historico_diario em painel_dados.py).
+
+# Nomes iguais aos apelidos de coluna da consulta do painel (COLUNA_* em painel_dados.py)
+CAMPOS = ('id', 'versao', 'status_id', 'nome_status', 'equipamento', 'pv', 'descricao_servico', 'quantidade',
+          'urgente', 'prioridade', 'data_conclusao', 'dia_conclusao', 'image')
+CAMPOS_INTERNADOS = ('nome_status', 'equipamento', 'descricao_servico', 'image')
+CAMPOS_CATEGORICOS = CAMPOS_INTERNADOS
+# Ordem de fila da consulta do painel, igual à de RegistroPedido.chave_fila. NULLS explícito: é o
+# padrão do PostgreSQL (urgente NULL antes dos urgentes, prioridade NULL por último), que o SQLite inverte
+SQL_ORDEM_FILA = "p.urgente DESC NULLS FIRST, p.prioridade ASC NULLS LAST, p.id"
+
+
+class RegistroPedido:
+    __slots__ = CAMPOS
+
+    def __init__(self, linha):
+        for campo in CAMPOS:
+            valor = linha.get(campo)
+            if campo in CAMPOS_INTERNADOS and isinstance(valor, str):
+                valor = sys.intern(valor)
+            setattr(self, campo, valor)
+
+    def chave_fila(self):
+        # Mesma ordem de SQL_ORDEM_FILA: urgente NULL, urgentes, demais; depois prioridade (NULL por último)
+        return (self.urgente is not None, not self.urgente, self.prioridade is None, self.prioridade or 0, self.id)
+
+
+class ArmazemPedidos:
+    """Pedidos ativos + finalizados hoje, indexados por id e atualizados por delta de versão."""
+
+    def __init__(self):
+        self.registros = {}
+        self.alteracoes = 0
+        self._df = None
+
+    def __len__(self):
+        return len(self.registros)
+
+    def desatualizados(self, versoes):
+        """Recebe {id: versao} do conjunto atual; remove quem saiu e devolve os ids a (re)ler."""
+        removidos = self.registros.keys() - versoes.keys()
+        for pedido_id in removidos:
+            del self.registros[pedido_id]
+        if removidos:
+            self._marcar_alteracao()
+        return [pedido_id for pedido_id, versao in versoes.items()
+                if pedido_id not in self.registros or self.registros[pedido_id].versao != versao]
+
+    def atualizar(self, linhas):
+        """Insere ou substitui os pedidos lidos (dicts com as chaves de CAMPOS)."""
+        quantidade = 0
+        for linha in linhas:
+            self.registros[linha['id']] = RegistroPedido(linha)
+            quantidade += 1
+        if quantidade:
+            self._marcar_alteracao()
+        return quantidade
+
+    def _marcar_alteracao(self):
+        self.alteracoes += 1
+        self._df = None
+
+    def para_dataframe(self):
+        """DataFrame em ordem de fila, refeito só quando o armazém mudou."""
+        if self._df is None:
+            registros = sorted(self.registros.values(), key=RegistroPedido.chave_fila)
+            df = pd.DataFrame({campo: [getattr(r, campo) for r in registros] for campo in CAMPOS})
+            for campo in CAMPOS_CATEGORICOS:
+                df[campo] = df[campo].astype('category')
+            self._df = df
+        return self._df
+
+    def memoria_bytes(self):
+        """Estimativa do espaço ocupado pelos registros e pelos valores que só eles referenciam."""
+        total = sys.getsizeof(self.registros)
+        internados = set()
+        for registro in self.registros.values():
+            total += sys.getsizeof(registro)
+            for campo in CAMPOS:
+                valor = getattr(registro, campo)
+                if campo in CAMPOS_INTERNADOS:
+                    internados.add(valor)
+                elif valor is not None and not isinstance(valor, bool):
+                    # None, booleanos e inteiros pequenos são objetos compartilhados do interpretador
+                    if not (isinstance(valor, int) and -5 <= valor <= 256):
+                        total += sys.getsizeof(valor)
+        return total + sum(sys.getsizeof(valor) for valor in internados)
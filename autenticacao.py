@@ -0,0 +1,130 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+logger = logging.getLogger("painel.autenticacao")
+
+# --- PARÂMETROS DE HASH (formato do werkzeug: "scrypt:N:r:p" ou "pbkdf2:sha256:iteracoes") ---
+SENHA_HASH_METODO = os.environ.get('SENHA_HASH_METODO', 'scrypt:32768:8:1')
+SENHA_SALT_TAMANHO = int(os.environ.get('SENHA_SALT_TAMANHO', '16'))
+
+# --- EXECUTOR LIMITADO PARA O HASH ---
+# Poucas threads fazem o hash (hashlib libera o GIL); acima de LOGIN_MAX_PENDENTES o login
+# é recusado na hora, em vez de prender mais workers do servidor web esperando CPU.
+# Cada login pendente prende uma thread do servidor web até o hash terminar (no máximo
+# LOGIN_TIMEOUT_S): LOGIN_MAX_PENDENTES precisa ficar abaixo das threads do servidor (gunicorn
+# --threads), senão uma rajada de logins ocupa todas e as demais rotas esperam. O padrão (4)
+# deixa metade de 8 threads para o resto; o `flask run` abre uma thread por conexão e não tem esse teto.
+LOGIN_THREADS_HASH = int(os.environ.get('LOGIN_THREADS_HASH', '2'))
+LOGIN_MAX_PENDENTES = int(os.environ.get('LOGIN_MAX_PENDENTES', '4'))
+LOGIN_TIMEOUT_S = float(os.environ.get('LOGIN_TIMEOUT_S', '5'))
+
+# --- LIMITE DE TENTATIVAS (token bucket: rajada + reposição por minuto) ---
+LOGIN_RAJADA_USUARIO = int(os.environ.get('LOGIN_RAJADA_USUARIO', '5'))
+LOGIN_POR_MINUTO_USUARIO = float(os.environ.get('LOGIN_POR_MINUTO_USUARIO', '5'))
+LOGIN_RAJADA_IP = int(os.environ.get('LOGIN_RAJADA_IP', '20'))
+LOGIN_POR_MINUTO_IP = float(os.environ.get('LOGIN_POR_MINUTO_IP', '20'))
+
+
+class LoginSobrecarregado(Exception):
+    """Executor de hash cheio: o login deve ser tentado novamente em instantes."""
+
+
+def gerar_hash(senha):
+    return generate_password_hash(senha, method=SENHA_HASH_METODO, salt_length=SENHA_SALT_TAMANHO)
+
+
+def precisa_rehash(password_hash):
+    """True se o hash salvo foi gerado com parâmetros diferentes dos configurados."""
+    return password_hash.split('$', 1)[0] != SENHA_HASH_METODO
+
+
+class BaldeTokens:
+    __slots__ = ('capacidade', 'taxa', 'tokens', 'atualizado')
+
+    def __init__(self, capacidade, taxa_por_segundo, agora):
+        self.capacidade = capacidade
+        self.taxa = taxa_por_segundo
+        self.tokens = float(capacidade)
+        self.atualizado = agora
+
+    def _repor(self, agora):
+        self.tokens = min(self.capacidade, self.tokens + (agora - self.atualizado) * self.taxa)
+        self.atualizado = agora
+
+    def consumir(self, agora):
+        """Retorna 0 se havia token; senão, os segundos até o próximo token."""
+        self._repor(agora)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.taxa
+
+
+class LimitadorTaxa:
+    """Um balde por chave (usuário ou IP), em memória do processo."""
+
+    def __init__(self, capacidade, por_minuto, max_chaves=10000):
+        self.capacidade = capacidade
+        self.taxa = por_minuto / 60.0
+        self.max_chaves = max_chaves
+        self._baldes = {}
+        self._lock = threading.Lock()
+
+    def consumir(self, chave):
+        agora = time.monotonic()
+        with self._lock:
+            balde = self._baldes.get(chave)
+            if balde is None:
+                if len(self._baldes) >= self.max_chaves:
+                    self._limpar(agora)
+                balde = self._baldes[chave] = BaldeTokens(self.capacidade, self.taxa, agora)
+            return balde.consumir(agora)
+
+    def _limpar(self, agora):
+        # Baldes que já se encheram de novo equivalem a um balde novo: podem sair da memória
+        cheios = [chave for chave, balde in self._baldes.items()
+                  if balde.tokens + (agora - balde.atualizado) * balde.taxa >= balde.capacidade]
+        for chave in cheios:
+            del self._baldes[chave]
+
+
+limitador_usuario = LimitadorTaxa(LOGIN_RAJADA_USUARIO, LOGIN_POR_MINUTO_USUARIO)
+limitador_ip = LimitadorTaxa(LOGIN_RAJADA_IP, LOGIN_POR_MINUTO_IP)
+
+_executor = ThreadPoolExecutor(max_workers=LOGIN_THREADS_HASH, thread_name_prefix="hash-senha")
+_vagas = threading.BoundedSemaphore(LOGIN_MAX_PENDENTES)
+
+
+def verificar_limite(username, ip):
+    """Retorna quantos segundos o cliente deve esperar (0 = pode tentar)."""
+    espera_ip = limitador_ip.consumir(ip)
+    espera_usuario = limitador_usuario.consumir((username or '').strip().lower())
+    espera = max(espera_ip, espera_usuario)
+    if espera:
+        logger.warning("Login limitado: usuário=%r ip=%s (aguardar %.0f s)", username, ip, espera)
+    return espera
+
+
+def executar_hash(funcao, *args):
+    """Roda uma função de hash no executor limitado, com fila e tempo máximos."""
+    if not _vagas.acquire(blocking=False):
+        raise LoginSobrecarregado()
+    try:
+        futuro = _executor.submit(funcao, *args)
+    except Exception:
+        _vagas.release()
+        raise
+    futuro.add_done_callback(lambda _: _vagas.release())
+    try:
+        return futuro.result(timeout=LOGIN_TIMEOUT_S)
+    except FuturesTimeoutError:
+        raise LoginSobrecarregado()
+
+
+def verificar_senha(password_hash, senha):
+    return executar_hash(check_password_hash, password_hash, senha)
@@ -0,0 +1,92 @@
+from sqlalchemy import text
+
+# Busca de pedidos por PV, equipamento ou código do pedido, sempre por índice:
+#  - PostgreSQL: índices GIN de trigramas (pg_trgm), ranqueados por similaridade;
+#  - SQLite (uso local): tabela FTS5 com tokenizador de trigramas.
+# Os índices são criados em esquema.py.
+BUSCA_LIMITE_PADRAO = 50
+BUSCA_LIMITE_MAX = 200
+TAMANHO_MIN_TRIGRAMA = 3
+
+_COLUNAS = """
+    p.*, s.nome_status as status, i.nome as imagem_nome,
+    p.data_conclusao as data_finalizacao
+"""
+_JUNCOES = """
+    LEFT JOIN status_td s ON p.status_id = s.id
+    LEFT JOIN imagem_td i ON p.imagem_id = i.id
+"""
+# Correspondência exata e de prefixo no PV/código vêm antes das parciais
+_ORDEM_EXATA = """
+    CASE WHEN lower(p.pv) = :termo_min OR lower(p.codigo_pedido) = :termo_min THEN 0
+         WHEN lower(p.pv) LIKE :prefixo ESCAPE '\\' OR lower(p.codigo_pedido) LIKE :prefixo ESCAPE '\\' THEN 1
+         ELSE 2 END
+"""
+
+
+def _escapar_like(termo):
+    return termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _sql_postgres(condicoes):
+    sql = f"SELECT {_COLUNAS} FROM pedidos_tb p {_JUNCOES} WHERE " + " AND ".join(condicoes)
+    sql += f"""
+        ORDER BY {_ORDEM_EXATA},
+                 GREATEST(similarity(p.pv, :termo), similarity(p.equipamento, :termo), similarity(p.codigo_pedido, :termo)) DESC,
+                 p.urgente DESC, p.prioridade ASC
+        LIMIT :limite
+    """
+    return sql
+
+
+def _sql_sqlite(condicoes, usar_fts):
+    if usar_fts:
+        sql = f"""SELECT {_COLUNAS} FROM pedidos_busca
+                  JOIN pedidos_tb p ON p.id = pedidos_busca.rowid {_JUNCOES}
+                  WHERE pedidos_busca MATCH :consulta"""
+        ordem = f"{_ORDEM_EXATA}, bm25(pedidos_busca), p.urgente DESC, p.prioridade ASC"
+    else:
+        sql = f"SELECT {_COLUNAS} FROM pedidos_tb p {_JUNCOES} WHERE 1 = 1"
+        ordem = "p.pv, p.urgente DESC, p.prioridade ASC"
+    if condicoes:
+        sql += " AND " + " AND ".join(condicoes)
+    return sql + f" ORDER BY {ordem} LIMIT :limite"
+
+
+def montar_busca(dialeto, termo, condicoes=(), params=None, limite=BUSCA_LIMITE_PADRAO):
+    """SQL e parâmetros da busca para o dialeto ('postgresql' ou 'sqlite'); usado pelas duas APIs."""
+    termo = termo.strip()
+    termo_min = termo.lower()
+    params = dict(params or {})
+    params.update({
+        "termo": termo,
+        "termo_min": termo_min,
+        "prefixo": _escapar_like(termo_min) + '%',
+        "limite": max(1, min(int(limite), BUSCA_LIMITE_MAX)),
+    })
+    condicoes = list(condicoes)
+    usar_trigramas = len(termo) >= TAMANHO_MIN_TRIGRAMA
+
+    if dialeto == 'postgresql':
+        if usar_trigramas:
+            params["padrao"] = '%' + _escapar_like(termo) + '%'
+            condicoes.append("(p.pv ILIKE :padrao OR p.equipamento ILIKE :padrao OR p.codigo_pedido ILIKE :padrao)")
+        else:
+            condicoes.append("lower(p.pv) LIKE :prefixo ESCAPE '\\'")
+        sql = _sql_postgres(condicoes)
+    else:
+        if usar_trigramas:
+            params["consulta"] = '"' + termo.replace('"', '""') + '"'
+        else:
+            condicoes.append("lower(p.pv) LIKE :prefixo ESCAPE '\\'")
+        sql = _sql_sqlite(condicoes, usar_trigramas)
+    return sql, params
+
+
+def buscar_pedidos(conn, termo, condicoes=(), params=None, limite=BUSCA_LIMITE_PADRAO):
+    """Retorna até `limite` pedidos que casam com `termo`, os mais relevantes primeiro.
+
+    `condicoes`/`params` são filtros extras já montados (aba, mês, ano) sobre o alias `p`.
+    """
+    sql, params = montar_busca(conn.dialect.name, termo, condicoes, params, limite)
+    return [dict(row._mapping) for row in conn.execute(text(sql), params)]
@@ -0,0 +1,116 @@
+import os
+import json
+import logging
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+logger = logging.getLogger("painel.calendario")
+
+# --- CALENDÁRIO DE PRODUÇÃO ---
+# Dias úteis = dias com turno (dias_semana) menos feriados nacionais, feriados locais e paradas
+# da fábrica, lidos de um JSON local. O calendário é montado uma vez e reaproveitado por
+# métricas do painel, relatórios e previsão; só é recarregado quando o arquivo muda.
+CALENDARIO_PATH = os.environ.get('CALENDARIO_PRODUCAO', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados', 'calendario_producao.json'))
+# Anos antes/depois do atual com contagem pré-calculada (fora disso cai no np.busday_count)
+ANOS_PRE_CALCULADOS = 3
+
+FERIADOS_FIXOS = ("01-01", "04-21", "05-01", "09-07", "10-12", "11-02", "11-15", "11-20", "12-25")
+# Deslocamento em dias a partir do domingo de Páscoa
+FERIADOS_MOVEIS = {"carnaval_segunda": -48, "carnaval": -47, "sexta_feira_santa": -2, "corpus_christi": 60}
+
+
+def pascoa(ano):
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)."""
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes = (h + l - 7 * m + 114) // 31
+    dia = (h + l - 7 * m + 114) % 31 + 1
+    return date(ano, mes, dia)
+
+
+def feriados_nacionais(ano, moveis=("sexta_feira_santa",)):
+    dias = [date.fromisoformat(f"{ano}-{md}") for md in FERIADOS_FIXOS]
+    domingo_pascoa = pascoa(ano)
+    dias += [domingo_pascoa + timedelta(days=FERIADOS_MOVEIS[nome]) for nome in moveis]
+    return dias
+
+
+class CalendarioProducao:
+    """Dias úteis de produção com contagem de intervalos em O(1).
+
+    `ordinais[i]` guarda quantos dias úteis existem de `self.inicio` até o dia anterior a
+    `self.inicio + i`; a contagem de [a, b) é então `ordinais[b] - ordinais[a]`.
+    """
+
+    def __init__(self, dias_semana="1111100", feriados=(), ano_base=None):
+        self.dias_semana = dias_semana
+        self.feriados = np.array(sorted(set(feriados)), dtype='datetime64[D]')
+        self.calendario = np.busdaycalendar(weekmask=dias_semana, holidays=self.feriados)
+        ano_base = ano_base or date.today().year
+        self.inicio = np.datetime64(f"{ano_base - ANOS_PRE_CALCULADOS}-01-01", 'D')
+        self.fim = np.datetime64(f"{ano_base + ANOS_PRE_CALCULADOS + 1}-01-01", 'D')
+        dias = np.arange(self.inicio, self.fim + 1, dtype='datetime64[D]')
+        self.ordinais = np.concatenate(([0], np.cumsum(np.is_busday(dias[:-1], busdaycal=self.calendario))))
+
+    @classmethod
+    def de_config(cls, config, ano_base=None):
+        ano_base = ano_base or date.today().year
+        feriados = []
+        if config.get("feriados_nacionais", True):
+            moveis = config.get("feriados_moveis", ["sexta_feira_santa"])
+            for ano in range(ano_base - ANOS_PRE_CALCULADOS, ano_base + ANOS_PRE_CALCULADOS + 1):
+                feriados += feriados_nacionais(ano, moveis)
+        feriados += [date.fromisoformat(d) for d in config.get("feriados", [])]
+        for parada in config.get("paradas", []):
+            inicio, fim = date.fromisoformat(parada["inicio"]), date.fromisoformat(parada["fim"])
+            feriados += [inicio + timedelta(days=n) for n in range((fim - inicio).days + 1)]
+        return cls(config.get("dias_semana", "1111100"), feriados, ano_base)
+
+    def dias_uteis(self, inicio, fim):
+        """Dias úteis em [inicio, fim); aceita datas, datetime64 ou arrays de datetime64[D]."""
+        inicio = np.asarray(inicio, dtype='datetime64[D]')
+        fim = np.asarray(fim, dtype='datetime64[D]')
+        if inicio.min() >= self.inicio and fim.max() <= self.fim and inicio.min() <= fim.min():
+            return self.ordinais[(fim - self.inicio).astype(np.int64)] - self.ordinais[(inicio - self.inicio).astype(np.int64)]
+        return np.busday_count(inicio, fim, busdaycal=self.calendario)
+
+    def eh_dia_util(self, dias):
+        return np.is_busday(np.asarray(dias, dtype='datetime64[D]'), busdaycal=self.calendario)
+
+    def somar_dias_uteis(self, dias, deslocamento, roll='forward'):
+        return np.busday_offset(np.asarray(dias, dtype='datetime64[D]'), deslocamento, roll=roll, busdaycal=self.calendario)
+
+
+_cache = {"chave": None, "calendario": None}
+_lock = threading.Lock()
+
+
+def obter_calendario(caminho=None):
+    """Calendário compartilhado; remontado só se o arquivo (ou o ano) mudar."""
+    caminho = caminho or CALENDARIO_PATH
+    try:
+        modificado = os.path.getmtime(caminho)
+    except OSError:
+        modificado = None
+    chave = (caminho, modificado, date.today().year)
+    with _lock:
+        if _cache["chave"] != chave:
+            config = {}
+            if modificado is not None:
+                try:
+                    with open(caminho, encoding='utf-8') as f:
+                        config = json.load(f)
+                except (OSError, ValueError):
+                    logger.exception("Calendário inválido em %s; usando só os feriados nacionais.", caminho)
+            _cache["calendario"] = CalendarioProducao.de_config(config)
+            _cache["chave"] = chave
+            logger.info("Calendário de produção carregado (%d dias sem produção cadastrados).", len(_cache["calendario"].feriados))
+        return _cache["calendario"]
@@ -0,0 +1,249 @@
+import json
+from datetime import date, datetime, timedelta
+
+# Consultas de leitura compartilhadas pela API síncrona (crud.py) e pela assíncrona (api_leitura.py).
+# Cada função só monta SQL + parâmetros (para text() do SQLAlchemy); quem executa é o chamador,
+# com a conexão síncrona ou assíncrona. Assim os dois caminhos devolvem exatamente o mesmo JSON.
+
+SQL_STATUS = "SELECT id, nome_status as nome FROM status_td ORDER BY id"
+SQL_IMAGENS = "SELECT id, nome FROM imagem_td ORDER BY id"
+SQL_LINHAS = "SELECT id, nome, meta_semanal FROM linha_td ORDER BY id"
+
+SQL_HISTORICO = """
+    SELECT h.data_mudanca, h.alterado_por,
+           COALESCE(s_ant.nome_status, 'CRIADO') as nome_status_anterior,
+           s_alt.nome_status as nome_status_alterado
+    FROM historico_status_tb h
+    LEFT JOIN status_td s_ant ON h.status_anterior = s_ant.id
+    LEFT JOIN status_td s_alt ON h.status_alterado = s_alt.id
+    WHERE h.pedido_id = :pedido_id ORDER BY h.data_mudanca ASC
+"""
+
+SQL_RELATORIO_REALIZADAS = """
+    SELECT
+        CASE WHEN LOWER(p.equipamento) LIKE '%teravix%' THEN 'OP' ELSE 'PV' END as tipo,
+        COUNT(DISTINCT p.pv) as total_pedidos,
+        COALESCE(SUM(p.quantidade), 0) as total_unidades
+    FROM pedidos_tb p
+    JOIN status_td s ON p.status_id = s.id
+    WHERE s.nome_status = 'Concluído'
+      AND p.dia_conclusao BETWEEN :start_date AND :end_date
+    GROUP BY tipo;
+"""
+
+SQL_RELATORIO_ATUAIS = """
+    SELECT
+        s.nome_status as status,
+        CASE WHEN LOWER(p.equipamento) LIKE '%teravix%' THEN 'OP' ELSE 'PV' END as tipo,
+        COUNT(DISTINCT p.pv) as total_pedidos,
+        COALESCE(SUM(p.quantidade), 0) as total_unidades
+    FROM pedidos_tb p
+    JOIN status_td s ON p.status_id = s.id
+    WHERE s.nome_status IN ('Backlog', 'Em Montagem')
+    GROUP BY status, tipo
+    ORDER BY status, tipo;
+"""
+
+# Diário de alterações dos pedidos (pedidos_alteracoes_tb, mantido por gatilhos em esquema.py).
+# O cliente guarda o maior `seq` que já aplicou e pede só o que veio depois.
+ALTERACOES_LIMITE_PADRAO = 500
+ALTERACOES_LIMITE_MAX = 5000
+
+SQL_ALTERACOES = """
+    SELECT seq, pedido_id, operacao, versao, dados, anteriores, alterado_por, alterado_em
+    FROM pedidos_alteracoes_tb
+    WHERE seq > :desde {filtro_pedido}
+    ORDER BY seq
+    LIMIT :limite
+"""
+
+SQL_ALTERACOES_ATUAL = "SELECT COALESCE(MAX(seq), 0) FROM pedidos_alteracoes_tb"
+
+
+def _inteiro(valor, minimo, maximo):
+    """Inteiro de um parâmetro dentro de [minimo, maximo]; None se ausente ou inválido.
+
+    Texto na URL; número nos parâmetros JSON de uma tarefa de exportação (tarefas.py).
+    """
+    if isinstance(valor, int):
+        # str(True) não é dígito: true/false continuam inválidos
+        valor = str(valor)
+    if not valor or not (valor.isascii() and valor.isdigit()):
+        return None
+    numero = int(valor)
+    return numero if minimo <= numero <= maximo else None
+
+
+# Mês de um dia de produção (date no PostgreSQL, texto AAAA-MM-DD no SQLite)
+SQL_MES = {
+    'postgresql': "EXTRACT(MONTH FROM {coluna})",
+    'sqlite': "CAST(strftime('%m', {coluna}) AS INTEGER)",
+}
+
+
+def filtros_pedidos(args, dialeto='postgresql'):
+    """Condições de aba (andamento/concluído/cancelado), linha, mês e ano usadas na listagem e na busca."""
+    filtro_tab = args.get('filtro')
+    # Valores inválidos são ignorados, como um filtro não informado
+    linha = _inteiro(args.get('linha'), 1, 2 ** 31 - 1)
+    mes = _inteiro(args.get('mes'), 1, 12)
+    ano = _inteiro(args.get('ano'), 1000, 9998)
+    params = {}
+    where_conditions = []
+
+    if filtro_tab == 'concluido':
+        where_conditions.append("p.status_id = 4")
+    elif filtro_tab == 'cancelado':
+        where_conditions.append("p.status_id = 6")
+    else:
+        where_conditions.append("p.status_id NOT IN (4, 6)")
+
+    if linha:
+        where_conditions.append("p.linha_id = :linha")
+        params['linha'] = linha
+
+    # Dia de produção (Brasília) já calculado e indexado no banco: mês/ano viram um intervalo de datas
+    coluna_dia = "p.dia_criacao"
+    if filtro_tab in ['concluido', 'cancelado']:
+        coluna_dia = "p.dia_conclusao"
+
+    if ano:
+        inicio = date(ano, mes, 1) if mes else date(ano, 1, 1)
+        fim = (inicio + timedelta(days=31)).replace(day=1) if mes else date(ano + 1, 1, 1)
+        where_conditions.append(f"{coluna_dia} >= :dia_inicio AND {coluna_dia} < :dia_fim")
+        params.update(dia_inicio=inicio, dia_fim=fim)
+    elif mes:
+        where_conditions.append(SQL_MES[dialeto].format(coluna=coluna_dia) + " = :mes")
+        params['mes'] = mes
+
+    return where_conditions, params
+
+
+def listar_pedidos(args, dialeto='postgresql'):
+    """SQL e parâmetros da listagem de pedidos (GET /pedidos), em ordem de fila."""
+    busca_texto = args.get('busca')
+    where_conditions, params = filtros_pedidos(args, dialeto)
+
+    if busca_texto:
+        # ILIKE usa o índice de trigramas do PostgreSQL; o LIKE do SQLite já ignora maiúsculas
+        where_conditions.append("p.pv ILIKE :busca" if dialeto == 'postgresql' else "p.pv LIKE :busca")
+        params['busca'] = f"%{busca_texto}%"
+
+    query_sql = """
+        SELECT
+            p.*, s.nome_status as status, i.nome as imagem_nome,
+            p.data_conclusao as data_finalizacao
+        FROM pedidos_tb p
+        LEFT JOIN status_td s ON p.status_id = s.id
+        LEFT JOIN imagem_td i ON p.imagem_id = i.id
+    """
+
+    if where_conditions:
+        query_sql += " WHERE " + " AND ".join(where_conditions)
+
+    # Ordem de fila do painel (armazem_pedidos.SQL_ORDEM_FILA), igual no PostgreSQL e no SQLite
+    query_sql += " ORDER BY p.urgente DESC NULLS FIRST, p.prioridade ASC NULLS LAST"
+    return query_sql, params
+
+
+def periodo_relatorio(data):
+    """(start_date, end_date) do corpo do POST do relatório; ValueError com a mensagem para o usuário."""
+    start_date_str = (data or {}).get('start_date')
+    end_date_str = (data or {}).get('end_date')
+    if not start_date_str or not end_date_str:
+        raise ValueError('As datas de início e fim são obrigatórias.')
+    # Dias de produção em Brasília (inclusivos), comparados com a coluna dia_conclusao
+    return datetime.strptime(start_date_str, '%Y-%m-%d').date(), datetime.strptime(end_date_str, '%Y-%m-%d').date()
+
+
+def _linhas_tipo(dados):
+    texto = ""
+    if dados['PV']:
+        pv = dados['PV']
+        texto += f"    • {pv['pedidos']} PV com {pv['unidades']} unidades\n"
+    if dados['OP']:
+        op = dados['OP']
+        texto += f"    • {op['pedidos']} OP com {op['unidades']} unidades de Teravix\n"
+    return texto
+
+
+def texto_relatorio(result_realizadas, result_atuais, start_date, end_date, dias_uteis):
+    """Texto do relatório de atividades a partir das linhas de SQL_RELATORIO_REALIZADAS/ATUAIS."""
+    dados = {
+        'realizadas': {'PV': None, 'OP': None},
+        'backlog': {'PV': None, 'OP': None},
+        'montagem': {'PV': None, 'OP': None}
+    }
+    for row in result_realizadas:
+        dados['realizadas'][row['tipo']] = {'pedidos': row['total_pedidos'], 'unidades': row['total_unidades']}
+    for row in result_atuais:
+        if row['status'] == 'Backlog':
+            dados['backlog'][row['tipo']] = {'pedidos': row['total_pedidos'], 'unidades': row['total_unidades']}
+        elif row['status'] == 'Em Montagem':
+            dados['montagem'][row['tipo']] = {'pedidos': row['total_pedidos'], 'unidades': row['total_unidades']}
+
+    data_formatada = end_date.strftime('%d/%m/%Y')
+    if start_date != end_date:
+        data_formatada = f"{start_date.strftime('%d/%m/%Y')} a {data_formatada}"
+
+    relatorio_texto = f"Relatório de Atividades - <u>{data_formatada}</u>\n"
+    relatorio_texto += "=" * 40 + "\n\n"
+
+    relatorio_texto += "<strong><u>Atividades Realizadas:</u></strong>\n"
+    relatorio_texto += _linhas_tipo(dados['realizadas'])
+    # Média por dia útil do período, pelo mesmo calendário de produção do painel
+    if start_date != end_date and dias_uteis > 0:
+        unidades = sum(d['unidades'] for d in dados['realizadas'].values() if d)
+        relatorio_texto += f"    • {dias_uteis} dias úteis, média de {unidades / dias_uteis:.1f} unidades por dia\n"
+    relatorio_texto += "\n"
+
+    relatorio_texto += "<strong><u>Backlog:</u></strong>\n"
+    relatorio_texto += _linhas_tipo(dados['backlog'])
+    relatorio_texto += "\n"
+
+    relatorio_texto += "<strong><u>Em Montagem:</u></strong>\n"
+    relatorio_texto += _linhas_tipo(dados['montagem'])
+
+    return relatorio_texto.strip()
+
+
+def consulta_alteracoes(args):
+    """SQL e parâmetros de GET /api/alteracoes (`desde`, `limite` e, opcional, `pedido`); ValueError se inválidos."""
+    try:
+        desde = int(args.get('desde') or 0)
+        limite = min(int(args.get('limite') or ALTERACOES_LIMITE_PADRAO), ALTERACOES_LIMITE_MAX)
+        pedido = int(args['pedido']) if args.get('pedido') else None
+    except ValueError:
+        raise ValueError("Parâmetros 'desde', 'limite' e 'pedido' devem ser números inteiros.")
+    if desde < 0 or limite < 1:
+        raise ValueError("Parâmetros 'desde' ou 'limite' fora do intervalo.")
+    params = {"desde": desde, "limite": limite}
+    filtro_pedido = ""
+    if pedido is not None:
+        filtro_pedido = "AND pedido_id = :pedido"
+        params['pedido'] = pedido
+    return SQL_ALTERACOES.format(filtro_pedido=filtro_pedido), params
+
+
+def resposta_alteracoes(linhas, params, atual):
+    """JSON da página do diário: `ultima` é o próximo `desde`; `mais` indica que há outra página.
+
+    `atual` (maior seq do diário, lido antes da página) serve para a carga inicial: o cliente lê
+    `atual`, carrega tudo e continua a partir dele. `reiniciar` avisa que o `desde` do cliente está à
+    frente do banco (restauração de backup) e a carga completa precisa ser refeita.
+    """
+    alteracoes = []
+    for linha in linhas:
+        alteracao = dict(linha)
+        # JSONB chega como dict (psycopg2) ou texto (asyncpg, SQLite)
+        for coluna in ('dados', 'anteriores'):
+            if isinstance(alteracao[coluna], str):
+                alteracao[coluna] = json.loads(alteracao[coluna])
+        alteracoes.append(alteracao)
+    return {
+        "alteracoes": alteracoes,
+        "ultima": alteracoes[-1]['seq'] if alteracoes else params['desde'],
+        "atual": atual,
+        "mais": len(alteracoes) == params['limite'],
+        "reiniciar": params['desde'] > atual,
+    }
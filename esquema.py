@@ -0,0 +1,448 @@
+import logging
+
+from sqlalchemy import inspect
+
+logger = logging.getLogger("painel.esquema")
+
+# DDL aplicada na inicialização, depois do create_all dos modelos (índices, extensões etc.).
+# Todos os comandos são idempotentes; cada um roda na sua própria transação para que a falha
+# de um (ex.: usuário sem permissão para CREATE EXTENSION) não impeça os demais.
+# Obs.: comandos vão direto ao driver, então não use '%' nem ':nome' no texto.
+
+# Colunas acrescentadas aos modelos depois que o banco já existia (create_all não altera tabelas)
+COLUNAS_NOVAS = [
+    # Versão da linha para controle de concorrência otimista nas edições de pedidos
+    ('pedidos_tb', 'versao', 'INTEGER NOT NULL DEFAULT 1'),
+    # Linha de produção do pedido; os pedidos anteriores ficam na linha 1
+    ('pedidos_tb', 'linha_id', 'INTEGER NOT NULL DEFAULT 1'),
+]
+
+# Dia de produção (data em Brasília) calculado pelo próprio banco a partir dos timestamps.
+# Filtros de período e agrupamentos por dia/semana/mês usam essas colunas indexadas, sem
+# converter fuso a cada leitura. Uma definição por dialeto.
+COLUNAS_GERADAS = {
+    'postgresql': [
+        ('pedidos_tb', 'dia_criacao', "DATE GENERATED ALWAYS AS ((data_criacao AT TIME ZONE 'America/Sao_Paulo')::date) STORED"),
+        ('pedidos_tb', 'dia_conclusao', "DATE GENERATED ALWAYS AS ((data_conclusao AT TIME ZONE 'America/Sao_Paulo')::date) STORED"),
+    ],
+    # O SQLite guarda os horários em UTC sem fuso; Brasília não tem horário de verão desde 2019
+    'sqlite': [
+        ('pedidos_tb', 'dia_criacao', "DATE GENERATED ALWAYS AS (date(data_criacao, '-3 hours')) VIRTUAL"),
+        ('pedidos_tb', 'dia_conclusao', "DATE GENERATED ALWAYS AS (date(data_conclusao, '-3 hours')) VIRTUAL"),
+    ],
+}
+
+# Horários que precisam ser timestamptz no PostgreSQL. Bancos antigos com 'timestamp' sem fuso
+# guardavam o horário de Brasília (o driver descartava o deslocamento) e são convertidos uma vez.
+COLUNAS_TIMESTAMPTZ = [
+    ('pedidos_tb', 'data_criacao'),
+    ('pedidos_tb', 'data_conclusao'),
+    ('historico_status_tb', 'data_mudanca'),
+]
+
+# Colunas do pedido gravadas no diário de alterações pelo SQLite (o PostgreSQL grava a linha inteira)
+COLUNAS_DIARIO = ('id', 'codigo_pedido', 'equipamento', 'pv', 'descricao_servico', 'status_id', 'imagem_id',
+                  'data_criacao', 'data_conclusao', 'quantidade', 'prioridade', 'perfil_alteracao', 'urgente',
+                  'versao', 'linha_id', 'dia_criacao', 'dia_conclusao')
+
+
+def _json_pedido_sqlite(registro):
+    return "json_object(" + ", ".join(f"'{coluna}', {registro}.{coluna}" for coluna in COLUNAS_DIARIO) + ")"
+
+
+def _diferencas_sqlite(selecao):
+    # Colunas cujo valor anterior (old) difere do novo (new), como pares chave/valor de json_each
+    return (f"{selecao} FROM json_each({_json_pedido_sqlite('old')}) a "
+            f"WHERE a.value IS NOT json_extract({_json_pedido_sqlite('new')}, '$.' || a.key)")
+
+
+# Recarga da pedidos_finalizados_dia_tb a partir dos pedidos: na inicialização e pela tarefa
+# "reconstruir_finalizados" (tarefas.py). O driver do SQLite executa um comando por vez.
+RECARGA_FINALIZADOS = {
+    'postgresql': [
+        """DELETE FROM public.pedidos_finalizados_dia_tb;
+        INSERT INTO public.pedidos_finalizados_dia_tb (pedido_id, status_id, dia)
+            SELECT id, status_id, dia_conclusao FROM public.pedidos_tb
+            WHERE status_id IN (4, 6) AND dia_conclusao = (now() AT TIME ZONE 'America/Sao_Paulo')::date""",
+    ],
+    'sqlite': [
+        "DELETE FROM pedidos_finalizados_dia_tb",
+        """INSERT INTO pedidos_finalizados_dia_tb (pedido_id, status_id, dia)
+            SELECT id, status_id, dia_conclusao FROM pedidos_tb
+            WHERE status_id IN (4, 6) AND dia_conclusao = date('now', '-3 hours')""",
+    ],
+}
+
+DDL_POSTGRES = [
+    # --- BUSCA DE PEDIDOS (trigramas: acelera ILIKE '%termo%' e ordena por similaridade) ---
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_pv_trgm ON public.pedidos_tb USING gin (pv gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_equipamento_trgm ON public.pedidos_tb USING gin (equipamento gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_codigo_trgm ON public.pedidos_tb USING gin (codigo_pedido gin_trgm_ops)",
+    # Termos curtos (< 3 caracteres) não geram trigramas: para eles a busca é só por prefixo do PV
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_pv_prefixo ON public.pedidos_tb (lower(pv) text_pattern_ops)",
+
+    # --- ANÁLISES DE LEAD TIME (LEAD() por pedido em ordem de data + filtro por conclusão) ---
+    "CREATE INDEX IF NOT EXISTS ix_historico_pedido_data ON public.historico_status_tb (pedido_id, data_mudanca)",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_status_conclusao ON public.pedidos_tb (status_id, data_conclusao)",
+
+    # --- FILA POR LINHA (cada painel lê só a sua linha, em ordem de fila, e os concluídos dela) ---
+    # Com linha_id à frente, o custo de um painel depende do tamanho da própria linha, não do total
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_linha_fila ON public.pedidos_tb (linha_id, urgente DESC, prioridade)",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_linha_status_conclusao ON public.pedidos_tb (linha_id, status_id, data_conclusao)",
+
+    # --- PERÍODOS PELO DIA DE PRODUÇÃO (relatórios, análises e filtros de mês/ano) ---
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_status_dia_conclusao ON public.pedidos_tb (status_id, dia_conclusao)",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_dia_criacao ON public.pedidos_tb (dia_criacao)",
+    # Versões dos pedidos ativos, lidas a cada ciclo pelo armazém do painel (armazem_pedidos.py)
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_ativos ON public.pedidos_tb (linha_id, id, versao) WHERE status_id NOT IN (4, 6)",
+
+    # --- REGRAS DE STATUS NO BANCO (cada escrita da API vira um único comando) ---
+    # Carimba a conclusão só ao entrar em Concluído (4) ou Cancelado (6), como a API fazia
+    """CREATE OR REPLACE FUNCTION public.pedidos_carimbar_conclusao() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF NEW.status_id IN (4, 6) AND COALESCE(OLD.status_id, 0) NOT IN (4, 6) THEN
+            NEW.data_conclusao = now();
+        END IF;
+        RETURN NEW;
+    END $$""",
+    # Histórico: criação (status anterior NULL) e toda troca de status, em nome de perfil_alteracao
+    """CREATE OR REPLACE FUNCTION public.pedidos_registrar_historico() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO public.historico_status_tb (pedido_id, status_anterior, status_alterado, data_mudanca, alterado_por)
+            VALUES (NEW.id, NULL, NEW.status_id, COALESCE(NEW.data_criacao, now()), NEW.perfil_alteracao);
+        ELSIF NEW.status_id IS DISTINCT FROM OLD.status_id THEN
+            INSERT INTO public.historico_status_tb (pedido_id, status_anterior, status_alterado, data_mudanca, alterado_por)
+            VALUES (NEW.id, OLD.status_id, NEW.status_id, now(), NEW.perfil_alteracao);
+        END IF;
+        RETURN NULL;
+    END $$""",
+    # O histórico sai junto com o pedido (antes feito pela rota DELETE em dois comandos)
+    """CREATE OR REPLACE FUNCTION public.pedidos_apagar_historico() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        DELETE FROM public.historico_status_tb WHERE pedido_id = OLD.id;
+        RETURN OLD;
+    END $$""",
+    # PostgreSQL 13 não tem CREATE OR REPLACE TRIGGER: recria na mesma transação
+    """DROP TRIGGER IF EXISTS tg_pedidos_conclusao ON public.pedidos_tb;
+    CREATE TRIGGER tg_pedidos_conclusao BEFORE UPDATE OF status_id ON public.pedidos_tb
+        FOR EACH ROW EXECUTE FUNCTION public.pedidos_carimbar_conclusao()""",
+    """DROP TRIGGER IF EXISTS tg_pedidos_historico ON public.pedidos_tb;
+    CREATE TRIGGER tg_pedidos_historico AFTER INSERT OR UPDATE OF status_id ON public.pedidos_tb
+        FOR EACH ROW EXECUTE FUNCTION public.pedidos_registrar_historico()""",
+    """DROP TRIGGER IF EXISTS tg_pedidos_apagar_historico ON public.pedidos_tb;
+    CREATE TRIGGER tg_pedidos_apagar_historico BEFORE DELETE ON public.pedidos_tb
+        FOR EACH ROW EXECUTE FUNCTION public.pedidos_apagar_historico()""",
+
+    # --- FINALIZADOS DO DIA (colunas Concluídos/Cancelados do painel) ---
+    # Pedidos que entraram em Concluído/Cancelado no dia de produção corrente, mantidos pelas
+    # escritas: o painel lê esta tabela e a fila ativa, sem tocar no histórico. A primeira escrita
+    # do dia apaga as linhas de dias anteriores; quem lê filtra por dia, então a virada não depende dela.
+    """CREATE TABLE IF NOT EXISTS public.pedidos_finalizados_dia_tb (
+        pedido_id INTEGER PRIMARY KEY REFERENCES public.pedidos_tb (id) ON DELETE CASCADE,
+        status_id INTEGER NOT NULL,
+        dia DATE NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS ix_finalizados_dia ON public.pedidos_finalizados_dia_tb (dia)",
+    """CREATE OR REPLACE FUNCTION public.pedidos_atualizar_finalizados_dia() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        hoje date := (now() AT TIME ZONE 'America/Sao_Paulo')::date;
+    BEGIN
+        DELETE FROM public.pedidos_finalizados_dia_tb WHERE dia < hoje;
+        IF NEW.status_id IN (4, 6) AND NEW.dia_conclusao = hoje THEN
+            INSERT INTO public.pedidos_finalizados_dia_tb (pedido_id, status_id, dia) VALUES (NEW.id, NEW.status_id, hoje)
+            ON CONFLICT (pedido_id) DO UPDATE SET status_id = EXCLUDED.status_id, dia = EXCLUDED.dia;
+        ELSIF TG_OP = 'UPDATE' THEN
+            DELETE FROM public.pedidos_finalizados_dia_tb WHERE pedido_id = NEW.id;
+        END IF;
+        RETURN NULL;
+    END $$""",
+    """DROP TRIGGER IF EXISTS tg_pedidos_finalizados_dia ON public.pedidos_tb;
+    CREATE TRIGGER tg_pedidos_finalizados_dia AFTER INSERT OR UPDATE OF status_id, data_conclusao ON public.pedidos_tb
+        FOR EACH ROW EXECUTE FUNCTION public.pedidos_atualizar_finalizados_dia()""",
+    # Na inicialização, refeita a partir dos pedidos (escritas de antes do gatilho, restaurações de backup)
+    *RECARGA_FINALIZADOS['postgresql'],
+
+    # --- DIÁRIO DE ALTERAÇÕES DOS PEDIDOS (somente inserção) ---
+    # Toda escrita em pedidos_tb gera uma entrada na mesma transação: a linha nova inteira (dados)
+    # e os valores anteriores das colunas alteradas (anteriores). Clientes retomam por seq.
+    """CREATE TABLE IF NOT EXISTS public.pedidos_alteracoes_tb (
+        seq BIGSERIAL PRIMARY KEY,
+        pedido_id INTEGER NOT NULL,
+        operacao CHAR(1) NOT NULL,
+        versao INTEGER,
+        dados JSONB,
+        anteriores JSONB,
+        alterado_por VARCHAR,
+        alterado_em TIMESTAMPTZ NOT NULL DEFAULT now())""",
+    # Bases em que o seq era dado na leitura (id como chave, seq opcional): numera o que falta,
+    # na ordem de id, e volta o seq a ser a chave com a própria sequência
+    """DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_schema = 'public'
+                   AND table_name = 'pedidos_alteracoes_tb' AND column_name = 'id') THEN
+            DROP TRIGGER IF EXISTS tg_alteracoes_somente_insercao ON public.pedidos_alteracoes_tb;
+            WITH ultima AS (SELECT COALESCE(MAX(seq), 0) AS seq FROM public.pedidos_alteracoes_tb),
+                 novas AS (SELECT id, row_number() OVER (ORDER BY id) AS ordem
+                           FROM public.pedidos_alteracoes_tb WHERE seq IS NULL)
+            UPDATE public.pedidos_alteracoes_tb a SET seq = ultima.seq + novas.ordem
+            FROM ultima, novas WHERE a.id = novas.id;
+            ALTER TABLE public.pedidos_alteracoes_tb DROP COLUMN id;
+            ALTER TABLE public.pedidos_alteracoes_tb DROP CONSTRAINT pedidos_alteracoes_tb_seq_key;
+            ALTER TABLE public.pedidos_alteracoes_tb ADD PRIMARY KEY (seq);
+            CREATE SEQUENCE public.pedidos_alteracoes_tb_seq_seq OWNED BY public.pedidos_alteracoes_tb.seq;
+            PERFORM setval('public.pedidos_alteracoes_tb_seq_seq', MAX(seq) + 1, false)
+            FROM public.pedidos_alteracoes_tb HAVING MAX(seq) IS NOT NULL;
+            ALTER TABLE public.pedidos_alteracoes_tb
+                ALTER COLUMN seq SET DEFAULT nextval('public.pedidos_alteracoes_tb_seq_seq');
+        END IF;
+    END $$""",
+    "DROP FUNCTION IF EXISTS public.pedidos_numerar_alteracoes()",
+    "DROP TRIGGER IF EXISTS tg_pedidos_travar_alteracoes ON public.pedidos_tb",
+    "DROP FUNCTION IF EXISTS public.pedidos_travar_alteracoes()",
+    "CREATE INDEX IF NOT EXISTS ix_alteracoes_pedido_seq ON public.pedidos_alteracoes_tb (pedido_id, seq)",
+    "CREATE INDEX IF NOT EXISTS ix_alteracoes_alterado_em ON public.pedidos_alteracoes_tb (alterado_em)",
+    # Números de sequência saem na ordem de chamada, não de COMMIT: um leitor que visse o seq 11
+    # antes de o 10 ficar visível pularia o 10. Por isso o gatilho é adiado para o COMMIT e cada
+    # entrada pega a trava antes de tirar o seq: a trava só vai da primeira entrada da transação
+    # até o fim do COMMIT, e quem a espera já terminou seus comandos, então as escritas de pedidos
+    # correm em paralelo e só os COMMITs com entrada no diário passam um por vez. Quem segura a
+    # trava não trava mais nenhuma linha, então não há espera circular. Duas escritas no mesmo
+    # pedido já são serializadas pela trava da linha: a ordem por pedido se mantém.
+    """CREATE OR REPLACE FUNCTION public.pedidos_registrar_alteracao() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        anteriores jsonb;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM pg_advisory_xact_lock(4810049);
+            INSERT INTO public.pedidos_alteracoes_tb (pedido_id, operacao, versao, dados, alterado_por)
+            VALUES (NEW.id, 'I', NEW.versao, to_jsonb(NEW), NEW.perfil_alteracao);
+        ELSIF TG_OP = 'UPDATE' THEN
+            SELECT jsonb_object_agg(a.key, a.value) INTO anteriores
+            FROM jsonb_each(to_jsonb(OLD)) a WHERE to_jsonb(NEW) -> a.key IS DISTINCT FROM a.value;
+            IF anteriores IS NOT NULL THEN
+                PERFORM pg_advisory_xact_lock(4810049);
+                INSERT INTO public.pedidos_alteracoes_tb (pedido_id, operacao, versao, dados, anteriores, alterado_por)
+                VALUES (NEW.id, 'U', NEW.versao, to_jsonb(NEW), anteriores, NEW.perfil_alteracao);
+            END IF;
+        ELSE
+            PERFORM pg_advisory_xact_lock(4810049);
+            INSERT INTO public.pedidos_alteracoes_tb (pedido_id, operacao, versao, anteriores)
+            VALUES (OLD.id, 'D', OLD.versao, to_jsonb(OLD));
+        END IF;
+        RETURN NULL;
+    END $$""",
+    """CREATE OR REPLACE FUNCTION public.alteracoes_somente_insercao() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        RAISE EXCEPTION 'pedidos_alteracoes_tb aceita apenas inserções';
+    END $$""",
+    """DROP TRIGGER IF EXISTS tg_pedidos_alteracoes ON public.pedidos_tb;
+    CREATE CONSTRAINT TRIGGER tg_pedidos_alteracoes AFTER INSERT OR UPDATE OR DELETE ON public.pedidos_tb
+        DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION public.pedidos_registrar_alteracao()""",
+    """DROP TRIGGER IF EXISTS tg_alteracoes_somente_insercao ON public.pedidos_alteracoes_tb;
+    CREATE TRIGGER tg_alteracoes_somente_insercao BEFORE UPDATE ON public.pedidos_alteracoes_tb
+        FOR EACH ROW EXECUTE FUNCTION public.alteracoes_somente_insercao()""",
+
+    # --- FILA DE TAREFAS (tarefas.py) ---
+    # Horários gravados pela aplicação (UTC), como nos demais instantes; os workers disputam
+    # as tarefas na fila com FOR UPDATE SKIP LOCKED
+    """CREATE TABLE IF NOT EXISTS public.tarefas_tb (
+        id SERIAL PRIMARY KEY,
+        tipo VARCHAR(50) NOT NULL,
+        parametros TEXT NOT NULL DEFAULT '{}',
+        estado VARCHAR(20) NOT NULL DEFAULT 'na_fila',
+        progresso REAL NOT NULL DEFAULT 0,
+        mensagem TEXT,
+        resultado TEXT,
+        erro TEXT,
+        cancelar BOOLEAN NOT NULL DEFAULT false,
+        criado_por VARCHAR(80),
+        criada_em TIMESTAMPTZ NOT NULL,
+        iniciada_em TIMESTAMPTZ,
+        atualizada_em TIMESTAMPTZ,
+        concluida_em TIMESTAMPTZ)""",
+    "CREATE INDEX IF NOT EXISTS ix_tarefas_na_fila ON public.tarefas_tb (id) WHERE estado = 'na_fila'",
+    "CREATE INDEX IF NOT EXISTS ix_tarefas_estado_atualizada ON public.tarefas_tb (estado, atualizada_em)",
+
+    # --- SESSÕES DE LOGIN (sessoes.py) ---
+    """CREATE TABLE IF NOT EXISTS public.sessoes_tb (
+        id VARCHAR(64) PRIMARY KEY,
+        username VARCHAR(80),
+        dados TEXT NOT NULL,
+        expira_em TIMESTAMPTZ NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS ix_sessoes_username ON public.sessoes_tb (username)",
+    "CREATE INDEX IF NOT EXISTS ix_sessoes_expira_em ON public.sessoes_tb (expira_em)",
+    # SECRET_KEY gerada na primeira inicialização, igual em todos os processos
+    """CREATE TABLE IF NOT EXISTS public.segredos_tb (
+        nome VARCHAR(50) PRIMARY KEY,
+        valor TEXT NOT NULL)""",
+]
+
+DDL_SQLITE = [
+    "CREATE INDEX IF NOT EXISTS ix_historico_pedido_data ON historico_status_tb (pedido_id, data_mudanca)",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_status_conclusao ON pedidos_tb (status_id, data_conclusao)",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_linha_fila ON pedidos_tb (linha_id, urgente DESC, prioridade)",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_linha_status_conclusao ON pedidos_tb (linha_id, status_id, data_conclusao)",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_status_dia_conclusao ON pedidos_tb (status_id, dia_conclusao)",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_dia_criacao ON pedidos_tb (dia_criacao)",
+    "CREATE INDEX IF NOT EXISTS ix_pedidos_ativos ON pedidos_tb (linha_id, id, versao) WHERE status_id NOT IN (4, 6)",
+
+    # --- BUSCA DE PEDIDOS (substituto local: FTS5 com tokenizador de trigramas) ---
+    """CREATE VIRTUAL TABLE IF NOT EXISTS pedidos_busca USING fts5(
+        pv, equipamento, codigo_pedido, content='pedidos_tb', content_rowid='id', tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS pedidos_busca_ai AFTER INSERT ON pedidos_tb BEGIN
+        INSERT INTO pedidos_busca(rowid, pv, equipamento, codigo_pedido) VALUES (new.id, new.pv, new.equipamento, new.codigo_pedido);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS pedidos_busca_ad AFTER DELETE ON pedidos_tb BEGIN
+        INSERT INTO pedidos_busca(pedidos_busca, rowid, pv, equipamento, codigo_pedido) VALUES ('delete', old.id, old.pv, old.equipamento, old.codigo_pedido);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS pedidos_busca_au AFTER UPDATE OF pv, equipamento, codigo_pedido ON pedidos_tb BEGIN
+        INSERT INTO pedidos_busca(pedidos_busca, rowid, pv, equipamento, codigo_pedido) VALUES ('delete', old.id, old.pv, old.equipamento, old.codigo_pedido);
+        INSERT INTO pedidos_busca(rowid, pv, equipamento, codigo_pedido) VALUES (new.id, new.pv, new.equipamento, new.codigo_pedido);
+    END""",
+
+    # --- REGRAS DE STATUS NO BANCO (mesmas do PostgreSQL) ---
+    # O SQLite não altera NEW em gatilhos BEFORE, e um segundo UPDATE depois do comando não aparece
+    # no RETURNING (e gera outra entrada no diário): a conclusão é carimbada no próprio UPDATE da
+    # API (crud.SQL_CARIMBO_CONCLUSAO). Remove o gatilho das bases criadas antes disso.
+    "DROP TRIGGER IF EXISTS pedidos_conclusao_au",
+    """CREATE TRIGGER IF NOT EXISTS pedidos_historico_ai AFTER INSERT ON pedidos_tb BEGIN
+        INSERT INTO historico_status_tb (pedido_id, status_anterior, status_alterado, data_mudanca, alterado_por)
+        VALUES (new.id, NULL, new.status_id, COALESCE(new.data_criacao, datetime('now')), new.perfil_alteracao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS pedidos_historico_au AFTER UPDATE OF status_id ON pedidos_tb
+        WHEN new.status_id IS NOT old.status_id BEGIN
+        INSERT INTO historico_status_tb (pedido_id, status_anterior, status_alterado, data_mudanca, alterado_por)
+        VALUES (new.id, old.status_id, new.status_id, datetime('now'), new.perfil_alteracao);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS pedidos_apagar_historico_bd BEFORE DELETE ON pedidos_tb BEGIN
+        DELETE FROM historico_status_tb WHERE pedido_id = old.id;
+    END""",
+
+    # --- FINALIZADOS DO DIA (mesma tabela do PostgreSQL; sem chaves estrangeiras ativas, a exclusão vai por gatilho) ---
+    """CREATE TABLE IF NOT EXISTS pedidos_finalizados_dia_tb (
+        pedido_id INTEGER PRIMARY KEY, status_id INTEGER NOT NULL, dia DATE NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS ix_finalizados_dia ON pedidos_finalizados_dia_tb (dia)",
+    """CREATE TRIGGER IF NOT EXISTS pedidos_finalizados_ai AFTER INSERT ON pedidos_tb BEGIN
+        DELETE FROM pedidos_finalizados_dia_tb WHERE dia < date('now', '-3 hours');
+        INSERT OR REPLACE INTO pedidos_finalizados_dia_tb (pedido_id, status_id, dia)
+            SELECT new.id, new.status_id, new.dia_conclusao WHERE new.status_id IN (4, 6) AND new.dia_conclusao = date('now', '-3 hours');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS pedidos_finalizados_au AFTER UPDATE OF status_id, data_conclusao ON pedidos_tb BEGIN
+        DELETE FROM pedidos_finalizados_dia_tb WHERE dia < date('now', '-3 hours') OR pedido_id = new.id;
+        INSERT INTO pedidos_finalizados_dia_tb (pedido_id, status_id, dia)
+            SELECT new.id, new.status_id, new.dia_conclusao WHERE new.status_id IN (4, 6) AND new.dia_conclusao = date('now', '-3 hours');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS pedidos_finalizados_ad AFTER DELETE ON pedidos_tb BEGIN
+        DELETE FROM pedidos_finalizados_dia_tb WHERE pedido_id = old.id;
+    END""",
+    *RECARGA_FINALIZADOS['sqlite'],
+
+    # --- DIÁRIO DE ALTERAÇÕES DOS PEDIDOS (o SQLite já serializa as escritas: seq segue a ordem de commit) ---
+    # AUTOINCREMENT: o seq nunca é reaproveitado, nem depois que a compactação apaga o maior
+    """CREATE TABLE IF NOT EXISTS pedidos_alteracoes_tb (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        pedido_id INTEGER NOT NULL,
+        operacao CHAR(1) NOT NULL,
+        versao INTEGER,
+        dados TEXT,
+        anteriores TEXT,
+        alterado_por VARCHAR,
+        alterado_em TIMESTAMP NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS ix_alteracoes_pedido_seq ON pedidos_alteracoes_tb (pedido_id, seq)",
+    "CREATE INDEX IF NOT EXISTS ix_alteracoes_alterado_em ON pedidos_alteracoes_tb (alterado_em)",
+    f"""CREATE TRIGGER IF NOT EXISTS pedidos_alteracoes_ai AFTER INSERT ON pedidos_tb BEGIN
+        INSERT INTO pedidos_alteracoes_tb (pedido_id, operacao, versao, dados, alterado_por, alterado_em)
+        VALUES (new.id, 'I', new.versao, {_json_pedido_sqlite('new')}, new.perfil_alteracao, datetime('now'));
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pedidos_alteracoes_au AFTER UPDATE ON pedidos_tb
+        WHEN EXISTS ({_diferencas_sqlite('SELECT 1')}) BEGIN
+        INSERT INTO pedidos_alteracoes_tb (pedido_id, operacao, versao, dados, anteriores, alterado_por, alterado_em)
+        VALUES (new.id, 'U', new.versao, {_json_pedido_sqlite('new')},
+                ({_diferencas_sqlite('SELECT json_group_object(a.key, a.value)')}), new.perfil_alteracao, datetime('now'));
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pedidos_alteracoes_ad AFTER DELETE ON pedidos_tb BEGIN
+        INSERT INTO pedidos_alteracoes_tb (pedido_id, operacao, versao, anteriores, alterado_em)
+        VALUES (old.id, 'D', old.versao, {_json_pedido_sqlite('old')}, datetime('now'));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS pedidos_alteracoes_bu BEFORE UPDATE ON pedidos_alteracoes_tb BEGIN
+        SELECT RAISE(ABORT, 'pedidos_alteracoes_tb aceita apenas inserções');
+    END""",
+
+    # --- FILA DE TAREFAS (mesma tabela do PostgreSQL; o SQLite serializa as escritas) ---
+    """CREATE TABLE IF NOT EXISTS tarefas_tb (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo VARCHAR(50) NOT NULL,
+        parametros TEXT NOT NULL DEFAULT '{}',
+        estado VARCHAR(20) NOT NULL DEFAULT 'na_fila',
+        progresso REAL NOT NULL DEFAULT 0,
+        mensagem TEXT,
+        resultado TEXT,
+        erro TEXT,
+        cancelar BOOLEAN NOT NULL DEFAULT 0,
+        criado_por VARCHAR(80),
+        criada_em TIMESTAMP NOT NULL,
+        iniciada_em TIMESTAMP,
+        atualizada_em TIMESTAMP,
+        concluida_em TIMESTAMP)""",
+    "CREATE INDEX IF NOT EXISTS ix_tarefas_na_fila ON tarefas_tb (id) WHERE estado = 'na_fila'",
+    "CREATE INDEX IF NOT EXISTS ix_tarefas_estado_atualizada ON tarefas_tb (estado, atualizada_em)",
+
+    # --- SESSÕES DE LOGIN ---
+    """CREATE TABLE IF NOT EXISTS sessoes_tb (
+        id VARCHAR(64) PRIMARY KEY,
+        username VARCHAR(80),
+        dados TEXT NOT NULL,
+        expira_em TIMESTAMP NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS ix_sessoes_username ON sessoes_tb (username)",
+    "CREATE INDEX IF NOT EXISTS ix_sessoes_expira_em ON sessoes_tb (expira_em)",
+    """CREATE TABLE IF NOT EXISTS segredos_tb (
+        nome VARCHAR(50) PRIMARY KEY,
+        valor TEXT NOT NULL)""",
+]
+
+
+def _executar(engine, comandos):
+    for comando in comandos:
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(comando)
+        except Exception as e:
+            logger.warning("DDL não aplicada (%s): %s", e.__class__.__name__, comando.strip().splitlines()[0])
+
+
+def _garantir_timestamptz(engine, inspetor):
+    for tabela, coluna in COLUNAS_TIMESTAMPTZ:
+        tipo = next((c['type'] for c in inspetor.get_columns(tabela) if c['name'] == coluna), None)
+        if tipo is not None and getattr(tipo, 'timezone', True) is False:
+            logger.info("Convertendo %s.%s para timestamptz (valores lidos como horário de Brasília)", tabela, coluna)
+            _executar(engine, [f"ALTER TABLE {tabela} ALTER COLUMN {coluna} TYPE timestamptz USING {coluna} AT TIME ZONE 'America/Sao_Paulo'"])
+
+
+def _garantir_colunas(engine):
+    inspetor = inspect(engine)
+    dialeto = engine.dialect.name
+    if dialeto == 'postgresql':
+        # Antes das colunas geradas: a expressão só é imutável sobre timestamptz
+        _garantir_timestamptz(engine, inspetor)
+    for tabela, coluna, definicao in COLUNAS_NOVAS + COLUNAS_GERADAS.get(dialeto, []):
+        existentes = {c['name'] for c in inspetor.get_columns(tabela)}
+        if coluna not in existentes:
+            logger.info("Adicionando coluna %s.%s", tabela, coluna)
+            _executar(engine, [f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}"])
+
+
+def preparar_esquema(engine):
+    """Aplica colunas novas, índices e objetos auxiliares conforme o banco em uso."""
+    _garantir_colunas(engine)
+    dialeto = engine.dialect.name
+    if dialeto == 'postgresql':
+        _executar(engine, DDL_POSTGRES)
+    elif dialeto == 'sqlite':
+        indice_novo = not inspect(engine).has_table('pedidos_busca')
+        _executar(engine, DDL_SQLITE)
+        if indice_novo:
+            # Tabela FTS recém-criada: indexa os pedidos que já existiam
+            _executar(engine, ["INSERT INTO pedidos_busca(pedidos_busca) VALUES ('rebuild')"])
+    else:
+        logger.info("Banco '%s' sem DDL auxiliar; a busca usará varredura simples.", dialeto)
@@ -0,0 +1,194 @@
+import os
+import re
+import time
+import logging
+import threading
+from bisect import bisect_left
+
+from flask import Response, g, has_app_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger("painel.instrumentacao")
+
+# --- CONFIGURAÇÕES ---
+# Limites (em segundos) dos buckets dos histogramas de latência
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_QTD_SQL = (1, 2, 3, 5, 10, 20, 50, 100)
+# Consultas acima deste tempo são registradas no log (parâmetros omitidos)
+LIMIAR_SQL_LENTO = float(os.environ.get('SQL_LENTO_MS', '250')) / 1000.0
+
+_RE_LITERAL_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_RE_LITERAL_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_ESPACOS = re.compile(r"\s+")
+
+
+class Histograma:
+    """Histograma cumulativo no formato esperado pelo Prometheus."""
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        indice = bisect_left(self.limites, valor)
+        if indice < len(self.contagens):
+            self.contagens[indice] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class RegistroMetricas:
+    """Guarda contadores e histogramas rotulados, protegido por um único lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas = {}
+        self._contadores = {}
+        self._ajuda = {}
+
+    def descrever(self, nome, ajuda):
+        self._ajuda[nome] = ajuda
+
+    def observar(self, nome, limites, valor, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            hist = self._histogramas.get(chave)
+            if hist is None:
+                hist = self._histogramas[chave] = Histograma(limites)
+            hist.observar(valor)
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def exportar(self):
+        """Gera o texto de exposição do Prometheus (versão 0.0.4)."""
+        with self._lock:
+            contadores = sorted(self._contadores.items())
+            histogramas = sorted(
+                (chave, (list(h.contagens), h.soma, h.total, h.limites))
+                for chave, h in self._histogramas.items()
+            )
+
+        linhas = []
+        ultimo_nome = None
+        for (nome, rotulos), valor in contadores:
+            if nome != ultimo_nome:
+                linhas.append(f"# HELP {nome} {self._ajuda.get(nome, nome)}")
+                linhas.append(f"# TYPE {nome} counter")
+                ultimo_nome = nome
+            linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {valor}")
+
+        ultimo_nome = None
+        for (nome, rotulos), (contagens, soma, total, limites) in histogramas:
+            if nome != ultimo_nome:
+                linhas.append(f"# HELP {nome} {self._ajuda.get(nome, nome)}")
+                linhas.append(f"# TYPE {nome} histogram")
+                ultimo_nome = nome
+            acumulado = 0
+            for limite, contagem in zip(limites, contagens):
+                acumulado += contagem
+                linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos + (('le', repr(float(limite))),))} {acumulado}")
+            linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos + (('le', '+Inf'),))} {total}")
+            linhas.append(f"{nome}_sum{_formatar_rotulos(rotulos)} {soma}")
+            linhas.append(f"{nome}_count{_formatar_rotulos(rotulos)} {total}")
+        return "\n".join(linhas) + "\n"
+
+
+def _formatar_rotulos(rotulos):
+    if not rotulos:
+        return ""
+    partes = []
+    for chave, valor in rotulos:
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{chave}="{valor}"')
+    return "{" + ",".join(partes) + "}"
+
+
+def redigir_sql(statement):
+    """Remove literais do SQL para que nenhum dado de pedido/usuário vá para o log."""
+    sql = _RE_LITERAL_TEXTO.sub("'?'", statement)
+    sql = _RE_LITERAL_NUMERO.sub("?", sql)
+    return _RE_ESPACOS.sub(" ", sql).strip()
+
+
+registro = RegistroMetricas()
+registro.descrever("http_requisicao_duracao_segundos", "Latência das requisições HTTP por rota.")
+registro.descrever("http_requisicoes_total", "Total de requisições HTTP por rota e status.")
+registro.descrever("sql_consultas_por_requisicao", "Quantidade de comandos SQL executados por requisição.")
+registro.descrever("sql_tempo_por_requisicao_segundos", "Tempo total gasto no banco por requisição.")
+registro.descrever("sql_consultas_lentas_total", "Comandos SQL acima do limiar de lentidão.")
+
+
+# --- EVENTOS DO SQLALCHEMY ---
+def _antes_do_cursor(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_inicio_sql', []).append(time.perf_counter())
+
+
+def _depois_do_cursor(conn, cursor, statement, parameters, context, executemany):
+    pilha = conn.info.get('_inicio_sql')
+    if not pilha:
+        return
+    duracao = time.perf_counter() - pilha.pop()
+
+    if has_app_context() and 'instr_inicio' in g:
+        g.instr_sql_qtd += 1
+        g.instr_sql_tempo += duracao
+
+    if duracao >= LIMIAR_SQL_LENTO:
+        registro.incrementar("sql_consultas_lentas_total")
+        qtd_params = len(parameters) if hasattr(parameters, '__len__') else 0
+        logger.warning("SQL lento (%.1f ms, %d parâmetros omitidos): %s",
+                       duracao * 1000, qtd_params, redigir_sql(statement))
+
+
+def _erro_no_cursor(contexto):
+    # Comando que falhou não chega ao after_cursor_execute: descarta o início dele, senão a pilha
+    # da conexão (que volta ao pool) cresce a cada erro
+    conn = contexto.connection
+    pilha = conn.info.get('_inicio_sql') if conn is not None and not conn.closed else None
+    if pilha:
+        pilha.pop()
+
+
+# --- HOOKS DO FLASK ---
+def _rota_atual():
+    return request.url_rule.rule if request.url_rule else "nao_encontrada"
+
+
+def _iniciar_requisicao():
+    g.instr_inicio = time.perf_counter()
+    g.instr_sql_qtd = 0
+    g.instr_sql_tempo = 0.0
+
+
+def _finalizar_requisicao(response):
+    inicio = g.pop('instr_inicio', None)
+    if inicio is None:
+        return response
+    duracao = time.perf_counter() - inicio
+    rota, metodo = _rota_atual(), request.method
+
+    registro.observar("http_requisicao_duracao_segundos", LIMITES_LATENCIA, duracao, rota=rota, metodo=metodo)
+    registro.incrementar("http_requisicoes_total", rota=rota, metodo=metodo, status=response.status_code)
+    registro.observar("sql_consultas_por_requisicao", LIMITES_QTD_SQL, g.instr_sql_qtd, rota=rota)
+    registro.observar("sql_tempo_por_requisicao_segundos", LIMITES_LATENCIA, g.instr_sql_tempo, rota=rota)
+    return response
+
+
+def _metrics():
+    return Response(registro.exportar(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+def instrumentar(app, engine):
+    """Liga a coleta de métricas ao app Flask e ao engine, e expõe /metrics."""
+    event.listen(engine, "before_cursor_execute", _antes_do_cursor)
+    event.listen(engine, "after_cursor_execute", _depois_do_cursor)
+    event.listen(engine, "handle_error", _erro_no_cursor)
+    app.before_request(_iniciar_requisicao)
+    app.after_request(_finalizar_requisicao)
+    app.add_url_rule("/metrics", "metrics", _metrics, methods=["GET"])
@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import logging
+import threading
+
+logger = logging.getLogger("painel.layout")
+
+# --- LAYOUT DO PAINEL DE TV ---
+# Seções, capacidades e status que alimentam cada seção, lidos de um JSON local uma vez por
+# processo. O prioridades.py monta os widgets a partir dele e o painel_dados.py usa as mesmas
+# capacidades para o view-model (no modo servidor vale o arquivo da máquina do servidor_painel.py).
+# Só usa a biblioteca padrão: é importado pela tela antes do pandas.
+LAYOUT_PATH = os.environ.get('PAINEL_LAYOUT', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados', 'layout_painel.json'))
+# Altura de tela para a qual os tamanhos em pixels do layout foram escritos (escala "auto")
+ALTURA_REFERENCIA = 1080
+# Segundos em cada página das seções com "paginar"
+ROTACAO_PADRAO_S = 8
+
+LAYOUT_PADRAO = {
+    "escala": 0.8,
+    "altura_cabecalho": 60,
+    "altura_dashboard": 317,
+    "largura_lateral": 300,
+    "rotacao_s": ROTACAO_PADRAO_S,
+    "cards": {"titulo": "PRIORIDADES", "quantidade": 4, "altura": 217,
+              "fora_da_fila": ["Aguardando Chegada", "Pendente"]},
+    "secoes": [
+        {"id": "backlog", "titulo": "BACKLOG", "status": ["Backlog"], "capacidade": 5,
+         "linha": 0, "coluna": 0, "sem_cards": True, "paginar": True},
+        {"id": "aguardando_chegada", "titulo": "AGUARDANDO CHEGADA", "status": ["Aguardando Chegada"], "capacidade": 5,
+         "linha": 0, "coluna": 1},
+        {"id": "em_montagem", "titulo": "EM MONTAGEM FORA DA PRIORIDADE", "status": ["Em Montagem"], "capacidade": 5,
+         "linha": 1, "coluna": 0, "sem_cards": True, "ocultar_vazia": True},
+        {"id": "pendentes", "titulo": "PENDENTES", "status": ["Pendente"], "capacidade": 5,
+         "linha": 1, "coluna": 1, "paginar": True},
+    ],
+    "laterais": [
+        {"id": "concluidos", "titulo": "ÚLTIMOS CONCLUÍDOS", "capacidade": 5, "cor": "#2ECC71"},
+        {"id": "cancelados", "titulo": "ÚLTIMOS CANCELADOS", "capacidade": 5, "cor": "#E74C3C"},
+    ],
+}
+# Laterais mostram os finalizados do dia; o id diz de qual status eles vêm (e a cor padrão do título)
+CORES_LATERAIS = {"concluidos": "#2ECC71", "cancelados": "#E74C3C"}
+COR_SECAO_PADRAO = "#FF6600"
+
+
+class LayoutPainel:
+    """Layout validado, com o mapeamento status -> seção pronto para o ciclo.
+
+    `indice_por_status` leva o nome do status (minúsculo) ao índice da seção em `secoes`;
+    `capacidades` tem a capacidade de cada seção (itens por página) na mesma ordem e `limites`,
+    quantos itens entram no view-model: a lista inteira (ou `max_paginas` páginas) nas seções com `paginar`.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.escala = config.get("escala", LAYOUT_PADRAO["escala"])
+        self.altura_cabecalho = int(config.get("altura_cabecalho", LAYOUT_PADRAO["altura_cabecalho"]))
+        self.altura_dashboard = int(config.get("altura_dashboard", LAYOUT_PADRAO["altura_dashboard"]))
+        self.largura_lateral = int(config.get("largura_lateral", LAYOUT_PADRAO["largura_lateral"]))
+        self.rotacao_s = max(1, float(config.get("rotacao_s", ROTACAO_PADRAO_S)))
+        self.cards = dict(LAYOUT_PADRAO["cards"], **config.get("cards", {}))
+        self.qtd_cards = max(0, int(self.cards["quantidade"]))
+        self.fora_da_fila = [s.lower() for s in self.cards["fora_da_fila"]]
+
+        self.secoes = [dict(secao, cor=secao.get("cor", COR_SECAO_PADRAO)) for secao in config.get("secoes", LAYOUT_PADRAO["secoes"])]
+        self.laterais = [dict(lateral, cor=lateral.get("cor", CORES_LATERAIS.get(lateral["id"])))
+                         for lateral in config.get("laterais", LAYOUT_PADRAO["laterais"])]
+        ids = [s["id"] for s in self.secoes + self.laterais]
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"Layout do painel com ids de seção repetidos: {ids}")
+        for lateral in self.laterais:
+            if lateral["id"] not in CORES_LATERAIS:
+                raise ValueError(f"Lateral desconhecida no layout: {lateral['id']} (use {', '.join(CORES_LATERAIS)})")
+
+        self.indice_por_status = {}
+        for indice, secao in enumerate(self.secoes):
+            for status in secao["status"]:
+                if status.lower() in self.indice_por_status:
+                    raise ValueError(f"Status '{status}' alimenta mais de uma seção do layout")
+                self.indice_por_status[status.lower()] = indice
+        self.capacidades = [max(1, int(secao.get("capacidade", 5))) for secao in self.secoes]
+        self.sem_cards = [bool(secao.get("sem_cards", False)) for secao in self.secoes]
+        self.paginar = [bool(secao.get("paginar", False)) for secao in self.secoes]
+        self.limites = [self._limite(secao, capacidade) for secao, capacidade in zip(self.secoes, self.capacidades)]
+        self.colunas = max((secao.get("coluna", 0) for secao in self.secoes), default=0) + 1
+
+    @staticmethod
+    def _limite(secao, capacidade):
+        if not secao.get("paginar"):
+            return capacidade
+        max_paginas = int(secao.get("max_paginas", 0))
+        return capacidade * max_paginas if max_paginas > 0 else sys.maxsize
+
+    def fator_escala(self, altura_tela=None):
+        """Escala dos tamanhos em pixels; "auto" acompanha a altura da tela (0.8 em 1080p)."""
+        if self.escala == "auto":
+            return LAYOUT_PADRAO["escala"] * (altura_tela or ALTURA_REFERENCIA) / ALTURA_REFERENCIA
+        return float(self.escala)
+
+    def capacidade_lateral(self, id_lateral):
+        for lateral in self.laterais:
+            if lateral["id"] == id_lateral:
+                return max(0, int(lateral.get("capacidade", 5)))
+        return 0
+
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def obter_layout(caminho=None):
+    """Layout do painel, lido uma vez por caminho (mudanças valem ao reiniciar o painel)."""
+    caminho = caminho or LAYOUT_PATH
+    with _lock:
+        if caminho not in _cache:
+            config = LAYOUT_PADRAO
+            if os.path.exists(caminho):
+                try:
+                    with open(caminho, encoding='utf-8') as f:
+                        config = json.load(f)
+                except (OSError, ValueError):
+                    logger.exception("Layout inválido em %s; usando o layout padrão.", caminho)
+            try:
+                _cache[caminho] = LayoutPainel(config)
+            except (KeyError, TypeError, ValueError):
+                logger.exception("Layout inválido em %s; usando o layout padrão.", caminho)
+                _cache[caminho] = LayoutPainel(LAYOUT_PADRAO)
+            layout = _cache[caminho]
+            logger.info("Layout do painel: %d cards, seções %s.", layout.qtd_cards,
+                        ", ".join(f"{s['id']}={c}" for s, c in zip(layout.secoes, layout.capacidades)))
+        return _cache[caminho]
@@ -0,0 +1,478 @@
+import os
+import time
+import logging
+import threading
+import pandas as pd
+import psycopg2
+from datetime import datetime, timedelta
+import numpy as np
+
+from previsao import PrevisaoFila, taxa_diaria, data_iso, JANELA_DIAS_UTEIS
+from calendario import obter_calendario
+from armazem_pedidos import ArmazemPedidos, SQL_ORDEM_FILA
+from layout_painel import obter_layout
+from painel_fontes import (TZ, META_SEMANAL, _caminho_snapshot, _gravar_atomico, _escrever_bytes, carregar_snapshot,
+                           serializar_view_model)
+
+logger = logging.getLogger("painel.dados")
+
+# O dia de produção (data em Brasília) vem pronto do banco (dia_conclusao, coluna gerada em
+# esquema.py): o ciclo compara datas sem converter fuso dos timestamps.
+
+# --- NOVAS CONFIGURAÇÕES DE BANCO DE DADOS POSTGRESQL ---
+DB_HOST = os.environ.get('PAINEL_DB_HOST', "localhost")
+DB_NAME = os.environ.get('PAINEL_DB_NAME', "pedidos_db")
+DB_USER = os.environ.get('PAINEL_DB_USER', "postgres")
+DB_PASSWORD = os.environ.get('PAINEL_DB_PASSWORD', "2025")
+
+# --- ARMAZÉM DO PAINEL (armazem_pedidos.py) ---
+# Releitura completa de tempos em tempos: pega nomes de status/imagem alterados e edições feitas
+# direto no banco, que não mudam a versao do pedido
+INTERVALO_RECARGA_S = 10 * 60
+
+# --- CONSTANTES DE COLUNAS E STATUS ---
+COLUNA_PEDIDO_ID, COLUNA_PV, COLUNA_SERVICO, COLUNA_STATUS, COLUNA_DATA_STATUS, COLUNA_QTD, COLUNA_EQUIPAMENTO, COLUNA_URGENTE, COLUNA_DATA_CONCLUSAO, COLUNA_IMAGEM = \
+    'id', 'pv', 'descricao_servico', 'nome_status', 'data_criacao', 'quantidade', 'equipamento', 'urgente', 'data_conclusao', 'image'
+COLUNA_DIA_CONCLUSAO = 'dia_conclusao'
+    
+STATUS_ID_CONCLUIDO, STATUS_ID_CANCELADO = 4, 6
+STATUS_PENDENTE, STATUS_BACKLOG, STATUS_AGUARDANDO_CHEGADA, STATUS_EM_MONTAGEM, STATUS_CONCLUIDO, STATUS_CANCELADO, STATUS_URGENTE = \
+    'Pendente', 'Backlog', 'Aguardando Chegada', 'Em Montagem', 'Concluído', 'Cancelado', 'Urgente'
+
+
+# --- CONEXÃO COM O BANCO DE DADOS POSTGRESQL ---
+def get_db_connection():
+    """Cria e retorna uma conexão com o banco de dados PostgreSQL."""
+    try:
+        conn = psycopg2.connect(
+            host=DB_HOST,
+            database=DB_NAME,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            client_encoding='utf8'
+        )
+        return conn
+    except psycopg2.Error as e:
+        raise Exception(f"Erro ao conectar ao banco de dados: {e}")
+
+_conexao = None
+# Um processo pode ter várias fontes (ex.: uma por linha no servidor_painel.py) usando a mesma conexão
+_lock_conexao = threading.RLock()
+
+def obter_conexao():
+    """Reaproveita a conexão entre os ciclos; só abre outra depois de uma falha."""
+    global _conexao
+    if _conexao is None or getattr(_conexao, 'closed', 0):
+        _conexao = get_db_connection()
+        if hasattr(_conexao, 'autocommit'):
+            _conexao.autocommit = True
+    return _conexao
+
+def descartar_conexao():
+    global _conexao
+    if _conexao is not None:
+        try:
+            _conexao.close()
+        except Exception:
+            pass
+    _conexao = None
+
+# --- LÓGICA DE DADOS REESCRITA E CORRIGIDA ---
+def carregar_dados(telemetria=None):
+    """Carrega todos os dados diretamente do banco de dados PostgreSQL."""
+    return processar_dados(consultar_pedidos(telemetria), telemetria)
+
+class LinhaInexistente(Exception):
+    pass
+
+def consultar_linha(linha):
+    """Resolve a linha pedida (id ou nome) para {id, nome, meta_semanal}."""
+    texto = str(linha).strip()
+    # Por id (o caso de todo ciclo depois do primeiro) lê só a linha pedida; por nome, a tabela (poucas linhas)
+    filtro = f"WHERE id = {int(texto)}" if texto.isdigit() else ""
+    with _lock_conexao:
+        try:
+            linhas = pd.read_sql(f"SELECT id, nome, meta_semanal FROM linha_td {filtro}", obter_conexao())
+        except Exception as e:
+            descartar_conexao()
+            raise Exception(f"Não foi possível consultar as linhas de produção.\nErro: {e}")
+    encontradas = linhas[(linhas['id'].astype(str) == texto) | (linhas['nome'].str.lower() == texto.lower())]
+    if encontradas.empty:
+        raise LinhaInexistente(f"Linha de produção '{linha}' não cadastrada.")
+    encontrada = encontradas.iloc[0]
+    return {"id": int(encontrada['id']), "nome": str(encontrada['nome']), "meta_semanal": int(encontrada['meta_semanal'])}
+
+# Colunas do painel; os apelidos são os campos do RegistroPedido (armazem_pedidos.py)
+SQL_PEDIDOS = f"""
+    SELECT 
+        p.id AS "{COLUNA_PEDIDO_ID}",
+        p.versao,
+        p.status_id,
+        p.equipamento AS "{COLUNA_EQUIPAMENTO}",
+        p.pv AS "{COLUNA_PV}",
+        p.descricao_servico AS "{COLUNA_SERVICO}",
+        s.nome_status AS "{COLUNA_STATUS}",
+        p.data_criacao AS "{COLUNA_DATA_STATUS}",
+        p.quantidade AS "{COLUNA_QTD}",
+        p.urgente AS "{COLUNA_URGENTE}",
+        p.prioridade,
+        p.data_conclusao AS "{COLUNA_DATA_CONCLUSAO}",
+        p.dia_conclusao AS "{COLUNA_DIA_CONCLUSAO}",
+        i.nome AS "{COLUNA_IMAGEM}"
+    FROM 
+        pedidos_tb p
+    JOIN
+        status_td s ON p.status_id = s.id
+    LEFT JOIN                               
+        imagem_td i ON p.imagem_id = i.id 
+"""
+
+def consultar_pedidos(telemetria=None, linha_id=None):
+    """Executa a consulta de todos os pedidos (de uma linha, se informada) e retorna o DataFrame bruto."""
+    logger.debug("Carregando dados do banco de dados: %s...", DB_NAME)
+    inicio_consulta = time.perf_counter()
+    # Filtro por linha_id à frente do índice (linha_id, urgente, prioridade): só as linhas do painel são lidas
+    filtro_linha = "" if linha_id is None else f"WHERE p.linha_id = {int(linha_id)}"
+    with _lock_conexao:
+        try:
+            df = pd.read_sql(f"{SQL_PEDIDOS} {filtro_linha} ORDER BY {SQL_ORDEM_FILA};", obter_conexao())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Dados brutos carregados do banco de dados:\n%s", df.head())
+
+        except Exception as e:
+            descartar_conexao()
+            raise Exception(f"Não foi possível carregar os dados do banco de dados.\nErro: {e}")
+
+    if telemetria is not None:
+        telemetria.tempos['consulta'] = time.perf_counter() - inicio_consulta
+        telemetria.linhas = len(df)
+    return df
+
+def _executar(sql):
+    """Linhas (dicts) de uma consulta na conexão compartilhada; chamar com _lock_conexao."""
+    cursor = obter_conexao().cursor()
+    try:
+        cursor.execute(sql)
+        nomes = [coluna[0] for coluna in cursor.description]
+        return [dict(zip(nomes, linha)) for linha in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def atualizar_armazem(armazem, hoje, linha_id=None):
+    """Traz o armazém (ativos + finalizados hoje) ao estado do banco; devolve quantos pedidos foram lidos.
+
+    Primeiro só (id, versao) do conjunto; depois, por inteiro, os pedidos novos ou com versão diferente.
+    Os finalizados hoje vêm de pedidos_finalizados_dia_tb (mantida por gatilhos, esquema.py): o custo
+    das colunas do dia não cresce com o histórico de concluídos.
+    """
+    filtro_linha = "" if linha_id is None else f" AND p.linha_id = {int(linha_id)}"
+    finalizados = f"{STATUS_ID_CONCLUIDO}, {STATUS_ID_CANCELADO}"
+    with _lock_conexao:
+        try:
+            # Partes disjuntas: a fila ativa (ix_pedidos_ativos) e os finalizados do dia (tabela própria)
+            versoes = _executar(f"""
+                SELECT p.id, p.versao FROM pedidos_tb p WHERE p.status_id NOT IN ({finalizados}){filtro_linha}
+                UNION ALL
+                SELECT p.id, p.versao FROM pedidos_finalizados_dia_tb f JOIN pedidos_tb p ON p.id = f.pedido_id
+                WHERE f.dia = '{hoje.isoformat()}' AND p.status_id IN ({finalizados}){filtro_linha}
+            """)
+            ids = armazem.desatualizados({linha['id']: linha['versao'] for linha in versoes})
+            if ids:
+                armazem.atualizar(_executar(f"{SQL_PEDIDOS} WHERE p.id IN ({', '.join(str(int(i)) for i in ids)})"))
+        except Exception as e:
+            descartar_conexao()
+            raise Exception(f"Não foi possível carregar os dados do banco de dados.\nErro: {e}")
+    return len(ids)
+
+def inicio_historico(hoje, calendario=None):
+    """Primeiro dia olhado pelas métricas (mês anterior), pelo gráfico (4 semanas) e pela previsão."""
+    calendario = calendario or obter_calendario()
+    inicio_mes_anterior = (hoje.replace(day=1) - timedelta(days=1)).replace(day=1)
+    inicio_grafico = hoje - timedelta(days=hoje.weekday() + 21)
+    inicio_previsao = calendario.somar_dias_uteis(hoje, -JANELA_DIAS_UTEIS).astype(object)
+    return min(inicio_mes_anterior, inicio_grafico, inicio_previsao)
+
+def consultar_historico_diario(hoje, linha_id=None, calendario=None):
+    """Pedidos e unidades concluídos por dia, de inicio_historico até ontem (hoje vem do armazém)."""
+    filtro_linha = "" if linha_id is None else f" AND p.linha_id = {int(linha_id)}"
+    with _lock_conexao:
+        try:
+            linhas = _executar(f"""
+                SELECT p.dia_conclusao AS dia, COUNT(*) AS pedidos, COALESCE(SUM(p.quantidade), 0) AS quantidade
+                FROM pedidos_tb p
+                WHERE p.status_id = {STATUS_ID_CONCLUIDO}
+                  AND p.dia_conclusao >= '{inicio_historico(hoje, calendario).isoformat()}'
+                  AND p.dia_conclusao < '{hoje.isoformat()}'{filtro_linha}
+                GROUP BY p.dia_conclusao
+            """)
+        except Exception as e:
+            descartar_conexao()
+            raise Exception(f"Não foi possível carregar o histórico de produção.\nErro: {e}")
+    diario = pd.DataFrame(linhas, columns=['dia', 'pedidos', 'quantidade'])
+    return diario.set_index(pd.to_datetime(diario.pop('dia')))
+
+def processar_dados(df, telemetria=None):
+    """Separa o DataFrame bruto nas visões usadas pelo painel (fila, concluídos e cancelados do dia)."""
+    inicio_processamento = time.perf_counter()
+    if df.empty:
+        logger.warning("O banco de dados não retornou nenhum pedido.")
+        expected_columns = [
+            COLUNA_PEDIDO_ID, 'status_id', COLUNA_EQUIPAMENTO, COLUNA_PV, COLUNA_SERVICO,
+            COLUNA_STATUS, COLUNA_DATA_STATUS, COLUNA_QTD, COLUNA_URGENTE, COLUNA_DATA_CONCLUSAO, COLUNA_DIA_CONCLUSAO
+        ]
+        empty_df = pd.DataFrame(columns=expected_columns)
+        return empty_df.copy(), empty_df.copy(), empty_df.copy(), empty_df.copy(), (0,0,0,0,0,0), (0,0,0,0,0,0)
+
+    # --- Processamento dos dados ---
+    df_full = df.copy()
+    
+    # Datas (objetos date do driver) viram datetime64 sem fuso; os timestamps ficam como vieram
+    df_full[COLUNA_DIA_CONCLUSAO] = pd.to_datetime(df_full[COLUNA_DIA_CONCLUSAO])
+    df_full[COLUNA_STATUS] = df_full[COLUNA_STATUS].astype(str).str.strip()
+    df_full.rename(columns={COLUNA_URGENTE: 'is_urgent'}, inplace=True, errors='ignore')
+    
+    # --- CORREÇÃO 2: Usar IDs numéricos para toda a filtragem de status ---
+    hoje = pd.Timestamp(datetime.now(TZ).date())
+
+    df_finalizados = df_full[df_full[COLUNA_DIA_CONCLUSAO] == hoje]
+
+    df_concluidos_dia = df_finalizados[
+        df_finalizados['status_id'] == STATUS_ID_CONCLUIDO
+    ].sort_values(by=COLUNA_DATA_CONCLUSAO, ascending=False)
+    
+    df_cancelados_dia = df_finalizados[
+        df_finalizados['status_id'] == STATUS_ID_CANCELADO
+    ].sort_values(by=COLUNA_DATA_CONCLUSAO, ascending=False)
+    
+    # DataFrame principal agora é filtrado por ID, o que é mais seguro
+    status_finalizados_ids_lista = [STATUS_ID_CONCLUIDO, STATUS_ID_CANCELADO]
+    df_principal = df_full[~df_full['status_id'].isin(status_finalizados_ids_lista)].copy()
+    
+    if not df_principal.empty:
+        df_principal = df_principal.reset_index(drop=True)
+        df_principal['Prioridade_Display'] = df_principal.index + 1
+
+    # Cálculos de totais continuam funcionando, pois dependem dos DataFrames já corrigidos
+    is_teravix_concluido = df_concluidos_dia[COLUNA_PV].astype(str).str.contains('TERAVIX', na=False, case=False)
+    teravix_concluidos_qtd = df_concluidos_dia.loc[is_teravix_concluido, COLUNA_QTD].sum()
+    pv_concluidos_qtd = df_concluidos_dia.loc[~is_teravix_concluido, COLUNA_QTD].sum()
+    totais_concluidos = (len(df_concluidos_dia[is_teravix_concluido]), len(df_concluidos_dia[~is_teravix_concluido]), len(df_concluidos_dia),
+                         teravix_concluidos_qtd, pv_concluidos_qtd, df_concluidos_dia[COLUNA_QTD].sum())
+
+    is_teravix_cancelado = df_cancelados_dia[COLUNA_PV].astype(str).str.contains('TERAVIX', na=False, case=False)
+    teravix_cancelados_qtd = df_cancelados_dia.loc[is_teravix_cancelado, COLUNA_QTD].sum()
+    pv_cancelados_qtd = df_cancelados_dia.loc[~is_teravix_cancelado, COLUNA_QTD].sum()
+    totais_cancelados = (len(df_cancelados_dia[is_teravix_cancelado]), len(df_cancelados_dia[~is_teravix_cancelado]), len(df_cancelados_dia),
+                         teravix_cancelados_qtd, pv_cancelados_qtd, df_cancelados_dia[COLUNA_QTD].sum())
+
+    if telemetria is not None:
+        telemetria.tempos['processamento'] = time.perf_counter() - inicio_processamento
+    return df_full, df_principal, df_concluidos_dia, df_cancelados_dia, totais_concluidos, totais_cancelados
+
+
+def resumo_diario(df_full):
+    """Pedidos e unidades concluídos por dia de produção (índice datetime64), a partir do df processado."""
+    concluidos = df_full[(df_full['status_id'] == STATUS_ID_CONCLUIDO) & df_full[COLUNA_DIA_CONCLUSAO].notna()]
+    diario = concluidos.groupby(COLUNA_DIA_CONCLUSAO)[COLUNA_QTD].agg(pedidos='size', quantidade='sum')
+    diario.index.name = 'dia'
+    return diario
+
+def calcular_metricas_dashboard(diario, calendario=None):
+    if diario.empty:
+        return {"total_mes_atual": 0, "total_mes_atual_qtd": 0, "media_diaria_atual": 0, "media_diaria_qtd": 0,
+                "total_mes_anterior": 0, "media_diaria_anterior": 0,
+                "recorde_dia_valor": 0, "recorde_dia_data": "N/A", "recorde_dia_qtd": 0}
+
+    calendario = calendario or obter_calendario()
+    hoje = pd.Timestamp(datetime.now(TZ).date())
+    inicio_mes_atual = hoje.replace(day=1)
+    dias = diario.index
+    
+    diario_mes_atual = diario[(dias >= inicio_mes_atual) & (dias <= hoje)]
+    
+    total_mes_atual_pedidos = diario_mes_atual['pedidos'].sum()
+    total_mes_atual_qtd = diario_mes_atual['quantidade'].sum()
+    dias_uteis_mes_atual = calendario.dias_uteis(inicio_mes_atual.date(), hoje.date() + timedelta(days=1))
+    media_diaria_atual = total_mes_atual_pedidos / dias_uteis_mes_atual if dias_uteis_mes_atual > 0 else 0
+    media_diaria_qtd = total_mes_atual_qtd / dias_uteis_mes_atual if dias_uteis_mes_atual > 0 else 0
+    
+    fim_mes_anterior = inicio_mes_atual - timedelta(days=1); inicio_mes_anterior = fim_mes_anterior.replace(day=1)
+    total_mes_anterior = diario[(dias >= inicio_mes_anterior) & (dias <= fim_mes_anterior)]['pedidos'].sum()
+    dias_uteis_mes_anterior = calendario.dias_uteis(inicio_mes_anterior.date(), inicio_mes_atual.date())
+    media_diaria_anterior = total_mes_anterior / dias_uteis_mes_anterior if dias_uteis_mes_anterior > 0 else 0
+    
+    recorde_dia_valor = 0; recorde_dia_data = "N/A"; recorde_dia_qtd = 0
+    if not diario_mes_atual.empty:
+        recorde_dia_data_obj = diario_mes_atual['pedidos'].idxmax()
+        recorde_dia_valor = diario_mes_atual.at[recorde_dia_data_obj, 'pedidos']
+        recorde_dia_data = recorde_dia_data_obj.strftime('%d/%m/%Y')
+        recorde_dia_qtd = diario_mes_atual.at[recorde_dia_data_obj, 'quantidade']
+            
+    return {"total_mes_atual": total_mes_atual_pedidos, "total_mes_atual_qtd": total_mes_atual_qtd, "media_diaria_atual": media_diaria_atual, "media_diaria_qtd": media_diaria_qtd,
+            "total_mes_anterior": total_mes_anterior, "media_diaria_anterior": media_diaria_anterior,
+            "recorde_dia_valor": recorde_dia_valor, "recorde_dia_data": recorde_dia_data, "recorde_dia_qtd": recorde_dia_qtd}
+
+def calcular_dados_grafico(diario):
+    if diario.empty:
+        return []
+
+    inicio_da_semana = diario.index - pd.to_timedelta(diario.index.weekday, unit='D')
+    semanal = diario['quantidade'].groupby(inicio_da_semana.date).sum()
+    hoje = datetime.now(TZ).date()
+    semanas_recentes = pd.to_datetime(pd.date_range(end=hoje, periods=4, freq='W-MON')).date
+    semanal = semanal.reindex(semanas_recentes, fill_value=0)
+    
+    return list(semanal.items())
+
+
+# --- VIEW-MODEL DO PAINEL (independente de Qt; também publicado pelo servidor_painel.py) ---
+def _numero(valor):
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return 0
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+def _item_lista(row):
+    return {"id": int(row[COLUNA_PEDIDO_ID]), "pv": str(row[COLUNA_PV]),
+            "qtd": _numero(row[COLUNA_QTD]), "urgente": bool(row.get('is_urgent', False))}
+
+def _secao(df, capacidade):
+    return {"itens": [_item_lista(row) for row in df.head(capacidade).to_dict('records')], "total": len(df)}
+
+def particionar_secoes(df_principal, status, nos_cards, layout):
+    """Distribui a fila pelas seções do layout numa só passada, guardando só o top-K de cada uma.
+
+    Cada pedido vai para a seção do seu status (na ordem de prioridade de `df_principal`);
+    seções com `sem_cards` pulam os pedidos que já estão nos cards. K é o limite da seção no
+    layout: a capacidade, ou a lista toda nas seções paginadas.
+    """
+    codigos = status.map(layout.indice_por_status).fillna(-1).to_numpy(dtype=np.int64)
+    na_secao = codigos >= 0
+    sem_cards = np.array(layout.sem_cards, dtype=bool)
+    na_secao[na_secao] = ~(sem_cards[codigos[na_secao]] & nos_cards.to_numpy()[na_secao])
+    codigos = codigos[na_secao]
+
+    totais = np.bincount(codigos, minlength=len(layout.secoes))
+    posicao = pd.Series(codigos).groupby(codigos, sort=False).cumcount().to_numpy()
+    manter = posicao < np.array(layout.limites, dtype=np.int64)[codigos]
+
+    secoes = [{"itens": [], "total": int(total)} for total in totais]
+    selecionados = df_principal.iloc[np.flatnonzero(na_secao)[manter]]
+    for codigo, row in zip(codigos[manter], selecionados.to_dict('records')):
+        secoes[codigo]["itens"].append(_item_lista(row))
+    return {secao["id"]: conteudo for secao, conteudo in zip(layout.secoes, secoes)}
+
+def calcular_previsao(diario, df_fila, produzido_hoje, previsao=None, calendario=None):
+    """Projeta o término de cada pedido da fila (em ordem de prioridade) pela taxa recente."""
+    previsao = previsao or PrevisaoFila()
+    calendario = calendario or obter_calendario()
+    hoje = np.datetime64(datetime.now(TZ).date(), 'D')
+    taxa = 0.0
+    if not diario.empty:
+        taxa = taxa_diaria(diario.index.to_numpy(dtype='datetime64[D]'), diario['quantidade'].to_numpy(dtype=float), hoje,
+                            calendario=calendario)
+    previsao.atualizar(df_fila[COLUNA_PEDIDO_ID].to_numpy(), df_fila[COLUNA_QTD].to_numpy(dtype=float),
+                       taxa, hoje, float(produzido_hoje), calendario)
+    return previsao, taxa
+
+def montar_view_model(df, telemetria=None, previsao=None, linha=None, historico=None, layout=None):
+    """Transforma o resultado bruto da consulta em tudo que a tela precisa (JSON-serializável).
+
+    `previsao` (PrevisaoFila) pode ser mantida entre ciclos para recalcular só o que mudou.
+    `linha` ({id, nome, meta_semanal}) identifica o painel de uma linha; sem ela, todas as linhas.
+    `historico` (consultar_historico_diario) traz os concluídos por dia até ontem; com ele, `df`
+    só precisa dos ativos e finalizados hoje (ArmazemPedidos). Sem ele, o histórico sai do próprio `df`.
+    `layout` (LayoutPainel) define seções e capacidades; sem ele, o de dados/layout_painel.json.
+    """
+    layout = layout or obter_layout()
+    df_full, df_principal, df_concluidos, df_cancelados, totais_concluidos, totais_cancelados = processar_dados(df, telemetria)
+    inicio = time.perf_counter()
+    if historico is None:
+        diario = resumo_diario(df_full)
+    else:
+        diario = pd.concat([d for d in (historico, resumo_diario(df_concluidos)) if not d.empty] or [historico])
+
+    status = df_principal[COLUNA_STATUS].str.lower()
+    # Fila de produção: tudo que pode ser montado, em ordem de prioridade (os cards são o começo dela)
+    df_fila = df_principal[~status.isin(layout.fora_da_fila)]
+    df_prioridades = df_fila.head(layout.qtd_cards)
+    nos_cards = df_principal[COLUNA_PEDIDO_ID].isin(df_prioridades[COLUNA_PEDIDO_ID])
+    # Um só calendário por ciclo (o mesmo objeto em cache enquanto o arquivo não mudar)
+    calendario = obter_calendario()
+    previsao, taxa = calcular_previsao(diario, df_fila, totais_concluidos[5], previsao, calendario)
+
+    cards = []
+    for posicao, (_, row) in enumerate(df_prioridades.iterrows()):
+        card = _item_lista(row)
+        card.update({"prioridade": int(row['Prioridade_Display']), "status": str(row[COLUNA_STATUS]),
+                     "servico": str(row[COLUNA_SERVICO]), "equipamento": str(row[COLUNA_EQUIPAMENTO]),
+                     "imagem": 'N/A' if pd.isna(row.get(COLUNA_IMAGEM)) else str(row[COLUNA_IMAGEM]),
+                     "previsao": data_iso(previsao.termino[posicao])})
+        cards.append(card)
+
+    listas = particionar_secoes(df_principal, status, nos_cards, layout)
+    finalizados = {"concluidos": (df_concluidos, totais_concluidos), "cancelados": (df_cancelados, totais_cancelados)}
+    laterais = {}
+    for lateral in layout.laterais:
+        df_lateral, totais = finalizados[lateral["id"]]
+        laterais[lateral["id"]] = dict(_secao(df_lateral, layout.capacidade_lateral(lateral["id"])),
+                                       totais=[_numero(v) for v in totais])
+
+    metricas = {chave: _numero(valor) for chave, valor in calcular_metricas_dashboard(diario, calendario).items()}
+    grafico = [{"inicio": semana.isoformat(), "valor": int(valor)} for semana, valor in calcular_dados_grafico(diario)]
+
+    if telemetria is not None:
+        telemetria.tempos['metricas'] = time.perf_counter() - inicio
+    return {"linhas": len(df), "cards": cards, "listas": listas, "laterais": laterais,
+            "metricas": metricas, "grafico": grafico,
+            "meta_semanal": linha["meta_semanal"] if linha else META_SEMANAL,
+            "linha": {"id": linha["id"], "nome": linha["nome"]} if linha else None,
+            "previsao": {"taxa_diaria": round(taxa, 1), "janela_dias_uteis": JANELA_DIAS_UTEIS,
+                         "termino_fila": data_iso(previsao.termino[-1]) if len(previsao.termino) else None}}
+
+# --- FONTES DE DADOS DO PAINEL ---
+class FonteBanco:
+    """Consulta o PostgreSQL diretamente (um painel = uma conexão).
+
+    Com `linha` (id ou nome), só os pedidos dessa linha são lidos e a meta é a da linha.
+    """
+
+    def __init__(self, linha=None):
+        self.linha_pedida = linha
+        self.linha = None
+        self.caminho_snapshot = _caminho_snapshot(linha)
+        self.corpo_snapshot = None
+        self.armazem = ArmazemPedidos()
+        # (hoje, linha_id, DataFrame de consultar_historico_diario): relido na virada do dia
+        self.historico = None
+        self.recarregado_em = time.monotonic()
+        self.dados_desde = None
+        self.previsao = PrevisaoFila()
+
+    def obter(self, telemetria=None):
+        if self.linha_pedida is not None:
+            # Relida a cada ciclo (uma linha de linha_td): nome e meta podem mudar sem reiniciar o painel
+            self.linha = consultar_linha(self.linha['id'] if self.linha else self.linha_pedida)
+        linha_id = self.linha['id'] if self.linha else None
+        if time.monotonic() - self.recarregado_em > INTERVALO_RECARGA_S:
+            self.armazem, self.historico, self.recarregado_em = ArmazemPedidos(), None, time.monotonic()
+
+        inicio_consulta = time.perf_counter()
+        hoje = datetime.now(TZ).date()
+        lidos = atualizar_armazem(self.armazem, hoje, linha_id)
+        if self.historico is None or self.historico[:2] != (hoje, linha_id):
+            self.historico = (hoje, linha_id, consultar_historico_diario(hoje, linha_id))
+        if telemetria is not None:
+            telemetria.tempos['consulta'] = time.perf_counter() - inicio_consulta
+            telemetria.linhas = lidos
+        logger.debug("Armazém: %d pedidos, %d lidos neste ciclo.", len(self.armazem), lidos)
+
+        vm = montar_view_model(self.armazem.para_dataframe(), telemetria, self.previsao, self.linha, self.historico[2])
+        corpo = serializar_view_model(vm)
+        if corpo != self.corpo_snapshot:
+            _gravar_atomico(self.caminho_snapshot, lambda destino: _escrever_bytes(destino, corpo))
+            self.corpo_snapshot = corpo
+        self.dados_desde = datetime.now(TZ)
+        return vm
+
+    def snapshot(self):
+        return carregar_snapshot(self.caminho_snapshot, self.linha_pedida)
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import logging
+import urllib.parse
+import urllib.request
+import urllib.error
+from datetime import datetime
+
+# Configuração, snapshot e fontes do painel que não dependem de pandas/NumPy/psycopg2.
+# O prioridades.py importa só este módulo para abrir a janela; o painel_dados.py (consulta ao
+# banco e cálculo do view-model) é importado na primeira consulta, fora da thread da tela.
+logger = logging.getLogger("painel.dados")
+
+# --- TIMEZONE / BRASÍLIA ---
+TIMEZONE_NAME = "America/Sao_Paulo"
+try:
+    from zoneinfo import ZoneInfo
+    TZ = ZoneInfo(TIMEZONE_NAME)
+except ImportError:
+    import pytz
+    TZ = pytz.timezone(TIMEZONE_NAME)
+
+# --- CONFIGURAÇÃO GERAL ---
+# Meta usada quando o painel mostra todas as linhas (cada linha tem a sua em linha_td)
+META_SEMANAL = 200
+
+# --- MODO OFFLINE: ÚLTIMO SNAPSHOT VÁLIDO E RECONEXÃO ---
+SNAPSHOT_PATH = os.environ.get('PAINEL_SNAPSHOT', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados', 'painel_snapshot'))
+INTERVALO_ATUALIZACAO_MS = 10000
+BACKOFF_BASE_MS = 2000
+BACKOFF_MAX_MS = 5 * 60 * 1000
+# Sem atualização há mais que isso, o painel marca os dados como desatualizados
+DADOS_VELHOS_APOS_S = 3 * INTERVALO_ATUALIZACAO_MS / 1000
+TIMEOUT_SERVIDOR_S = 5
+
+
+# --- SNAPSHOT LOCAL (último view-model em JSON) ---
+def _sufixo_linha(linha):
+    return '' if linha is None else '_linha_' + ''.join(c if c.isalnum() else '_' for c in str(linha))
+
+def _caminho_snapshot(linha=None):
+    return SNAPSHOT_PATH + _sufixo_linha(linha) + '.json'
+
+def _gravar_atomico(caminho, escrever):
+    temporario = caminho + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        escrever(temporario)
+        os.replace(temporario, caminho)
+    except Exception:
+        logger.exception("Não foi possível salvar o snapshot em %s", caminho)
+
+def _escrever_bytes(caminho, conteudo):
+    with open(caminho, 'wb') as f:
+        f.write(conteudo)
+
+def carregar_snapshot(caminho, linha=None):
+    """Retorna (view-model, datetime da gravação) do último snapshot, ou (None, None)."""
+    if not os.path.exists(caminho):
+        return None, None
+    try:
+        with open(caminho, 'rb') as f:
+            vm = json.load(f)
+    except Exception:
+        logger.exception("Snapshot inválido em %s; ignorando.", caminho)
+        return None, None
+    if vm.get('linha') is None and linha is not None:
+        # Ainda sem banco: mostra a linha pelo que foi pedido
+        vm['linha'] = {"id": None, "nome": str(linha)}
+    return vm, datetime.fromtimestamp(os.path.getmtime(caminho), TZ)
+
+def serializar_view_model(vm):
+    return json.dumps(vm, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# --- FONTES DE DADOS DO PAINEL ---
+class FonteBancoAdiada:
+    """FonteBanco (painel_dados.py) criada só na primeira consulta.
+
+    O snapshot é só um JSON; pandas, NumPy e psycopg2 são importados quando `obter` roda pela
+    primeira vez, já com a janela na tela.
+    """
+
+    def __init__(self, linha=None):
+        self.linha_pedida = linha
+        self.caminho_snapshot = _caminho_snapshot(linha)
+        self.fonte = None
+
+    @property
+    def dados_desde(self):
+        return self.fonte.dados_desde if self.fonte else None
+
+    def obter(self, telemetria=None):
+        if self.fonte is None:
+            from painel_dados import FonteBanco
+            self.fonte = FonteBanco(self.linha_pedida)
+        return self.fonte.obter(telemetria)
+
+    def snapshot(self):
+        return carregar_snapshot(self.caminho_snapshot, self.linha_pedida)
+
+
+class FonteServidor:
+    """Assina o view-model publicado pelo servidor_painel.py; o banco não é acessado."""
+
+    def __init__(self, url_base, linha=None):
+        self.url = url_base.rstrip('/') + '/api/painel'
+        if linha is not None:
+            self.url += '?' + urllib.parse.urlencode({'linha': linha})
+        self.caminho_snapshot = _caminho_snapshot(linha)
+        self.etag = None
+        self.dados_desde = None
+
+    def obter(self, telemetria=None):
+        """Retorna o view-model novo, ou None se nada mudou desde a última chamada (HTTP 304)."""
+        inicio = time.perf_counter()
+        cabecalhos = {'If-None-Match': self.etag} if self.etag else {}
+        try:
+            with urllib.request.urlopen(urllib.request.Request(self.url, headers=cabecalhos), timeout=TIMEOUT_SERVIDOR_S) as resp:
+                corpo = resp.read()
+                self.etag = resp.headers.get('ETag')
+                self._registrar_atualizacao(resp.headers)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                self._registrar_atualizacao(e.headers)
+                return None
+            raise Exception(f"Servidor do painel respondeu HTTP {e.code}")
+        except (urllib.error.URLError, OSError) as e:
+            raise Exception(f"Não foi possível contatar o servidor do painel ({self.url}): {e}")
+        finally:
+            if telemetria is not None:
+                telemetria.tempos['consulta'] = time.perf_counter() - inicio
+
+        vm = json.loads(corpo)
+        if telemetria is not None:
+            telemetria.linhas = vm.get('linhas', 0)
+        _gravar_atomico(self.caminho_snapshot, lambda destino: _escrever_bytes(destino, corpo))
+        return vm
+
+    def _registrar_atualizacao(self, cabecalhos):
+        atualizado_em = cabecalhos.get('X-Painel-Atualizado-Em')
+        self.dados_desde = datetime.fromisoformat(atualizado_em) if atualizado_em else datetime.now(TZ)
+
+    def snapshot(self):
+        return carregar_snapshot(self.caminho_snapshot)
+
+
+def criar_fonte(url_servidor=None, linha=None):
+    url_servidor = url_servidor or os.environ.get('PAINEL_SERVIDOR_URL')
+    linha = linha or os.environ.get('PAINEL_LINHA') or None
+    return FonteServidor(url_servidor, linha) if url_servidor else FonteBancoAdiada(linha)
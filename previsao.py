@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+
+from calendario import obter_calendario
+
+# Previsão de término da fila: a taxa recente de conclusão (máquinas por dia útil) é aplicada
+# à quantidade acumulada da fila em ordem de prioridade, tudo vetorizado em numpy.
+# Dias úteis seguem o calendário de produção (feriados e paradas), o mesmo das métricas do painel.
+JANELA_DIAS_UTEIS = int(os.environ.get('PREVISAO_JANELA_DIAS', '20'))
+
+_SEM_DATA = np.datetime64('NaT', 'D')
+
+
+def taxa_diaria(dias_conclusao, quantidades, hoje, janela=JANELA_DIAS_UTEIS, calendario=None):
+    """Máquinas concluídas por dia útil nos `janela` dias úteis anteriores a hoje.
+
+    `dias_conclusao` é um array datetime64[D] (NaT para pedidos não concluídos); hoje fica de
+    fora porque ainda está em andamento.
+    """
+    calendario = calendario or obter_calendario()
+    inicio = calendario.somar_dias_uteis(hoje, -janela)
+    no_periodo = (dias_conclusao >= inicio) & (dias_conclusao < hoje)
+    return float(np.nansum(quantidades[no_periodo])) / janela
+
+
+def _datas_termino(acumulado, taxa, hoje, produzido_hoje, calendario):
+    # Dia útil (0 = hoje) em que o acumulado da fila, somado ao já feito hoje, é atingido
+    dias = np.maximum(np.ceil((acumulado + produzido_hoje) / taxa) - 1, 0).astype(np.int64)
+    return calendario.somar_dias_uteis(hoje, dias)
+
+
+class PrevisaoFila:
+    """Projeção de término por pedido, recalculada só a partir do primeiro pedido que mudou.
+
+    Se a taxa, o dia, o total já produzido hoje ou o calendário mudarem, a fila inteira é recalculada (o custo
+    é o mesmo de uma soma acumulada); caso contrário, os pedidos anteriores à primeira diferença
+    (id ou quantidade) mantêm a projeção anterior.
+    """
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.quantidades = np.empty(0, dtype=float)
+        self.acumulado = np.empty(0, dtype=float)
+        self.termino = np.empty(0, dtype='datetime64[D]')
+        self.parametros = None
+        self.recalculados = 0
+
+    def atualizar(self, ids, quantidades, taxa, hoje, produzido_hoje=0, calendario=None):
+        calendario = calendario or obter_calendario()
+        ids = np.asarray(ids, dtype=np.int64)
+        quantidades = np.nan_to_num(np.asarray(quantidades, dtype=float))
+        parametros = (taxa, hoje, produzido_hoje, calendario)
+
+        inicio = 0
+        if parametros == self.parametros:
+            n = min(len(ids), len(self.ids))
+            diferentes = np.flatnonzero((ids[:n] != self.ids[:n]) | (quantidades[:n] != self.quantidades[:n]))
+            inicio = int(diferentes[0]) if diferentes.size else n
+
+        base = self.acumulado[inicio - 1] if inicio > 0 else 0.0
+        acumulado = base + np.cumsum(quantidades[inicio:])
+        if taxa > 0:
+            termino = _datas_termino(acumulado, taxa, hoje, produzido_hoje, calendario)
+        else:
+            termino = np.full(len(acumulado), _SEM_DATA)
+
+        self.acumulado = np.concatenate([self.acumulado[:inicio], acumulado])
+        self.termino = np.concatenate([self.termino[:inicio], termino])
+        self.ids, self.quantidades, self.parametros = ids, quantidades, parametros
+        self.recalculados = len(ids) - inicio
+        return self.termino
+
+
+def data_iso(termino):
+    return None if np.isnat(termino) else str(termino)
@@ -2,248 +2,35 @@ import sys
 import os
 import locale
 import random
-import pandas as pd
-import psycopg2
-from datetime import datetime, timedelta
-import numpy as np
-import time
-import traceback
+import argparse
+import threading
+from datetime import datetime, timedelta, date
+import logging
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QFrame, QProgressBar, QSizePolicy, QPushButton, QGridLayout)
 from PySide6.QtGui import QFont, QKeyEvent
-from PySide6.QtCore import QTimer, Qt
-
-# --- TIMEZONE / BRASÍLIA ---
-TIMEZONE_NAME = "America/Sao_Paulo"
-try:
-    from zoneinfo import ZoneInfo
-    TZ = ZoneInfo(TIMEZONE_NAME)
-except ImportError:
-    import pytz
-    TZ = pytz.timezone(TIMEZONE_NAME)
-
-def to_brasilia(series):
-    s = pd.to_datetime(series, errors='coerce')
-    try:
-        if s.dt.tz is None:
-            s = s.dt.tz_localize('UTC').dt.tz_convert(TZ)
-        else:
-            s = s.dt.tz_convert(TZ)
-    except Exception:
-        s = pd.to_datetime(series, errors='coerce')
-    return s
-
-# --- CONFIGURAÇÃO GERAL E DE DADOS ---
-SCALE_FACTOR = 0.8
-META_SEMANAL = 200
-
-# --- NOVAS CONFIGURAÇÕES DE BANCO DE DADOS POSTGRESQL ---
-DB_HOST = "localhost"
-DB_NAME = "pedidos_db"
-DB_USER = "postgres"
-DB_PASSWORD = "2025"
-
-# --- CONSTANTES DE COLUNAS E STATUS ---
-COLUNA_PEDIDO_ID, COLUNA_PV, COLUNA_SERVICO, COLUNA_STATUS, COLUNA_DATA_STATUS, COLUNA_QTD, COLUNA_EQUIPAMENTO, COLUNA_URGENTE, COLUNA_DATA_CONCLUSAO, COLUNA_IMAGEM = \
-    'id', 'pv', 'descricao_servico', 'nome_status', 'data_criacao', 'quantidade', 'equipamento', 'urgente', 'data_conclusao', 'image'
-    
-STATUS_PENDENTE, STATUS_BACKLOG, STATUS_AGUARDANDO_CHEGADA, STATUS_EM_MONTAGEM, STATUS_CONCLUIDO, STATUS_CANCELADO, STATUS_URGENTE = \
-    'Pendente', 'Backlog', 'Aguardando Chegada', 'Em Montagem', 'Concluído', 'Cancelado', 'Urgente'
-
-
-# --- CONEXÃO COM O BANCO DE DADOS POSTGRESQL ---
-def get_db_connection():
-    """Cria e retorna uma conexão com o banco de dados PostgreSQL."""
-    try:
-        conn = psycopg2.connect(
-            host=DB_HOST,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            client_encoding='utf8'
-        )
-        return conn
-    except psycopg2.Error as e:
-        raise Exception(f"Erro ao conectar ao banco de dados: {e}")
-
-# --- LÓGICA DE DADOS REESCRITA E CORRIGIDA ---
-def carregar_dados():
-    """Carrega todos os dados diretamente do banco de dados PostgreSQL."""
-    print(f"Carregando dados do banco de dados: {DB_NAME}...")
-    conn = None
-    try:
-        conn = get_db_connection()
-        # CORREÇÃO 1: Adicionado p.status_id à consulta para permitir filtragem numérica
-        query = f"""
-            SELECT 
-                p.id AS "{COLUNA_PEDIDO_ID}",
-                p.status_id,
-                p.equipamento AS "{COLUNA_EQUIPAMENTO}",
-                p.pv AS "{COLUNA_PV}",
-                p.descricao_servico AS "{COLUNA_SERVICO}",
-                s.nome_status AS "{COLUNA_STATUS}",
-                p.data_criacao AS "{COLUNA_DATA_STATUS}",
-                p.quantidade AS "{COLUNA_QTD}",
-                p.urgente AS "{COLUNA_URGENTE}",
-                p.data_conclusao AS "{COLUNA_DATA_CONCLUSAO}",
-                i.nome AS "{COLUNA_IMAGEM}"
-            FROM 
-                pedidos_tb p
-            JOIN
-                status_td s ON p.status_id = s.id
-            LEFT JOIN                               
-                imagem_td i ON p.imagem_id = i.id 
-            ORDER BY
-                p.urgente DESC, p.prioridade ASC;
-            """
-        df = pd.read_sql(query, conn)
-        print("Dados brutos carregados do banco de dados:")
-        print(df.head())
-        
-    except Exception as e:
-        raise Exception(f"Não foi possível carregar os dados do banco de dados.\nErro: {e}")
-    finally:
-        if conn:
-            conn.close()
-
-    if df.empty:
-        print("AVISO: O banco de dados não retornou nenhum pedido.")
-        expected_columns = [
-            COLUNA_PEDIDO_ID, COLUNA_EQUIPAMENTO, COLUNA_PV, COLUNA_SERVICO,
-            COLUNA_STATUS, COLUNA_DATA_STATUS, COLUNA_QTD, COLUNA_URGENTE, COLUNA_DATA_CONCLUSAO
-        ]
-        empty_df = pd.DataFrame(columns=expected_columns)
-        return empty_df.copy(), empty_df.copy(), empty_df.copy(), empty_df.copy(), (0,0,0,0,0,0), (0,0,0,0,0,0)
-
-    # --- Processamento dos dados ---
-    df_full = df.copy()
-    
-    df_full[COLUNA_DATA_STATUS] = to_brasilia(df_full[COLUNA_DATA_STATUS])
-    df_full[COLUNA_DATA_CONCLUSAO] = to_brasilia(df_full[COLUNA_DATA_CONCLUSAO])
-    df_full[COLUNA_STATUS] = df_full[COLUNA_STATUS].astype(str).str.strip()
-    df_full.rename(columns={COLUNA_URGENTE: 'is_urgent'}, inplace=True, errors='ignore')
-    
-    # --- CORREÇÃO 2: Usar IDs numéricos para toda a filtragem de status ---
-    STATUS_ID_CONCLUIDO = 4
-    STATUS_ID_CANCELADO = 6
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+from telemetria import configurar_log, CicloTelemetria, PerfilCiclos
+# Só o módulo leve: pandas/NumPy/psycopg2 (painel_dados.py) entram na primeira consulta, já com a janela na tela
+from painel_fontes import (TZ, META_SEMANAL, INTERVALO_ATUALIZACAO_MS, BACKOFF_BASE_MS, BACKOFF_MAX_MS,
+                          DADOS_VELHOS_APOS_S, criar_fonte)
+from layout_painel import obter_layout
 
-    hoje_obj = datetime.now(TZ)
-    inicio_do_dia = hoje_obj.replace(hour=0, minute=0, second=0, microsecond=0)
-    fim_do_dia = hoje_obj.replace(hour=23, minute=59, second=59, microsecond=999999)
+logger = logging.getLogger("painel.tv")
 
-    df_finalizados = df_full.dropna(subset=[COLUNA_DATA_CONCLUSAO]).copy()
-
-    df_concluidos_dia = df_finalizados[
-        (df_finalizados['status_id'] == STATUS_ID_CONCLUIDO) &
-        (df_finalizados[COLUNA_DATA_CONCLUSAO] >= inicio_do_dia) &
-        (df_finalizados[COLUNA_DATA_CONCLUSAO] <= fim_do_dia)
-    ].sort_values(by=COLUNA_DATA_CONCLUSAO, ascending=False)
-    
-    df_cancelados_dia = df_finalizados[
-        (df_finalizados['status_id'] == STATUS_ID_CANCELADO) &
-        (df_finalizados[COLUNA_DATA_CONCLUSAO] >= inicio_do_dia) &
-        (df_finalizados[COLUNA_DATA_CONCLUSAO] <= fim_do_dia)
-    ].sort_values(by=COLUNA_DATA_CONCLUSAO, ascending=False)
-    
-    # DataFrame principal agora é filtrado por ID, o que é mais seguro
-    status_finalizados_ids_lista = [STATUS_ID_CONCLUIDO, STATUS_ID_CANCELADO]
-    df_principal = df_full[~df_full['status_id'].isin(status_finalizados_ids_lista)].copy()
-    
-    if not df_principal.empty:
-        df_principal = df_principal.reset_index(drop=True)
-        df_principal['Prioridade_Display'] = df_principal.index + 1
-
-    # Cálculos de totais continuam funcionando, pois dependem dos DataFrames já corrigidos
-    is_teravix_concluido = df_concluidos_dia[COLUNA_PV].astype(str).str.contains('TERAVIX', na=False, case=False)
-    teravix_concluidos_qtd = df_concluidos_dia.loc[is_teravix_concluido, COLUNA_QTD].sum()
-    pv_concluidos_qtd = df_concluidos_dia.loc[~is_teravix_concluido, COLUNA_QTD].sum()
-    totais_concluidos = (len(df_concluidos_dia[is_teravix_concluido]), len(df_concluidos_dia[~is_teravix_concluido]), len(df_concluidos_dia),
-                         teravix_concluidos_qtd, pv_concluidos_qtd, df_concluidos_dia[COLUNA_QTD].sum())
-
-    is_teravix_cancelado = df_cancelados_dia[COLUNA_PV].astype(str).str.contains('TERAVIX', na=False, case=False)
-    teravix_cancelados_qtd = df_cancelados_dia.loc[is_teravix_cancelado, COLUNA_QTD].sum()
-    pv_cancelados_qtd = df_cancelados_dia.loc[~is_teravix_cancelado, COLUNA_QTD].sum()
-    totais_cancelados = (len(df_cancelados_dia[is_teravix_cancelado]), len(df_cancelados_dia[~is_teravix_cancelado]), len(df_cancelados_dia),
-                         teravix_cancelados_qtd, pv_cancelados_qtd, df_cancelados_dia[COLUNA_QTD].sum())
-
-    return df_full, df_principal, df_concluidos_dia, df_cancelados_dia, totais_concluidos, totais_cancelados
-
-
-def calcular_metricas_dashboard(df_full):
-    if df_full.empty or 'status_id' not in df_full.columns:
-        return {"total_mes_atual": 0, "total_mes_atual_qtd": 0, "media_diaria_atual": 0, "media_diaria_qtd": 0,
-                "total_mes_anterior": 0, "media_diaria_anterior": 0,
-                "recorde_dia_valor": 0, "recorde_dia_data": "N/A", "recorde_dia_qtd": 0}
-
-    # CORREÇÃO 3: Usar ID numérico para filtrar métricas
-    STATUS_ID_CONCLUIDO = 4
-    
-    hoje = datetime.now(TZ)
-    inicio_mes_atual = hoje.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
-    df_concluidos_mes_atual = df_full[
-        (df_full['status_id'] == STATUS_ID_CONCLUIDO) & 
-        (df_full[COLUNA_DATA_CONCLUSAO] >= inicio_mes_atual) & 
-        (df_full[COLUNA_DATA_CONCLUSAO] <= hoje)
-    ]
-    
-    total_mes_atual_pedidos = len(df_concluidos_mes_atual)
-    total_mes_atual_qtd = df_concluidos_mes_atual[COLUNA_QTD].sum()
-    dias_uteis_mes_atual = np.busday_count(inicio_mes_atual.strftime('%Y-%m-%d'), (hoje + timedelta(days=1)).strftime('%Y-%m-%d'))
-    media_diaria_atual = total_mes_atual_pedidos / dias_uteis_mes_atual if dias_uteis_mes_atual > 0 else 0
-    media_diaria_qtd = total_mes_atual_qtd / dias_uteis_mes_atual if dias_uteis_mes_atual > 0 else 0
-    
-    fim_mes_anterior = inicio_mes_atual - timedelta(days=1); inicio_mes_anterior = fim_mes_anterior.replace(day=1)
-    df_concluidos_mes_anterior = df_full[
-        (df_full['status_id'] == STATUS_ID_CONCLUIDO) & 
-        (df_full[COLUNA_DATA_CONCLUSAO] >= inicio_mes_anterior) & 
-        (df_full[COLUNA_DATA_CONCLUSAO] <= fim_mes_anterior)
-    ]
-    dias_uteis_mes_anterior = np.busday_count(inicio_mes_anterior.strftime('%Y-%m-%d'), (fim_mes_anterior + timedelta(days=1)).strftime('%Y-%m-%d'))
-    media_diaria_anterior = len(df_concluidos_mes_anterior) / dias_uteis_mes_anterior if dias_uteis_mes_anterior > 0 else 0
-    
-    recorde_dia_valor = 0; recorde_dia_data = "N/A"; recorde_dia_qtd = 0
-    if not df_concluidos_mes_atual.empty:
-        producao_diaria = df_concluidos_mes_atual.groupby(df_concluidos_mes_atual[COLUNA_DATA_CONCLUSAO].dt.date).size()
-        if not producao_diaria.empty:
-            recorde_dia_valor = producao_diaria.max()
-            recorde_dia_data_obj = producao_diaria.idxmax()
-            recorde_dia_data = recorde_dia_data_obj.strftime('%d/%m/%Y')
-            recorde_dia_qtd = df_concluidos_mes_atual[df_concluidos_mes_atual[COLUNA_DATA_CONCLUSAO].dt.date == recorde_dia_data_obj][COLUNA_QTD].sum()
-            
-    return {"total_mes_atual": total_mes_atual_pedidos, "total_mes_atual_qtd": total_mes_atual_qtd, "media_diaria_atual": media_diaria_atual, "media_diaria_qtd": media_diaria_qtd,
-            "total_mes_anterior": len(df_concluidos_mes_anterior), "media_diaria_anterior": media_diaria_anterior,
-            "recorde_dia_valor": recorde_dia_valor, "recorde_dia_data": recorde_dia_data, "recorde_dia_qtd": recorde_dia_qtd}
-
-def calcular_dados_grafico(df_full):
-    if df_full.empty or 'status_id' not in df_full.columns:
-        return []
-    
-    # CORREÇÃO 4: Usar ID numérico para filtrar dados do gráfico
-    STATUS_ID_CONCLUIDO = 4
-
-    df_concluidos = df_full.dropna(subset=[COLUNA_DATA_CONCLUSAO]).copy()
-    df_concluidos = df_concluidos[df_concluidos['status_id'] == STATUS_ID_CONCLUIDO]
-    if df_concluidos.empty:
-        return []
-
-    datas_conclusao = pd.to_datetime(df_concluidos[COLUNA_DATA_CONCLUSAO])
-    inicio_da_semana = datas_conclusao - pd.to_timedelta(datas_conclusao.dt.weekday, unit='D')
-    df_concluidos['Semana'] = inicio_da_semana.dt.date
-    semanal = df_concluidos.groupby('Semana')[COLUNA_QTD].sum()
-    hoje = datetime.now(TZ).date()
-    semanas_recentes = pd.to_datetime(pd.date_range(end=hoje, periods=4, freq='W-MON')).date
-    semanal = semanal.reindex(semanas_recentes, fill_value=0)
-    
-    return list(semanal.items())
+# --- CONFIGURAÇÃO DA TELA ---
+# Seções, capacidades, alturas e escala vêm do layout (layout_painel.py, dados/layout_painel.json)
 
 # --- STYLESHEET (Folha de Estilos) ---
-STYLESHEET = f"""
+def montar_stylesheet(escala, layout):
+    cores_titulos = "\n".join(f"    #Titulo_{secao['id']} {{ color: {secao['cor']}; border-bottom-color: {secao['cor']}; }}"
+                              for secao in layout.secoes + layout.laterais)
+    return f"""
     QMainWindow {{ background-color: #1C1C1C; }} QLabel {{ color: #E0E0E0; }}
     #Header {{ background-color: #2E2E2E; border-bottom: 2px solid #FF6600; }}
-    #LogoLabel {{ padding: 5px; }} .SectionTitle {{ border-bottom: 2px solid; padding-bottom: 8px; margin-bottom: 10px; }}
-    #PrioridadesTitle, #EmMontagemTitle, #PendentesTitle, #BacklogTitle, #AguardandoChegadaTitle {{ color: #FF6600; border-bottom-color: #FF6600; }}
-    #ConcluidosTitle {{ color: #2ECC71; border-bottom-color: #2ECC71; }} #CanceladosTitle {{ color: #E74C3C; border-bottom-color: #E74C3C; }}
+    #LogoLabel {{ padding: 5px; }} #LinhaLabel {{ color: #FF8C33; padding-left: 15px; }} .SectionTitle {{ border-bottom: 2px solid; padding-bottom: 8px; margin-bottom: 10px; }}
+    #PrioridadesTitle {{ color: #FF6600; border-bottom-color: #FF6600; }}
+{cores_titulos}
     #CounterLabel {{ color: #888888; font-style: italic; padding-top: 10px; }}
     #SideColumnFrame {{ background-color: #252525; border-radius: 8px; }} #ErrorLabel {{ color: #E74C3C; }}
     #Card {{ background-color: #2E2E2E; border: 1px solid #FF6600; border-radius: 8px; padding: 12px; }}
@@ -260,19 +47,34 @@ STYLESHEET = f"""
     QProgressBar#currentWeek::chunk {{ background-color: #FFAA33; }}
     #NotificationLabel {{
         background-color: #2ECC71; color: white; border-radius: 5px;
-        padding: 10px; font-weight: bold; font-size: {int(16 * SCALE_FACTOR)}px;
+        padding: 10px; font-weight: bold; font-size: {int(16 * escala)}px;
     }}
     #NotificationLabel[error="true"] {{
         background-color: #E74C3C;
     }}
+    #StaleBadge {{ background-color: #E67E22; color: #1C1C1C; border-radius: 5px; padding: 4px 10px; }}
+    #DebugOverlay {{
+        background-color: rgba(0, 0, 0, 190); color: #2ECC71; border: 1px solid #2ECC71;
+        padding: 8px; font-family: monospace; font-size: {int(13 * escala)}px;
+    }}
 """
 
+class SinaisCiclo(QObject):
+    # (ciclo, view-model ou None, exceção ou None), emitido pela thread da consulta
+    concluido = Signal(object, object, object)
+
+
 class PainelMtec(QMainWindow):
-    # O restante da classe (toda a parte de UI com PySide6) não precisa de NENHUMA alteração.
-    def __init__(self):
+    # A tela só desenha o view-model; de onde ele vem (banco ou servidor_painel.py) fica a cargo da fonte.
+    def __init__(self, fonte=None, layout_painel=None):
         super().__init__()
+        self.fonte = fonte or criar_fonte()
+        # Lido uma vez: os widgets de cada seção são criados aqui e só têm o texto trocado a cada ciclo
+        self.layout_painel = layout_painel or obter_layout()
+        tela = QApplication.primaryScreen()
+        self.escala = self.layout_painel.fator_escala(tela.geometry().height() if tela else None)
         self.setWindowTitle("Painel de Produção MTEC"); self.setGeometry(100, 100, 1920, 1080);
-        self.setStyleSheet(STYLESHEET)
+        self.setStyleSheet(montar_stylesheet(self.escala, self.layout_painel))
         
         self.font_titulo = QFont("Inter", self.scale(16), QFont.Bold)
         self.font_item = QFont("Inter", self.scale(10))
@@ -284,30 +86,41 @@ class PainelMtec(QMainWindow):
         self.font_kpi_valor = QFont("Inter", self.scale(12), QFont.Bold)
 
         self.main_container = QWidget(); self.error_container = QWidget(); self.is_showing_error = False
+        self.numero_ciclo = 0; self.ultima_telemetria = None; self.consultando = False
+        self.perfil = PerfilCiclos(logger)
+        self.sinais = SinaisCiclo(); self.sinais.concluido.connect(self.concluir_ciclo)
+        self.vm_ultimo = None; self.dados_desde = None; self.falhas_consecutivas = 0
         
         self.setup_ui()
         self.create_persistent_widgets()
         self.setup_online_timer()
-        self.atualizar_dados_e_ui()
+        self.setup_rotacao_timer()
+        self.exibir_snapshot_inicial()
+        # A primeira consulta (que também importa pandas/psycopg2, no modo banco) roda numa thread:
+        # a janela é pintada com o snapshot, ou o esqueleto vazio, sem esperar por ela
+        self.update_timer.start(0)
 
     def scale(self, size):
-        return int(size * SCALE_FACTOR)
+        return int(size * self.escala)
 
     def setup_ui(self):
         self.central_widget = QWidget(); self.setCentralWidget(self.central_widget); layout = QVBoxLayout(self.central_widget); layout.setContentsMargins(0,0,0,0); layout.setSpacing(0)
         self.main_container = QWidget(); self.error_container = QWidget(); self.is_showing_error = False
         main_layout = QVBoxLayout(self.main_container); main_layout.setContentsMargins(0, 0, 0, 0); main_layout.setSpacing(0)
         
-        header = QWidget(); header.setObjectName("Header"); header.setFixedHeight(self.scale(60)); header_layout = QHBoxLayout(header); header_layout.setContentsMargins(20, 0, 20, 0)
+        header = QWidget(); header.setObjectName("Header"); header.setFixedHeight(self.scale(self.layout_painel.altura_cabecalho)); header_layout = QHBoxLayout(header); header_layout.setContentsMargins(20, 0, 20, 0)
         
-        logo_label = QLabel("mtec."); logo_label.setObjectName("LogoLabel"); logo_label.setFont(QFont("Inter", self.scale(22), QFont.Bold)); header_layout.addWidget(logo_label); header_layout.addStretch(); main_layout.addWidget(header)
+        logo_label = QLabel("mtec."); logo_label.setObjectName("LogoLabel"); logo_label.setFont(QFont("Inter", self.scale(22), QFont.Bold)); header_layout.addWidget(logo_label)
+        self.linha_label = QLabel(); self.linha_label.setObjectName("LinhaLabel"); self.linha_label.setFont(QFont("Inter", self.scale(18), QFont.Bold)); header_layout.addWidget(self.linha_label)
+        header_layout.addStretch(); main_layout.addWidget(header)
+        self.stale_badge = QLabel(); self.stale_badge.setObjectName("StaleBadge"); self.stale_badge.setFont(QFont("Inter", self.scale(12), QFont.Bold)); self.stale_badge.hide(); header_layout.addWidget(self.stale_badge)
 
         self.body_widget = QWidget()
         self.body_layout = QHBoxLayout(self.body_widget)
         self.body_layout.setContentsMargins(self.scale(15), self.scale(15), self.scale(15), self.scale(15)); self.body_layout.setSpacing(self.scale(20))
         main_layout.addWidget(self.body_widget, 1)
 
-        dashboard_frame = QFrame(); dashboard_frame.setObjectName("DashboardFrame"); dashboard_frame.setFixedHeight(self.scale(317)); self.dashboard_layout = QHBoxLayout(dashboard_frame); main_layout.addWidget(dashboard_frame)
+        dashboard_frame = QFrame(); dashboard_frame.setObjectName("DashboardFrame"); dashboard_frame.setFixedHeight(self.scale(self.layout_painel.altura_dashboard)); self.dashboard_layout = QHBoxLayout(dashboard_frame); main_layout.addWidget(dashboard_frame)
         self.setup_ui_columns()
         
         error_page_layout = QVBoxLayout(self.error_container); self.error_label = QLabel(); self.error_label.setObjectName("ErrorLabel"); self.error_label.setAlignment(Qt.AlignCenter); self.error_label.setWordWrap(True);
@@ -316,24 +129,25 @@ class PainelMtec(QMainWindow):
 
         self.notification_label = QLabel(self); self.notification_label.setObjectName("NotificationLabel"); self.notification_label.setWordWrap(True); self.notification_label.hide()
 
+        # Overlay de depuração (F12): mostra a telemetria do último ciclo
+        self.debug_overlay = QLabel(self); self.debug_overlay.setObjectName("DebugOverlay"); self.debug_overlay.hide()
+        self.debug_overlay.setAttribute(Qt.WA_TransparentForMouseEvents)
+
     def setup_ui_columns(self):
         self.prioridades_layout = QVBoxLayout()
         self.prioridades_layout.setSpacing(self.scale(15))
-        self.backlog_layout = QVBoxLayout()
-        self.aguardando_chegada_layout = QVBoxLayout()
-        self.pendentes_layout = QVBoxLayout()
-        self.em_montagem_container = QWidget()
-        self.em_montagem_layout = QVBoxLayout(self.em_montagem_container)
-        self.em_montagem_layout.setContentsMargins(0, self.scale(20), 0, 0)
-        self.em_montagem_layout.setSpacing(0)
+        # Grade das seções na posição (linha, coluna) dada pelo layout
+        self.secoes_widgets = {}
         grid_layout = QGridLayout()
         grid_layout.setSpacing(self.scale(20))
-        grid_layout.addLayout(self.backlog_layout, 0, 0)
-        grid_layout.addLayout(self.aguardando_chegada_layout, 0, 1)
-        grid_layout.addWidget(self.em_montagem_container, 1, 0)
-        grid_layout.addLayout(self.pendentes_layout, 1, 1)
-        grid_layout.setColumnStretch(0, 1)
-        grid_layout.setColumnStretch(1, 1)
+        for secao in self.layout_painel.secoes:
+            container = QWidget()
+            secao_layout = QVBoxLayout(container)
+            secao_layout.setContentsMargins(0, self.scale(20) if secao.get('linha', 0) > 0 else 0, 0, 0)
+            grid_layout.addWidget(container, secao.get('linha', 0), secao.get('coluna', 0))
+            self.secoes_widgets[secao['id']] = {'container': container, 'layout': secao_layout, 'labels': []}
+        for coluna in range(grid_layout.columnCount()):
+            grid_layout.setColumnStretch(coluna, 1)
         grid_container_layout = QVBoxLayout()
         grid_container_layout.addLayout(grid_layout)
         grid_container_layout.addStretch()
@@ -341,20 +155,21 @@ class PainelMtec(QMainWindow):
         self.body_layout.addLayout(grid_container_layout, 2)
         side_column_frame = QFrame()
         side_column_frame.setObjectName("SideColumnFrame")
-        side_column_frame.setFixedWidth(self.scale(300))
+        side_column_frame.setFixedWidth(self.scale(self.layout_painel.largura_lateral))
         self.side_layout = QVBoxLayout(side_column_frame)
-        self.concluidos_layout = QVBoxLayout()
-        self.cancelados_layout = QVBoxLayout()
-        self.side_layout.addLayout(self.concluidos_layout)
-        self.side_layout.addStretch(1)
-        linea_separadora = QFrame()
-        linea_separadora.setFrameShape(QFrame.HLine)
-        linea_separadora.setFrameShadow(QFrame.Sunken)
-        linea_separadora.setStyleSheet("background-color: #444; min-height: 1px; border: none;")
-        self.side_layout.addWidget(linea_separadora)
-        self.side_layout.addSpacing(20)
-        self.side_layout.addLayout(self.cancelados_layout)
-        self.side_layout.addStretch(2)
+        self.laterais_widgets = {}
+        for posicao, lateral in enumerate(self.layout_painel.laterais):
+            if posicao > 0:
+                linea_separadora = QFrame()
+                linea_separadora.setFrameShape(QFrame.HLine)
+                linea_separadora.setFrameShadow(QFrame.Sunken)
+                linea_separadora.setStyleSheet("background-color: #444; min-height: 1px; border: none;")
+                self.side_layout.addWidget(linea_separadora)
+                self.side_layout.addSpacing(20)
+            lateral_layout = QVBoxLayout()
+            self.side_layout.addLayout(lateral_layout)
+            self.side_layout.addStretch(2 if posicao == len(self.layout_painel.laterais) - 1 else 1)
+            self.laterais_widgets[lateral['id']] = {'layout': lateral_layout, 'labels': []}
         self.body_layout.addWidget(side_column_frame)
         self.metricas_layout = QVBoxLayout()
         self.grafico_layout = QVBoxLayout()
@@ -366,19 +181,11 @@ class PainelMtec(QMainWindow):
     
     def create_persistent_widgets(self):
         self.priority_cards = []
-        self.em_montagem_labels, self.pendentes_labels, self.backlog_labels, self.aguardando_chegada_labels = [], [], [], []
-        self.concluidos_labels, self.cancelados_labels = [], []
-        
-        self.prioridades_layout.addWidget(self.criar_titulo("PRIORIDADES", "PrioridadesTitle"))
-        self.em_montagem_layout.addWidget(self.criar_titulo("EM MONTAGEM FORA DA PRIORIDADE", "EmMontagemTitle"))
-        self.pendentes_layout.addWidget(self.criar_titulo("PENDENTES", "PendentesTitle"))
-        self.backlog_layout.addWidget(self.criar_titulo("BACKLOG", "BacklogTitle"))
-        self.aguardando_chegada_layout.addWidget(self.criar_titulo("AGUARDANDO CHEGADA", "AguardandoChegadaTitle"))
-        self.concluidos_layout.addWidget(self.criar_titulo("ÚLTIMOS CONCLUÍDOS", "ConcluidosTitle"))
-        self.cancelados_layout.addWidget(self.criar_titulo("ÚLTIMOS CANCELADOS", "CanceladosTitle"))
-        
-        for _ in range(4):
-            card = QFrame(); card.setObjectName("Card"); card_layout = QVBoxLayout(card); card.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed); card.setFixedHeight(self.scale(217))
+        cards = self.layout_painel.cards
+        self.prioridades_layout.addWidget(self.criar_titulo(cards['titulo'], "PrioridadesTitle"))
+
+        for _ in range(self.layout_painel.qtd_cards):
+            card = QFrame(); card.setObjectName("Card"); card_layout = QVBoxLayout(card); card.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed); card.setFixedHeight(self.scale(cards['altura']))
             pedido_label = QLabel(); pedido_label.setFont(QFont("Inter", self.scale(15), QFont.Bold)); pedido_label.setObjectName("CardTitle")
             status_label = QLabel(); status_label.setFont(QFont("Inter", self.scale(12)))
             servico_label = QLabel(); servico_label.setFont(QFont("Inter", self.scale(12))); servico_label.setWordWrap(True)
@@ -406,12 +213,16 @@ class PainelMtec(QMainWindow):
             card.hide()
         self.prioridades_layout.addStretch()
 
-        self.em_montagem_counter = self.create_list_widgets(self.em_montagem_layout, self.em_montagem_labels, 5)
-        self.pendentes_counter = self.create_list_widgets(self.pendentes_layout, self.pendentes_labels, 5)
-        self.backlog_counter = self.create_list_widgets(self.backlog_layout, self.backlog_labels, 5)
-        self.aguardando_chegada_counter = self.create_list_widgets(self.aguardando_chegada_layout, self.aguardando_chegada_labels, 5)
-        self.concluidos_counter, self.concluidos_total = self.create_side_list_widgets(self.concluidos_layout, self.concluidos_labels, 5)
-        self.cancelados_counter, self.cancelados_total = self.create_side_list_widgets(self.cancelados_layout, self.cancelados_labels, 5)
+        for secao, capacidade in zip(self.layout_painel.secoes, self.layout_painel.capacidades):
+            refs = self.secoes_widgets[secao['id']]
+            refs['layout'].addWidget(self.criar_titulo(secao['titulo'], f"Titulo_{secao['id']}"))
+            refs['counter'] = self.create_list_widgets(refs['layout'], refs['labels'], capacidade)
+            refs.update(paginas=[], contadores=[], pagina=0, origem=None)
+        for lateral in self.layout_painel.laterais:
+            refs = self.laterais_widgets[lateral['id']]
+            refs['layout'].addWidget(self.criar_titulo(lateral['titulo'], f"Titulo_{lateral['id']}"))
+            refs['counter'], refs['total'] = self.create_side_list_widgets(refs['layout'], refs['labels'],
+                                                                          self.layout_painel.capacidade_lateral(lateral['id']))
         self.create_dashboard_widgets()
 
     def create_list_widgets(self, layout, label_list, count):
@@ -445,7 +256,9 @@ class PainelMtec(QMainWindow):
         self.media_diaria_valor = QLabel(); self.media_diaria_valor.setObjectName("MetricaValue"); self.media_diaria_valor.setFont(self.font_metrica_valor)
         self.metricas_layout.addWidget(self.media_diaria_valor)
         self.metricas_layout.addStretch(1)
-        self.grafico_layout.addWidget(self.criar_titulo(f"Desempenho Semanal (Meta: {META_SEMANAL} máq.)", ""))
+        self.meta_semanal = META_SEMANAL
+        self.titulo_grafico = self.criar_titulo(f"Desempenho Semanal (Meta: {META_SEMANAL} máq.)", "")
+        self.grafico_layout.addWidget(self.titulo_grafico)
         self.weekly_progress_widgets = []
         for _ in range(4):
             label_semana = QLabel(); label_semana.setFont(QFont("Inter", self.scale(10)))
@@ -466,10 +279,61 @@ class PainelMtec(QMainWindow):
         return label
         
     def setup_online_timer(self):
+        # Timer de disparo único: cada ciclo agenda o próximo (intervalo normal ou backoff)
         self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
         self.update_timer.timeout.connect(self.atualizar_dados_e_ui)
-        self.update_timer.start(10000)
-        print("Modo online: O painel será atualizado a cada 10 segundos.")
+        logger.info("Modo online: O painel será atualizado a cada %d segundos.", INTERVALO_ATUALIZACAO_MS // 1000)
+
+    def setup_rotacao_timer(self):
+        # Seções com "paginar" trocam de página neste ritmo; o tique só troca textos já montados
+        self.rotacao_timer = QTimer(self)
+        self.rotacao_timer.timeout.connect(self.avancar_paginas)
+        if any(self.layout_painel.paginar):
+            self.rotacao_timer.start(int(self.layout_painel.rotacao_s * 1000))
+
+    def avancar_paginas(self):
+        if self.is_showing_error:
+            return
+        for refs in self.secoes_widgets.values():
+            if len(refs['paginas']) > 1:
+                refs['pagina'] = (refs['pagina'] + 1) % len(refs['paginas'])
+                self.exibir_pagina(refs)
+
+    def agendar_proximo_ciclo(self):
+        if self.falhas_consecutivas == 0:
+            atraso = INTERVALO_ATUALIZACAO_MS
+        else:
+            # Backoff exponencial com "full jitter" para os painéis não reconectarem juntos
+            teto = min(BACKOFF_MAX_MS, BACKOFF_BASE_MS * 2 ** min(self.falhas_consecutivas, 16))
+            atraso = int(random.uniform(BACKOFF_BASE_MS, teto))
+            logger.info("Nova tentativa em %.1f s (falha #%d)", atraso / 1000, self.falhas_consecutivas)
+        self.update_timer.start(atraso)
+
+    def exibir_snapshot_inicial(self):
+        vm, gravado_em = self.fonte.snapshot()
+        if vm is None:
+            return
+        try:
+            self.renderizar(vm)
+        except Exception:
+            logger.exception("Falha ao exibir o snapshot local")
+            return
+        self.vm_ultimo = vm
+        self.dados_desde = gravado_em
+        self.atualizar_badge_offline()
+        logger.info("Snapshot local de %s exibido enquanto a primeira consulta não retorna.", gravado_em)
+
+    def atualizar_badge_offline(self):
+        if self.dados_desde is None:
+            self.stale_badge.hide()
+            return
+        idade = (datetime.now(TZ) - self.dados_desde).total_seconds()
+        if self.falhas_consecutivas == 0 and idade <= DADOS_VELHOS_APOS_S:
+            self.stale_badge.hide()
+            return
+        self.stale_badge.setText(f"⚠ OFFLINE — dados de {self.dados_desde.strftime('%d/%m %H:%M')}")
+        self.stale_badge.show()
 
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() == Qt.Key_F11:
@@ -477,142 +341,196 @@ class PainelMtec(QMainWindow):
                 self.showMaximized()
             else:
                 self.showFullScreen()
+        elif event.key() == Qt.Key_F12:
+            self.debug_overlay.setVisible(not self.debug_overlay.isVisible())
+            self.atualizar_overlay()
         super().keyPressEvent(event)
 
+    def atualizar_overlay(self):
+        if not self.debug_overlay.isVisible() or self.ultima_telemetria is None:
+            return
+        t = self.ultima_telemetria
+        linhas = [f"Ciclo #{t.numero}  total: {t.total * 1000:.0f} ms", f"Linhas: {t.linhas}"]
+        linhas += [f"{etapa}: {valor * 1000:.1f} ms" for etapa, valor in t.tempos.items()]
+        if t.memoria_mb is not None:
+            linhas.append(f"Memória: {t.memoria_mb:.1f} MB")
+        if t.erro:
+            linhas.append(f"Erro: {t.erro}")
+        self.debug_overlay.setText("\n".join(linhas))
+        self.debug_overlay.adjustSize()
+        self.debug_overlay.move(self.width() - self.debug_overlay.width() - 10, 10)
+        self.debug_overlay.raise_()
+
     def atualizar_dados_e_ui(self):
-        print("\n--- INICIANDO CICLO DE ATUALIZAÇÃO ---")
-        try:
-            df_full, df_principal, df_concluidos, df_cancelados, totais_concluidos, totais_cancelados = carregar_dados()
-            
+        """Dispara um ciclo: a fonte é consultada fora da thread da tela e o resultado volta por sinal."""
+        if self.consultando:
+            return
+        self.consultando = True
+        self.numero_ciclo += 1
+        ciclo = CicloTelemetria(self.numero_ciclo)
+        logger.debug("Iniciando ciclo de atualização #%d", ciclo.numero)
+        threading.Thread(target=self.consultar_fonte, args=(ciclo,), name=f"ciclo-painel-{ciclo.numero}", daemon=True).start()
+
+    def consultar_fonte(self, ciclo):
+        vm = erro = None
+        with self.perfil.ciclo():
+            try:
+                vm = self.fonte.obter(ciclo)
+            except Exception as e:
+                erro = e
+        self.sinais.concluido.emit(ciclo, vm, erro)
+
+    def concluir_ciclo(self, ciclo, vm, erro):
+        self.consultando = False
+        if erro is None:
+            try:
+                # None = servidor informou que nada mudou; a tela atual continua válida
+                if vm is not None:
+                    self.renderizar(vm, ciclo)
+                    self.vm_ultimo = vm
+                elif self.is_showing_error:
+                    self.clear_error_message()
+                self.dados_desde = self.fonte.dados_desde; self.falhas_consecutivas = 0
+            except Exception as e:
+                erro = e
+        if erro is not None:
+            ciclo.erro = str(erro)
+            self.falhas_consecutivas += 1
+            if self.vm_ultimo is None:
+                logger.error("Erro crítico no ciclo de atualização", exc_info=erro)
+                self.mostrar_erro(str(erro))
+            else:
+                # Mantém a última tela válida e sinaliza que os dados estão desatualizados
+                logger.warning("Falha no ciclo de atualização; exibindo dados de %s: %s", self.dados_desde, erro)
+
+        self.atualizar_badge_offline()
+        self.ultima_telemetria = ciclo.finalizar()
+        logger.info("telemetria %s", ciclo.como_texto())
+        self.atualizar_overlay()
+        self.agendar_proximo_ciclo()
+
+    def renderizar(self, vm, ciclo=None):
+        ciclo = ciclo or CicloTelemetria(0)
+        with ciclo.medir('render'):
             if self.is_showing_error: self.clear_error_message()
-            
-            self.update_colunas(df_principal, df_concluidos, df_cancelados, totais_concluidos, totais_cancelados)
-            
-            metricas = calcular_metricas_dashboard(df_full)
-            dados_grafico = calcular_dados_grafico(df_full)
-            self.update_dashboard(metricas, dados_grafico)
-            
-            print("--- CICLO DE ATUALIZAÇÃO CONCLUÍDO ---")
-        except Exception as e:
-            print(f"ERRO CRÍTICO NO CICLO DE ATUALIZAÇÃO: {e}")
-            traceback.print_exc()
-            self.mostrar_erro(str(e))
+            self.update_colunas(vm)
+            self.update_linha(vm.get('linha'), vm.get('meta_semanal', META_SEMANAL))
+            self.update_dashboard(vm['metricas'], vm['grafico'])
 
     def mostrar_erro(self, message):
         self.main_container.hide(); self.error_container.show(); self.is_showing_error = True
         self.error_label.setText(f"Erro ao carregar dados:\n\n{message}"); self.error_label.setAlignment(Qt.AlignCenter)
-        print(f"ERRO EXIBIDO: {message}")
 
     def clear_error_message(self):
         self.error_container.hide(); self.main_container.show(); self.is_showing_error = False
     
-    def update_colunas(self, df_principal, df_concluidos, df_cancelados, totais_concluidos, totais_cancelados):
-        status_excluidos_da_prioridade = [STATUS_AGUARDANDO_CHEGADA.lower(), STATUS_PENDENTE.lower()]
-        
-        df_prioridades = df_principal[~df_principal[COLUNA_STATUS].str.lower().isin(status_excluidos_da_prioridade)]
-        
-        pedidos_nos_cards_ids = df_prioridades.head(len(self.priority_cards))[COLUNA_PEDIDO_ID].tolist()
-
-        self.update_cards_prioridade(df_prioridades)
-
-        df_em_montagem_base = df_principal[df_principal[COLUNA_STATUS].str.lower() == STATUS_EM_MONTAGEM.lower()]
-        df_em_montagem_filtrado = df_em_montagem_base[~df_em_montagem_base[COLUNA_PEDIDO_ID].isin(pedidos_nos_cards_ids)]
-
-        if df_em_montagem_filtrado.empty:
-            self.em_montagem_container.hide()
-        else:
-            self.em_montagem_container.show()
-            self.update_lista_vertical(df_em_montagem_filtrado, self.em_montagem_labels, self.em_montagem_counter)
-
-        df_pendentes = df_principal[df_principal[COLUNA_STATUS].str.lower() == STATUS_PENDENTE.lower()]
-        self.update_lista_vertical(df_pendentes, self.pendentes_labels, self.pendentes_counter)
-
-        df_backlog_base = df_principal[df_principal[COLUNA_STATUS].str.lower() == STATUS_BACKLOG.lower()]
-        df_backlog_filtrado = df_backlog_base[~df_backlog_base[COLUNA_PEDIDO_ID].isin(pedidos_nos_cards_ids)]
-        self.update_lista_vertical(df_backlog_filtrado, self.backlog_labels, self.backlog_counter)
-
-        df_aguardando_chegada = df_principal[df_principal[COLUNA_STATUS].str.lower() == STATUS_AGUARDANDO_CHEGADA.lower()]
-        self.update_lista_vertical(df_aguardando_chegada, self.aguardando_chegada_labels, self.aguardando_chegada_counter)
+    def update_colunas(self, vm):
+        self.update_cards_prioridade(vm['cards'])
+
+        listas = vm['listas']
+        for secao in self.layout_painel.secoes:
+            refs, conteudo = self.secoes_widgets[secao['id']], listas.get(secao['id'])
+            # Seção que a fonte não publica (layout do servidor diferente) ou vazia com ocultar_vazia
+            if conteudo is None or (conteudo['total'] == 0 and secao.get('ocultar_vazia')):
+                refs['container'].hide()
+            else:
+                refs['container'].show()
+                self.update_lista_vertical(conteudo, refs, secao.get('paginar', False))
 
-        self.update_lista_lateral(df_concluidos, self.concluidos_labels, self.concluidos_counter, self.concluidos_total, totais_concluidos)
-        self.update_lista_lateral(df_cancelados, self.cancelados_labels, self.cancelados_counter, self.cancelados_total, totais_cancelados)
+        laterais = vm['laterais']
+        for id_lateral, refs in self.laterais_widgets.items():
+            if id_lateral in laterais:
+                self.update_lista_lateral(laterais[id_lateral], refs['labels'], refs['counter'], refs['total'])
 
-    def update_cards_prioridade(self, df):
-        if df.empty:
-            for card_ref in self.priority_cards:
-                card_ref['frame'].hide()
-            return
-        
-        for i, (_, row) in enumerate(df.head(len(self.priority_cards)).iterrows()):
-            card_ref = self.priority_cards[i]
-            
-            titulo_card = f"<b>PV: {row[COLUNA_PV]}</b> ({row['Prioridade_Display']}ª Prioridade)"
-            if row.get('is_urgent', False):
-                titulo_card = f"<b>PV: {row[COLUNA_PV]}</b> <font color='#E74C3C'>(URGENTE)</font>"
+    def update_cards_prioridade(self, cards):
+        for card_ref, card in zip(self.priority_cards, cards):
+            titulo_card = f"<b>PV: {card['pv']}</b> ({card['prioridade']}ª Prioridade)"
+            if card['urgente']:
+                titulo_card = f"<b>PV: {card['pv']}</b> <font color='#E74C3C'>(URGENTE)</font>"
 
             card_ref['pedido'].setText(titulo_card)
-            card_ref['status'].setText(f"<font color='#BDBDBD'>Status: </font><span style='color: white; font-weight: bold;'>{row[COLUNA_STATUS]}</span>")
-            card_ref['servico'].setText(f"<font color='#BDBDBD'>Serviço: </font>{row[COLUNA_SERVICO]}")
-            card_ref['equipamento'].setText(f"<font color='#BDBDBD'>Equipamento: </font>{row[COLUNA_EQUIPAMENTO]}")
-            card_ref['imagem'].setText(f"<font color='#BDBDBD'>Imagem: </font>{row.get(COLUNA_IMAGEM, 'N/A')}")
-            card_ref['qtd'].setText(f"<font color='#BDBDBD'><b>{row[COLUNA_QTD]}</b> máq.</font>")
+            texto_status = f"<font color='#BDBDBD'>Status: </font><span style='color: white; font-weight: bold;'>{card['status']}</span>"
+            if card.get('previsao'):
+                texto_status += f"&nbsp;&nbsp;<font color='#BDBDBD'>Previsão: </font><span style='color: #FF8C33; font-weight: bold;'>{date.fromisoformat(card['previsao']).strftime('%d/%m')}</span>"
+            card_ref['status'].setText(texto_status)
+            card_ref['servico'].setText(f"<font color='#BDBDBD'>Serviço: </font>{card['servico']}")
+            card_ref['equipamento'].setText(f"<font color='#BDBDBD'>Equipamento: </font>{card['equipamento']}")
+            card_ref['imagem'].setText(f"<font color='#BDBDBD'>Imagem: </font>{card['imagem']}")
+            card_ref['qtd'].setText(f"<font color='#BDBDBD'><b>{card['qtd']}</b> máq.</font>")
             card_ref['frame'].show()
 
-        for j in range(len(df.head(len(self.priority_cards))), len(self.priority_cards)):
+        for j in range(len(cards), len(self.priority_cards)):
             self.priority_cards[j]['frame'].hide()
 
-    def update_lista_vertical(self, df, label_list, counter_label):
-        if df.empty:
-            for label in label_list: label.hide()
-            counter_label.hide()
-            return
-        
-        for i, (_, row) in enumerate(df.head(len(label_list)).iterrows()):
-            label = label_list[i]
-            
-            texto_label = f"<b>PV: {row[COLUNA_PV]}</b> <font color='#FF6600'>({row[COLUNA_QTD]} máq.)</font>"
-            if row.get('is_urgent', False):
-                texto_label += " <font color='#E74C3C'>🔥</font>"
-                
-            label.setText(texto_label)
-            label.show()
-        
-        for j in range(len(df.head(len(label_list))), len(label_list)):
+    def update_lista_vertical(self, secao, refs, paginar):
+        """Monta os textos de todas as páginas da seção (uma vez por dado novo) e mostra a atual."""
+        if secao != refs['origem']:
+            capacidade = len(refs['labels'])
+            itens = secao['itens'] if paginar else secao['itens'][:capacidade]
+            textos = [self.texto_item_lista(item) for item in itens]
+            paginas = [textos[i:i + capacidade] for i in range(0, len(textos), capacidade)] or [[]]
+            restantes = secao['total'] - len(itens)
+            contadores = []
+            for numero in range(1, len(paginas) + 1):
+                partes = [f"Página {numero}/{len(paginas)}"] if len(paginas) > 1 else []
+                if restantes > 0:
+                    partes.append(f"+{restantes} pedidos...")
+                contadores.append(" · ".join(partes))
+            # Mantém a página atual: a rotação não volta ao início a cada atualização
+            refs.update(paginas=paginas, contadores=contadores, origem=secao,
+                        pagina=min(refs['pagina'], len(paginas) - 1))
+        self.exibir_pagina(refs)
+
+    def texto_item_lista(self, item):
+        texto_label = f"<b>PV: {item['pv']}</b> <font color='#FF6600'>({item['qtd']} máq.)</font>"
+        if item['urgente']:
+            texto_label += " <font color='#E74C3C'>🔥</font>"
+        return texto_label
+
+    def exibir_pagina(self, refs):
+        textos, label_list = refs['paginas'][refs['pagina']], refs['labels']
+        for label, texto in zip(label_list, textos):
+            label.setText(texto); label.show()
+        for j in range(len(textos), len(label_list)):
             label_list[j].hide()
 
-        if len(df) > len(label_list):
-            restantes = len(df) - len(label_list)
-            counter_label.setText(f"+{restantes} pedidos...")
-            counter_label.show()
+        contador = refs['contadores'][refs['pagina']]
+        if contador:
+            refs['counter'].setText(contador); refs['counter'].show()
         else:
-            counter_label.hide()
+            refs['counter'].hide()
     
-    def update_lista_lateral(self, df, label_list, counter_label, total_label, totais):
-        if df.empty:
-            for label in label_list: label.hide()
-            counter_label.hide()
-        else:
-            for i, (_, row) in enumerate(df.head(len(label_list)).iterrows()):
-                label = label_list[i]
-                texto = f"<b>PV: {row[COLUNA_PV]}</b> <font color='#2ECC71'>({row[COLUNA_QTD]} máq.)</font>"
-                label.setText(texto); label.show()
+    def update_lista_lateral(self, secao, label_list, counter_label, total_label):
+        itens = secao['itens'][:len(label_list)]
+        for label, item in zip(label_list, itens):
+            texto = f"<b>PV: {item['pv']}</b> <font color='#2ECC71'>({item['qtd']} máq.)</font>"
+            label.setText(texto); label.show()
 
-            for j in range(len(df.head(len(label_list))), len(label_list)):
-                label_list[j].hide()
-            
-            if len(df) > len(label_list):
-                restantes = len(df) - len(label_list)
-                counter_label.setText(f"+{restantes}..."); counter_label.show()
-            else:
-                counter_label.hide()
+        for j in range(len(itens), len(label_list)):
+            label_list[j].hide()
 
-        teravix, pv, total, teravix_qtd, pv_qtd, total_qtd = totais
+        restantes = secao['total'] - len(itens)
+        if restantes > 0:
+            counter_label.setText(f"+{restantes}..."); counter_label.show()
+        else:
+            counter_label.hide()
+
+        teravix, pv, total, teravix_qtd, pv_qtd, total_qtd = secao['totais']
         texto_total = (f"<font color='#FF6600'>TERAVIX:</font> {teravix} ({teravix_qtd})<br>"
                        f"<font color='#FF6600'>PV:</font> {pv} ({pv_qtd})<br>"
                        f"<b><font color='#3498DB'>TOTAL DIA:</font></b> <b>{total} ({total_qtd})</b>")
         total_label.setText(texto_total)
         total_label.show()
 
+    def update_linha(self, linha, meta_semanal):
+        self.linha_label.setText(linha['nome'] if linha else "")
+        if meta_semanal != self.meta_semanal:
+            # Meta da linha (linha_td): ajusta título e escala das barras semanais
+            self.meta_semanal = meta_semanal
+            self.titulo_grafico.setText(f"<b>Desempenho Semanal (Meta: {meta_semanal} máq.)</b>")
+            for widget_ref in self.weekly_progress_widgets:
+                widget_ref['bar'].setRange(0, meta_semanal)
+
     def update_dashboard(self, metricas, dados_grafico):
         self.total_mes_valor.setText(f"{metricas['total_mes_atual']:.0f} " \
                                      f"<font color='#999' style='font-size:{self.scale(15)}px;'>({metricas['total_mes_atual_qtd']:.0f} máq.)</font>")
@@ -620,7 +538,8 @@ class PainelMtec(QMainWindow):
                                         f"<font color='#999' style='font-size:{self.scale(15)}px;'>({metricas['media_diaria_qtd']:.1f} máq.)</font>")
 
         start_of_current_week = (datetime.now(TZ).date() - timedelta(days=datetime.now(TZ).weekday()))
-        for i, (data, valor) in enumerate(dados_grafico):
+        for i, semana in enumerate(dados_grafico):
+            data, valor = date.fromisoformat(semana['inicio']), semana['valor']
             widget_ref = self.weekly_progress_widgets[i]
             fim_semana = data + timedelta(days=6)
             texto_semana = f"Semana {data.strftime('%d/%m')} a {fim_semana.strftime('%d/%m')}"
@@ -629,7 +548,7 @@ class PainelMtec(QMainWindow):
                 texto_semana = f"<b>▶ {texto_semana}</b>"
             
             widget_ref['label'].setText(f"{texto_semana}: <b>{int(valor)}</b>")
-            widget_ref['bar'].setValue(min(int(valor), META_SEMANAL))
+            widget_ref['bar'].setValue(min(int(valor), self.meta_semanal))
             widget_ref['bar'].setObjectName("currentWeek" if is_current_week else "")
             widget_ref['bar'].setStyle(QApplication.style())
             
@@ -647,9 +566,15 @@ class PainelMtec(QMainWindow):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Painel de produção MTEC (TV)")
+    parser.add_argument('--servidor', help="URL do servidor_painel.py; sem ela o painel consulta o banco diretamente")
+    parser.add_argument('--linha', help="Linha de produção (id ou nome) exibida neste painel; padrão: PAINEL_LINHA ou todas")
+    args, argv_qt = parser.parse_known_args()
+
+    configurar_log()
     locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
-    app = QApplication(sys.argv)
-    window = PainelMtec()
+    app = QApplication([sys.argv[0]] + argv_qt)
+    window = PainelMtec(criar_fonte(args.servidor, args.linha))
     window.showFullScreen() 
     sys.exit(app.exec())
 
@@ -31,13 +31,10 @@ def buscar_pedidos_concluidos(start_date, end_date):
         start_str = start_date.strftime("%Y-%m-%d")
         end_str = end_date.strftime("%Y-%m-%d")
 
-        # --- MODIFICAÇÃO PRINCIPAL ---
-        # Converte o timestamp da conclusão para o fuso 'America/Sao_Paulo'
-        # ANTES de extrair a data. Isso garante que a data corresponda
-        # ao dia correto no horário de Brasília.
+        # dia_conclusao já é o dia da conclusão no horário de Brasília (coluna gerada e indexada)
         query = (
             f"SELECT * FROM pedidos_tb WHERE status_id IN ({placeholders}) "
-            f"AND DATE(data_conclusao AT TIME ZONE 'America/Sao_Paulo') BETWEEN '{start_str}' AND '{end_str}'"
+            f"AND dia_conclusao BETWEEN '{start_str}' AND '{end_str}'"
         )
         
         df = pd.read_sql_query(query, engine)
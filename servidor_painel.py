@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+from flask import Flask, Response, jsonify, render_template, request
+
+from painel_dados import FonteBanco, LinhaInexistente, consultar_linha
+from layout_painel import obter_layout
+from painel_fontes import TZ, INTERVALO_ATUALIZACAO_MS, BACKOFF_BASE_MS, BACKOFF_MAX_MS, serializar_view_model
+from telemetria import configurar_log
+
+# Servidor único de dados do painel: consulta o banco uma vez por ciclo e publica o
+# view-model para quantas TVs (Qt ou navegador) estiverem conectadas.
+# Cada linha de produção (?linha=<id ou nome>) tem o seu publicador, criado no primeiro acesso;
+# sem ?linha, o painel mostra todas as linhas.
+# Em produção roda no gunicorn com UM worker (o publicador é por processo) e threads:
+#   gunicorn -w 1 -k gthread --threads 80 -b 0.0.0.0:5001 "servidor_painel:criar_app()"
+# Cada assinante SSE ocupa uma thread enquanto está conectado; acima de PAINEL_MAX_ASSINANTES a
+# conexão é recusada (503) e o navegador tenta de novo, deixando threads livres para as demais rotas.
+logger = logging.getLogger("painel.servidor")
+
+PORTA = int(os.environ.get('PAINEL_SERVIDOR_PORTA', '5001'))
+KEEPALIVE_SSE_S = 15
+PAINEL_MAX_ASSINANTES = int(os.environ.get('PAINEL_MAX_ASSINANTES', '64'))
+# Espera sugerida (ms) ao navegador recusado, no campo "retry" do SSE e no Retry-After
+ESPERA_ASSINANTE_RECUSADO_MS = 30000
+
+app = Flask(__name__, template_folder='templates', static_folder='static')
+
+
+class PublicadorPainel(threading.Thread):
+    """Thread que mantém o view-model atualizado e acorda os assinantes quando ele muda."""
+
+    def __init__(self, fonte=None, nome="publicador-painel"):
+        super().__init__(name=nome, daemon=True)
+        self.fonte = fonte or FonteBanco()
+        self.condicao = threading.Condition()
+        self.versao = 0
+        self.corpo = None
+        self.etag = None
+        self.atualizado_em = None
+        self.falhas_consecutivas = 0
+
+    def publicar(self, vm, atualizado_em):
+        corpo = serializar_view_model(vm)
+        etag = '"%s"' % hashlib.sha1(corpo).hexdigest()
+        with self.condicao:
+            self.atualizado_em = atualizado_em
+            if etag != self.etag:
+                self.corpo, self.etag = corpo, etag
+                self.versao += 1
+                self.condicao.notify_all()
+
+    def estado(self):
+        with self.condicao:
+            return self.versao, self.corpo, self.etag, self.atualizado_em
+
+    def aguardar_mudanca(self, versao, timeout):
+        with self.condicao:
+            self.condicao.wait_for(lambda: self.versao != versao, timeout=timeout)
+            return self.versao, self.corpo, self.atualizado_em
+
+    def run(self):
+        vm, gravado_em = self.fonte.snapshot()
+        if vm is not None:
+            self.publicar(vm, gravado_em)
+            logger.info("Publicando snapshot local de %s até a primeira consulta.", gravado_em)
+
+        while True:
+            try:
+                vm = self.fonte.obter()
+                self.publicar(vm, self.fonte.dados_desde)
+                self.falhas_consecutivas = 0
+                espera = INTERVALO_ATUALIZACAO_MS
+            except Exception:
+                self.falhas_consecutivas += 1
+                logger.exception("Falha ao atualizar o view-model (falha #%d)", self.falhas_consecutivas)
+                teto = min(BACKOFF_MAX_MS, BACKOFF_BASE_MS * 2 ** min(self.falhas_consecutivas, 16))
+                espera = random.uniform(BACKOFF_BASE_MS, teto)
+            time.sleep(espera / 1000)
+
+
+publicador = PublicadorPainel()
+publicadores_linha = {}
+_lock_publicadores = threading.Lock()
+_vagas_sse = threading.BoundedSemaphore(PAINEL_MAX_ASSINANTES)
+
+
+def obter_publicador(linha):
+    """Publicador da linha pedida (criado e iniciado no primeiro acesso), ou o geral sem linha.
+
+    A linha é validada no banco antes de criar a thread, e id e nome da mesma linha
+    compartilham o mesmo publicador.
+    """
+    if not linha:
+        return publicador
+    with _lock_publicadores:
+        if linha in publicadores_linha:
+            return publicadores_linha[linha]
+    dados_linha = consultar_linha(linha)
+    with _lock_publicadores:
+        existente = publicadores_linha.get(str(dados_linha['id']))
+        if existente is None:
+            existente = PublicadorPainel(FonteBanco(dados_linha['id']), f"publicador-linha-{dados_linha['id']}")
+            existente.start()
+            logger.info("Publicando o painel da linha %s (%s).", dados_linha['id'], dados_linha['nome'])
+        publicadores_linha[str(dados_linha['id'])] = publicadores_linha[linha] = existente
+        return existente
+
+
+def _publicador_da_requisicao():
+    """(publicador, None) ou (None, resposta de erro) para o ?linha= da requisição."""
+    try:
+        return obter_publicador(request.args.get('linha')), None
+    except LinhaInexistente as e:
+        return None, (jsonify({"erro": str(e)}), 404)
+    except Exception:
+        logger.exception("Falha ao consultar a linha %r", request.args.get('linha'))
+        return None, (jsonify({"erro": "Não foi possível consultar a linha de produção."}), 503)
+
+
+def _cabecalhos(etag, atualizado_em):
+    cabecalhos = {'Cache-Control': 'no-cache'}
+    if etag:
+        cabecalhos['ETag'] = etag
+    if atualizado_em:
+        cabecalhos['X-Painel-Atualizado-Em'] = atualizado_em.isoformat()
+    return cabecalhos
+
+
+@app.route("/")
+def painel_navegador():
+    # Mesmas seções do painel Qt: a página é montada a partir do layout e o JS só preenche
+    return render_template("painel_tv.html", layout=obter_layout())
+
+
+@app.route("/api/painel")
+def get_painel():
+    publicador, erro = _publicador_da_requisicao()
+    if erro:
+        return erro
+    _, corpo, etag, atualizado_em = publicador.estado()
+    if corpo is None:
+        return jsonify({"erro": "Dados do painel ainda não disponíveis."}), 503
+    if etag and request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers=_cabecalhos(etag, atualizado_em))
+    return Response(corpo, mimetype='application/json', headers=_cabecalhos(etag, atualizado_em))
+
+
+@app.route("/api/painel/eventos")
+def eventos_painel():
+    """Server-Sent Events: envia o view-model a cada mudança (o navegador reconecta sozinho)."""
+    publicador, erro = _publicador_da_requisicao()
+    if erro:
+        return erro
+    if not _vagas_sse.acquire(blocking=False):
+        logger.warning("Assinante SSE recusado: limite de %d conexões atingido.", PAINEL_MAX_ASSINANTES)
+        return Response(f"retry: {ESPERA_ASSINANTE_RECUSADO_MS}\n\n", status=503, mimetype='text/event-stream',
+                        headers={'Retry-After': str(ESPERA_ASSINANTE_RECUSADO_MS // 1000)})
+
+    def fluxo():
+        # A vaga volta quando a conexão cai: o servidor fecha o gerador ao falhar a escrita, o que
+        # acontece em até dois pulsos (2 x KEEPALIVE_SSE_S) depois de a TV desconectar
+        try:
+            versao_enviada = -1
+            while True:
+                versao, corpo, atualizado_em = publicador.aguardar_mudanca(versao_enviada, KEEPALIVE_SSE_S)
+                if corpo is not None and versao != versao_enviada:
+                    versao_enviada = versao
+                    envelope = '{"atualizado_em":%s,"painel":%s}' % (
+                        json.dumps(atualizado_em.isoformat() if atualizado_em else None), corpo.decode('utf-8'))
+                    yield f"data: {envelope}\n\n"
+                else:
+                    # Pulso: mantém a conexão viva e informa que o servidor continua atualizando
+                    yield 'event: pulso\ndata: {"atualizado_em":%s}\n\n' % json.dumps(atualizado_em.isoformat() if atualizado_em else None)
+        finally:
+            _vagas_sse.release()
+
+    return Response(fluxo(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route("/api/painel/saude")
+def saude_painel():
+    publicador, erro = _publicador_da_requisicao()
+    if erro:
+        return erro
+    versao, _, _, atualizado_em = publicador.estado()
+    idade = (datetime.now(TZ) - atualizado_em).total_seconds() if atualizado_em else None
+    return jsonify({"versao": versao, "atualizado_em": atualizado_em.isoformat() if atualizado_em else None,
+                    "idade_s": idade, "falhas_consecutivas": publicador.falhas_consecutivas})
+
+
+def criar_app():
+    """App com o publicador geral já rodando; chamado pelo gunicorn dentro do worker."""
+    configurar_log('servidor_painel.log')
+    if not publicador.is_alive():
+        publicador.start()
+    return app
+
+
+if __name__ == "__main__":
+    # Servidor de desenvolvimento do Flask; no compose o painel roda no gunicorn (ver acima)
+    criar_app().run(host='0.0.0.0', port=PORTA, threaded=True)
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import secrets
+import logging
+import threading
+from datetime import datetime, timezone
+
+from flask.sessions import SessionInterface, SessionMixin
+from sqlalchemy import text
+from werkzeug.datastructures import CallbackDict
+
+logger = logging.getLogger("painel.sessoes")
+
+# --- SESSÕES NO BANCO ---
+# O cookie leva só um identificador aleatório; os dados da sessão (usuário, nível de acesso,
+# mensagens) ficam em sessoes_tb, compartilhada por todos os processos do crud.py e pela API de
+# leitura. Reiniciar ou escalar os workers não derruba ninguém, e logout, troca de senha ou de
+# nível de acesso encerram as sessões do usuário no servidor.
+# Cada processo guarda as sessões lidas por SESSOES_CACHE_S: dentro dessa janela o login_required
+# e o admin_required não vão ao banco. É também o atraso máximo para um encerramento feito em
+# outro processo valer neste.
+COOKIE_SESSAO = 'session'
+SESSOES_CACHE_S = float(os.environ.get('SESSOES_CACHE_S', '30'))
+SESSOES_CACHE_MAX = int(os.environ.get('SESSOES_CACHE_MAX', '10000'))
+# A validade só é regravada quando já passou desta fração (uma escrita por sessão a cada meia validade)
+FRACAO_RENOVACAO = 0.5
+
+SQL_SESSAO = "SELECT dados, expira_em FROM sessoes_tb WHERE id = :id AND expira_em > :agora"
+SQL_GRAVAR_SESSAO = """
+    INSERT INTO sessoes_tb (id, username, dados, expira_em)
+    VALUES (:id, :username, :dados, :expira_em)
+    ON CONFLICT (id) DO UPDATE
+    SET username = EXCLUDED.username, dados = EXCLUDED.dados, expira_em = EXCLUDED.expira_em
+"""
+SQL_APAGAR_SESSAO = "DELETE FROM sessoes_tb WHERE id = :id"
+SQL_APAGAR_SESSOES_USUARIO = "DELETE FROM sessoes_tb WHERE username = :username"
+SQL_LIMPAR_SESSOES = "DELETE FROM sessoes_tb WHERE expira_em <= :agora"
+# O primeiro processo a subir grava a chave; os demais (e os reinícios) leem a mesma
+SQL_GRAVAR_SEGREDO = "INSERT INTO segredos_tb (nome, valor) VALUES (:nome, :valor) ON CONFLICT (nome) DO NOTHING"
+SQL_SEGREDO = "SELECT valor FROM segredos_tb WHERE nome = :nome"
+
+
+def agora_utc():
+    return datetime.now(timezone.utc)
+
+
+def ler_sessao(linha):
+    """(dados, expira_em) de uma linha de SQL_SESSAO; ({}, None) se não houver sessão válida."""
+    if linha is None:
+        return {}, None
+    dados, expira_em = linha
+    if not isinstance(expira_em, datetime):
+        # O SQLite devolve texto ISO
+        expira_em = datetime.fromisoformat(str(expira_em))
+    if expira_em.tzinfo is None:
+        expira_em = expira_em.replace(tzinfo=timezone.utc)
+    return json.loads(dados), expira_em
+
+
+class CacheSessoes:
+    """Sessões lidas do banco, por id, em memória do processo (também as inexistentes)."""
+
+    def __init__(self, validade_s=SESSOES_CACHE_S, max_chaves=SESSOES_CACHE_MAX):
+        self.validade_s = validade_s
+        self.max_chaves = max_chaves
+        self._sessoes = {}
+        self._lock = threading.Lock()
+
+    def obter(self, sid):
+        """(dados, expira_em) em cache, ou None se for preciso ler do banco."""
+        with self._lock:
+            item = self._sessoes.get(sid)
+            if item is None or time.monotonic() - item[0] > self.validade_s:
+                return None
+            return item[1], item[2]
+
+    def guardar(self, sid, dados, expira_em):
+        agora = time.monotonic()
+        with self._lock:
+            if sid not in self._sessoes and len(self._sessoes) >= self.max_chaves:
+                self._limpar(agora)
+            self._sessoes[sid] = (agora, dados, expira_em)
+
+    def descartar(self, sid=None, username=None):
+        with self._lock:
+            if sid is not None:
+                self._sessoes.pop(sid, None)
+            if username is not None:
+                for chave in [chave for chave, item in self._sessoes.items() if item[1].get('username') == username]:
+                    del self._sessoes[chave]
+
+    def _limpar(self, agora):
+        vencidas = [chave for chave, item in self._sessoes.items() if agora - item[0] > self.validade_s]
+        for chave in vencidas:
+            del self._sessoes[chave]
+        if len(self._sessoes) >= self.max_chaves:
+            # Todas ainda válidas: descarta o cache inteiro em vez de crescer sem limite
+            self._sessoes.clear()
+
+
+class SessaoBanco(CallbackDict, SessionMixin):
+    def __init__(self, dados=None, sid=None, expira_em=None):
+        def marcar_alterada(sessao):
+            sessao.modified = True
+        super().__init__(dados, marcar_alterada)
+        self.sid = sid
+        self.expira_em = expira_em
+        self.new = sid is None
+        self.modified = False
+        # Para trocar o id ao entrar e ao sair (um id anônimo não vira sessão autenticada e vice-versa)
+        self.autenticada = bool(self.get('logged_in'))
+
+
+class InterfaceSessaoBanco(SessionInterface):
+    """session_interface do Flask com os dados em sessoes_tb e cache por processo."""
+
+    def __init__(self, engine, cache=None):
+        self.engine = engine
+        self.cache = cache or CacheSessoes()
+
+    def carregar(self, sid):
+        item = self.cache.obter(sid)
+        if item is None:
+            with self.engine.connect() as conn:
+                linha = conn.execute(text(SQL_SESSAO), {"id": sid, "agora": agora_utc()}).first()
+            item = ler_sessao(linha)
+            self.cache.guardar(sid, *item)
+        return item
+
+    def encerrar_sessoes(self, username):
+        """Apaga as sessões do usuário (logout forçado após troca de senha, nível ou exclusão)."""
+        with self.engine.begin() as conn:
+            conn.execute(text(SQL_APAGAR_SESSOES_USUARIO), {"username": username})
+        self.cache.descartar(username=username)
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            dados, expira_em = self.carregar(sid)
+            if expira_em is not None and expira_em > agora_utc():
+                return SessaoBanco(dict(dados), sid, expira_em)
+        return SessaoBanco()
+
+    def save_session(self, app, session, response):
+        nome = self.get_cookie_name(app)
+        dominio = self.get_cookie_domain(app)
+        caminho = self.get_cookie_path(app)
+        if session.accessed:
+            response.vary.add("Cookie")
+        if not session:
+            if session.sid is not None and session.modified:
+                # session.clear() (logout)
+                self._apagar(session.sid)
+                response.delete_cookie(nome, domain=dominio, path=caminho)
+            return
+
+        agora = agora_utc()
+        validade = app.permanent_session_lifetime
+        renovar = session.expira_em is None or session.expira_em - agora < validade * FRACAO_RENOVACAO
+        if not (session.modified or renovar):
+            return
+        sid = session.sid
+        if sid is None or bool(session.get('logged_in')) != session.autenticada:
+            if sid is not None:
+                self._apagar(sid)
+            sid = secrets.token_urlsafe(32)
+        expira_em = agora + validade
+        dados = dict(session)
+        with self.engine.begin() as conn:
+            conn.execute(text(SQL_GRAVAR_SESSAO), {"id": sid, "username": dados.get('username'),
+                                                   "dados": json.dumps(dados), "expira_em": expira_em})
+        # json ida e volta: o cache guarda o mesmo que outro processo leria do banco
+        self.cache.guardar(sid, json.loads(json.dumps(dados)), expira_em)
+
+        response.set_cookie(nome, sid, expires=self.get_expiration_time(app, session), httponly=self.get_cookie_httponly(app),
+                            domain=dominio, path=caminho, secure=self.get_cookie_secure(app),
+                            samesite=self.get_cookie_samesite(app))
+
+    def _apagar(self, sid):
+        with self.engine.begin() as conn:
+            conn.execute(text(SQL_APAGAR_SESSAO), {"id": sid})
+        self.cache.descartar(sid=sid)
+
+
+def chave_secreta(engine):
+    """SECRET_KEY do Flask quando não vem do ambiente: gerada uma vez e guardada em segredos_tb.
+
+    Uma chave por processo (os.urandom) invalidaria o que ela assina a cada reinício e entre os workers.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(SQL_GRAVAR_SEGREDO), {"nome": "secret_key", "valor": secrets.token_hex(32)})
+        return conn.execute(text(SQL_SEGREDO), {"nome": "secret_key"}).scalar_one()
+
+
+def limpar_sessoes_vencidas(engine):
+    """Remove as sessões já expiradas; retorna quantas."""
+    with engine.begin() as conn:
+        removidas = conn.execute(text(SQL_LIMPAR_SESSOES), {"agora": agora_utc()}).rowcount
+    if removidas:
+        logger.info("%d sessões vencidas removidas.", removidas)
+    return removidas
@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import logging
+import cProfile
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+# --- CONFIGURAÇÃO (via variáveis de ambiente) ---
+LOG_DIR = os.environ.get('PAINEL_LOG_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs'))
+LOG_LEVEL = os.environ.get('PAINEL_LOG_LEVEL', 'INFO').upper()
+LOG_MAX_BYTES = 2 * 1024 * 1024
+LOG_BACKUPS = 5
+# PAINEL_PROFILE=1 liga o cProfile; o perfil acumulado é salvo a cada N ciclos
+PROFILE_ATIVO = os.environ.get('PAINEL_PROFILE', '0') == '1'
+PROFILE_CICLOS = int(os.environ.get('PAINEL_PROFILE_CICLOS', '30'))
+
+try:
+    import psutil
+    _processo = psutil.Process()
+except ImportError:
+    _processo = None
+
+
+def configurar_log(nome_arquivo='painel.log'):
+    """Configura o log do painel: arquivo rotativo local + console para avisos."""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    raiz = logging.getLogger("painel")
+    if raiz.handlers:
+        return raiz
+    raiz.setLevel(LOG_LEVEL)
+    formato = logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    arquivo = RotatingFileHandler(os.path.join(LOG_DIR, nome_arquivo), maxBytes=LOG_MAX_BYTES,
+                                  backupCount=LOG_BACKUPS, encoding='utf-8')
+    arquivo.setFormatter(formato)
+    raiz.addHandler(arquivo)
+
+    console = logging.StreamHandler(sys.stderr)
+    console.setLevel(logging.WARNING)
+    console.setFormatter(formato)
+    raiz.addHandler(console)
+    return raiz
+
+
+def memoria_rss_mb():
+    """Memória residente do processo em MB (None se não houver como medir)."""
+    if _processo is not None:
+        return _processo.memory_info().rss / (1024 * 1024)
+    try:
+        import resource
+        # ru_maxrss é o pico (KB no Linux); serve como aproximação sem o psutil
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return None
+
+
+class CicloTelemetria:
+    """Tempos e contagens de um ciclo de atualização do painel."""
+
+    def __init__(self, numero):
+        self.numero = numero
+        self.tempos = {}
+        self.linhas = 0
+        self.memoria_mb = None
+        self.erro = None
+        self._inicio = time.perf_counter()
+        self.total = 0.0
+
+    @contextmanager
+    def medir(self, etapa):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tempos[etapa] = self.tempos.get(etapa, 0.0) + (time.perf_counter() - inicio)
+
+    def finalizar(self):
+        self.total = time.perf_counter() - self._inicio
+        self.memoria_mb = memoria_rss_mb()
+        return self
+
+    def como_texto(self):
+        partes = [f"ciclo={self.numero}", f"total_ms={self.total * 1000:.1f}", f"linhas={self.linhas}"]
+        partes += [f"{etapa}_ms={valor * 1000:.1f}" for etapa, valor in self.tempos.items()]
+        if self.memoria_mb is not None:
+            partes.append(f"memoria_mb={self.memoria_mb:.1f}")
+        if self.erro:
+            partes.append(f"erro={self.erro!r}")
+        return " ".join(partes)
+
+
+class PerfilCiclos:
+    """cProfile acumulado sobre os ciclos; desligado a menos que PAINEL_PROFILE=1."""
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.ativo = PROFILE_ATIVO
+        self.ciclos = 0
+        self.perfil = cProfile.Profile() if self.ativo else None
+
+    @contextmanager
+    def ciclo(self):
+        if not self.ativo:
+            yield
+            return
+        self.perfil.enable()
+        try:
+            yield
+        finally:
+            self.perfil.disable()
+            self.ciclos += 1
+            if self.ciclos % PROFILE_CICLOS == 0:
+                self.salvar()
+
+    def salvar(self):
+        os.makedirs(LOG_DIR, exist_ok=True)
+        caminho = os.path.join(LOG_DIR, f"perfil_{datetime.now():%Y%m%d_%H%M%S}.prof")
+        self.perfil.dump_stats(caminho)
+        self.perfil = cProfile.Profile()
+        self.logger.info("Perfil de %d ciclos salvo em %s", PROFILE_CICLOS, caminho)
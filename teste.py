@@ -1,37 +1,177 @@
+import os
+from datetime import datetime, timedelta
+
 import streamlit as st
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
 
+from consultas import SQL_LINHAS, filtros_pedidos
+from painel_fontes import TZ
+
+# Painel de análises (Streamlit): `streamlit run teste.py`
+# Toda agregação roda no banco (GROUP BY sobre colunas indexadas) e só o resultado, já pequeno,
+# vem para a sessão; a tabela de pedidos é lida uma página por vez. Os resultados ficam em cache
+# por TTL_CONSULTAS_S, então reruns (mudar um filtro, trocar de página) não voltam ao banco para o que já foi lido.
+
 # Configuração do banco
 DB_USER = "postgres"
 DB_PASS = "2025"   # 🔒 troque pela senha real do seu banco
 DB_HOST = "localhost"   # ou o nome do container (ex: "db") se usar Docker Compose
 DB_PORT = "5432"
 DB_NAME = "pedidos_db"
+# Mesma variável da aplicação (crud.py); sem ela, os valores acima
+DATABASE_URL = os.environ.get('DATABASE_URL', f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
+
+TTL_CONSULTAS_S = 5 * 60
+PERIODO_PADRAO_DIAS = 90
+TOP_EQUIPAMENTOS = 15
+PEDIDOS_POR_PAGINA = 50
+
+# Tipo do pedido como no relatório de atividades (consultas.SQL_RELATORIO_REALIZADAS)
+SQL_TIPO = "CASE WHEN LOWER(p.equipamento) LIKE '%teravix%' THEN 'OP' ELSE 'PV' END"
+
+SQL_VAZAO_DIARIA = """
+    SELECT p.dia_conclusao AS dia, COUNT(*) AS pedidos, COALESCE(SUM(p.quantidade), 0) AS unidades
+    FROM pedidos_tb p
+    WHERE p.status_id = 4 AND p.dia_conclusao BETWEEN :inicio AND :fim {filtro_linha}
+    GROUP BY p.dia_conclusao
+    ORDER BY p.dia_conclusao
+"""
+
+SQL_VAZAO_TIPO = f"""
+    SELECT {SQL_TIPO} AS tipo, COUNT(*) AS pedidos, COALESCE(SUM(p.quantidade), 0) AS unidades
+    FROM pedidos_tb p
+    WHERE p.status_id = 4 AND p.dia_conclusao BETWEEN :inicio AND :fim {{filtro_linha}}
+    GROUP BY tipo
+    ORDER BY tipo
+"""
+
+SQL_VAZAO_EQUIPAMENTO = """
+    SELECT p.equipamento, COUNT(*) AS pedidos, COALESCE(SUM(p.quantidade), 0) AS unidades
+    FROM pedidos_tb p
+    WHERE p.status_id = 4 AND p.dia_conclusao BETWEEN :inicio AND :fim {filtro_linha}
+    GROUP BY p.equipamento
+    ORDER BY unidades DESC, p.equipamento
+    LIMIT :limite
+"""
+
+SQL_FILA_STATUS = """
+    SELECT s.nome_status AS status, COUNT(*) AS pedidos, COALESCE(SUM(p.quantidade), 0) AS unidades
+    FROM pedidos_tb p
+    JOIN status_td s ON p.status_id = s.id
+    WHERE p.status_id NOT IN (4, 6) {filtro_linha}
+    GROUP BY s.id, s.nome_status
+    ORDER BY s.id
+"""
+
+SQL_PAGINA_PEDIDOS = """
+    SELECT p.id, p.pv, p.equipamento, p.descricao_servico, p.quantidade, s.nome_status AS status,
+           l.nome AS linha, p.urgente, p.prioridade, p.data_criacao, p.data_conclusao
+    FROM pedidos_tb p
+    LEFT JOIN status_td s ON p.status_id = s.id
+    LEFT JOIN linha_td l ON p.linha_id = l.id
+    WHERE {condicoes}
+    ORDER BY p.id DESC
+    LIMIT :limite OFFSET :deslocamento
+"""
+
+
+# --- ACESSO AO BANCO (uma engine por processo; consultas em cache por parâmetros) ---
+@st.cache_resource
+def obter_engine():
+    return create_engine(DATABASE_URL, pool_pre_ping=True)
+
+
+def _filtro_linha(linha_id):
+    return ("AND p.linha_id = :linha", {"linha": linha_id}) if linha_id is not None else ("", {})
 
-# Criar conexão com o PostgreSQL
-engine = create_engine(
-    f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-)
 
+@st.cache_data(ttl=TTL_CONSULTAS_S, show_spinner=False)
+def consultar(sql, params):
+    """DataFrame de uma consulta já agregada/paginada; `params` entra na chave do cache."""
+    with obter_engine().connect() as conn:
+        return pd.read_sql(text(sql), conn, params=dict(params))
+
+
+def agregado(sql, inicio, fim, linha_id, **extras):
+    filtro_linha, params = _filtro_linha(linha_id)
+    params.update(inicio=inicio, fim=fim, **extras)
+    return consultar(sql.format(filtro_linha=filtro_linha), tuple(sorted(params.items())))
+
+
+@st.cache_data(ttl=TTL_CONSULTAS_S, show_spinner=False)
+def contar_pedidos(condicoes, params):
+    with obter_engine().connect() as conn:
+        return conn.execute(text(f"SELECT COUNT(*) FROM pedidos_tb p WHERE {condicoes}"), dict(params)).scalar_one()
+
+
+# --- TELA ---
+st.set_page_config(page_title="Análises de Pedidos", page_icon="📊", layout="wide")
 st.title("📊 Painel de Pedidos")
 
 try:
-    # Ler dados da tabela
-    query = "SELECT * FROM public.pedidos_tb;"
-    df = pd.read_sql(query, engine)
+    linhas = consultar(SQL_LINHAS, ())
+    hoje = datetime.now(TZ).date()
 
-    # Exibir dados
-    st.subheader("📋 Tabela de Pedidos")
-    st.dataframe(df)
+    with st.sidebar:
+        st.header("Filtros")
+        periodo = st.date_input("Período (conclusão)", (hoje - timedelta(days=PERIODO_PADRAO_DIAS), hoje), max_value=hoje)
+        opcoes_linha = {"Todas": None, **{nome: int(id_) for id_, nome in zip(linhas['id'], linhas['nome'])}}
+        linha_id = opcoes_linha[st.selectbox("Linha de produção", list(opcoes_linha))]
 
-    # Estatísticas simples
-    st.subheader("📈 Resumo")
-    st.write("✅ Total de pedidos:", len(df))
+    # Enquanto o usuário escolhe a segunda data, o date_input devolve só a primeira
+    inicio, fim = (periodo[0], periodo[-1]) if isinstance(periodo, (tuple, list)) else (periodo, periodo)
 
-    if "valor" in df.columns:
-        st.write("💰 Valor total:", df["valor"].sum())
+    # --- VAZÃO NO PERÍODO ---
+    diario = agregado(SQL_VAZAO_DIARIA, inicio, fim, linha_id)
+    por_tipo = agregado(SQL_VAZAO_TIPO, inicio, fim, linha_id)
+    por_equipamento = agregado(SQL_VAZAO_EQUIPAMENTO, inicio, fim, linha_id, limite=TOP_EQUIPAMENTOS)
+
+    st.subheader("📈 Vazão no período")
+    total_pedidos, total_unidades = int(diario['pedidos'].sum()), int(diario['unidades'].sum())
+    dias_com_producao = max(len(diario), 1)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("✅ Pedidos concluídos", f"{total_pedidos}")
+    c2.metric("🖥️ Unidades concluídas", f"{total_unidades}")
+    c3.metric("📅 Média por dia com produção", f"{total_unidades / dias_com_producao:.1f} máq.")
+
+    if diario.empty:
+        st.info("Nenhum pedido concluído no período.")
+    else:
+        serie = diario.assign(dia=pd.to_datetime(diario['dia'])).set_index('dia')
+        # Dias sem conclusão aparecem como zero no gráfico (o banco só devolve dias com produção)
+        serie = serie.reindex(pd.date_range(inicio, fim), fill_value=0)
+        st.bar_chart(serie['unidades'])
+
+        col_tipo, col_equip = st.columns([1, 2])
+        with col_tipo:
+            st.markdown("**Por tipo**")
+            st.dataframe(por_tipo, hide_index=True, use_container_width=True)
+        with col_equip:
+            st.markdown(f"**Top {TOP_EQUIPAMENTOS} equipamentos (unidades)**")
+            st.bar_chart(por_equipamento.set_index('equipamento')['unidades'])
+
+    # --- FILA ATUAL ---
+    filtro_linha, params_linha = _filtro_linha(linha_id)
+    fila = consultar(SQL_FILA_STATUS.format(filtro_linha=filtro_linha), tuple(sorted(params_linha.items())))
+    st.subheader("🛠️ Fila atual por status")
+    st.dataframe(fila, hide_index=True, use_container_width=True)
+
+    # --- TABELA DE PEDIDOS (paginada no banco) ---
+    st.subheader("📋 Tabela de Pedidos")
+    abas = {"Em andamento": "andamento", "Concluídos": "concluido", "Cancelados": "cancelado"}
+    aba = st.radio("Pedidos", list(abas), horizontal=True, label_visibility="collapsed")
+    # Mesmos filtros da listagem da interface web (aba e linha)
+    condicoes, params = filtros_pedidos({"filtro": abas[aba], "linha": str(linha_id) if linha_id is not None else None})
+    condicoes = " AND ".join(condicoes)
+    total = contar_pedidos(condicoes, tuple(sorted(params.items())))
+    paginas = max(1, -(-total // PEDIDOS_POR_PAGINA))
+    pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1, step=1)
+    params.update(limite=PEDIDOS_POR_PAGINA, deslocamento=(pagina - 1) * PEDIDOS_POR_PAGINA)
+    st.dataframe(consultar(SQL_PAGINA_PEDIDOS.format(condicoes=condicoes), tuple(sorted(params.items()))),
+                 hide_index=True, use_container_width=True)
+    st.caption(f"{total} pedidos · {PEDIDOS_POR_PAGINA} por página · resultados em cache por {TTL_CONSULTAS_S // 60} min")
 
 except SQLAlchemyError as e:
     st.error(f"Erro ao conectar ou consultar o banco: {e}")
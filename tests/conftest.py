@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, text
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# O crud.py cria as tabelas e a fila de tarefas ao ser importado: aponta para um SQLite
+# descartável, sem workers, antes do import. Hash de senha barato e sem limite de tentativas,
+# já que cada teste faz o próprio login.
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='painel-testes-'), 'importacao.db')
+os.environ['TAREFAS_THREADS'] = '0'
+os.environ['SENHA_HASH_METODO'] = 'pbkdf2:sha256:1000'
+os.environ['LOGIN_RAJADA_USUARIO'] = os.environ['LOGIN_RAJADA_IP'] = '100000'
+
+import crud  # noqa: E402
+from esquema import preparar_esquema  # noqa: E402
+
+# Banco PostgreSQL de testes (opcional). ATENÇÃO: as tabelas do painel são esvaziadas a cada teste.
+TESTE_POSTGRES_URL = os.environ.get('TESTE_POSTGRES_URL')
+TABELAS_ESVAZIADAS = ('pedidos_alteracoes_tb', 'historico_status_tb', 'pedidos_finalizados_dia_tb',
+                      'pedidos_tb', 'sessoes_tb', 'usuario_tb', 'tarefas_tb')
+
+
+def _preparar(engine):
+    crud.Base.metadata.create_all(engine)
+    preparar_esquema(engine)
+    db_session = crud.SessionLocal(bind=engine)
+    try:
+        crud.popular_dados_iniciais(db_session)
+    finally:
+        db_session.close()
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def banco(request, tmp_path):
+    """Engine de um banco limpo, com o esquema completo (DDL de esquema.py), ligada ao crud."""
+    if request.param == 'sqlite':
+        engine = create_engine(f"sqlite:///{tmp_path / 'pedidos.db'}")
+    else:
+        if not TESTE_POSTGRES_URL:
+            pytest.skip("defina TESTE_POSTGRES_URL para rodar contra o PostgreSQL")
+        engine = create_engine(TESTE_POSTGRES_URL)
+    _preparar(engine)
+    if engine.dialect.name == 'postgresql':
+        with engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE {', '.join(TABELAS_ESVAZIADAS)} RESTART IDENTITY CASCADE"))
+
+    originais = (crud.engine, crud.app.session_interface.engine)
+    crud.engine = engine
+    crud.SessionLocal.configure(bind=engine)
+    crud.app.session_interface.engine = engine
+    crud.app.session_interface.cache.descartar(username='teste')
+    yield engine
+    crud.engine, crud.app.session_interface.engine = originais
+    crud.SessionLocal.configure(bind=originais[0])
+    engine.dispose()
+
+
+@pytest.fixture
+def cliente(banco):
+    """Cliente de teste do Flask já autenticado como o usuário 'teste'."""
+    db_session = crud.SessionLocal()
+    try:
+        usuario = crud.UsuarioTb(username='teste', nome_completo='Usuário de Teste', nivel_acesso='admin')
+        usuario.set_password('senha')
+        db_session.add(usuario)
+        db_session.commit()
+    finally:
+        db_session.close()
+    crud.app.config['TESTING'] = True
+    cliente = crud.app.test_client()
+    resposta = cliente.post('/login', data={'username': 'teste', 'password': 'senha'})
+    assert resposta.status_code == 302
+    return cliente
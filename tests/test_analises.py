@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+BACKLOG, MONTAGEM, CONCLUIDO, PENDENTE = 2, 3, 4, 5
+INICIO = datetime(2026, 3, 2, 10, tzinfo=timezone.utc)  # segunda-feira
+
+
+def pedido_com_historico(banco, equipamento, etapas):
+    """Pedido cujo histórico é exatamente `etapas` [(horas desde INICIO, status)]."""
+    instantes = [(INICIO + timedelta(hours=horas), status) for horas, status in etapas]
+    status_final = instantes[-1][1]
+    with banco.begin() as conn:
+        pedido_id = conn.execute(text(
+            "INSERT INTO pedidos_tb (pv, equipamento, quantidade, status_id, data_criacao, data_conclusao) "
+            "VALUES ('PV-1', :equipamento, 1, :status, :criacao, :conclusao) RETURNING id"), {
+            "equipamento": equipamento, "status": status_final, "criacao": instantes[0][0],
+            "conclusao": instantes[-1][0] if status_final == CONCLUIDO else None}).scalar_one()
+        conn.execute(text("DELETE FROM historico_status_tb WHERE pedido_id = :id"), {"id": pedido_id})
+        anterior = None
+        for instante, status in instantes:
+            conn.execute(text("INSERT INTO historico_status_tb (pedido_id, status_anterior, status_alterado, data_mudanca) "
+                              "VALUES (:id, :anterior, :status, :instante)"),
+                         {"id": pedido_id, "anterior": anterior, "status": status, "instante": instante})
+            anterior = status
+    return pedido_id
+
+
+def test_lead_time_espera_e_tempo_em_status(cliente, banco):
+    # PV: 10 h na fila, 2 h montando
+    pedido_com_historico(banco, "Notebook Dell", [(0, BACKLOG), (10, MONTAGEM), (12, CONCLUIDO)])
+    # OP: 24 h na fila, pendência de 24 h no meio da montagem, conclusão dois dias depois
+    pedido_com_historico(banco, "TERAVIX T300", [(2, BACKLOG), (26, MONTAGEM), (28, PENDENTE), (52, MONTAGEM),
+                                                 (56, CONCLUIDO)])
+    # Fora do período e ainda em montagem: não entram
+    pedido_com_historico(banco, "Notebook Dell", [(0, BACKLOG), (400, CONCLUIDO)])
+    pedido_com_historico(banco, "Notebook Dell", [(0, BACKLOG), (5, MONTAGEM)])
+
+    resposta = cliente.get('/api/analises/lead-time?inicio=2026-03-01&fim=2026-03-08')
+
+    assert resposta.status_code == 200
+    corpo = resposta.get_json()
+    assert corpo['pedidos'] == 2
+    assert corpo['lead_time']['geral'] == {"n": 2, "media": 33.0, "p50": 33.0, "p85": 47.7, "p95": 51.9}
+    assert [(g['tipo'], g['media']) for g in corpo['lead_time']['por_tipo']] == [("OP", 54.0), ("PV", 12.0)]
+    assert [(g['semana'], g['n']) for g in corpo['lead_time']['por_semana']] == [("2026-03-02", 2)]
+    assert corpo['espera_fila']['geral']['media'] == 17.0
+    tempo = {g['status']: (g['n'], g['media']) for g in corpo['tempo_em_status']}
+    assert tempo == {"Backlog": (2, 17.0), "Em Montagem": (3, 2.7), "Pendente": (1, 24.0)}
+
+
+def test_periodo_sem_pedidos_e_datas_invalidas(cliente, banco):
+    assert cliente.get('/api/analises/lead-time?inicio=2020-01-01&fim=2020-01-31').get_json()['pedidos'] == 0
+    assert cliente.get('/api/analises/lead-time?inicio=2026-13-01').status_code == 400
+    assert cliente.get('/api/analises/lead-time?inicio=2026-03-08&fim=2026-03-01').status_code == 400
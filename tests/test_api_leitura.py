@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+import api_leitura
+from sessoes import COOKIE_SESSAO
+
+PEDIDO = {"equipamento": "TERAVIX T1", "quantidade": 3, "descricao_servico": "Montagem", "status_id": 2, "imagem_id": 1}
+
+
+@pytest.fixture
+def ler(banco, monkeypatch):
+    """Faz GETs na API assíncrona ligada ao mesmo banco do crud; devolve [(status, json)]."""
+    monkeypatch.setattr(api_leitura, 'engine', api_leitura.criar_engine(banco.url.render_as_string(hide_password=False)))
+
+    async def ler_async(caminhos, cookie):
+        async with TestClient(TestServer(api_leitura.criar_app()), cookies=cookie) as cliente:
+            respostas = []
+            for caminho in caminhos:
+                resposta = await cliente.get(caminho)
+                respostas.append((resposta.status, await resposta.json()))
+            return respostas
+
+    return lambda caminhos, cookie=None: asyncio.run(ler_async(caminhos, cookie))
+
+
+def test_mesmo_json_que_o_crud(cliente, ler):
+    for pv in ("PV-100", "PV-101"):
+        assert cliente.post('/pedidos', json=dict(PEDIDO, pv=pv)).status_code == 201
+    pedido_id = cliente.get('/pedidos').get_json()[0]['id']
+    assert cliente.put(f'/pedidos/{pedido_id}', json={"versao": 1, "status_id": 3}).status_code == 200
+    caminhos = ['/pedidos', '/pedidos?filtro=andamento&linha=1', '/status', '/linhas', '/imagem',
+                f'/pedidos/{pedido_id}/historico', '/api/alteracoes?desde=1&limite=2', '/api/pedidos/busca?q=']
+
+    respostas = ler(caminhos, {COOKIE_SESSAO: cliente.get_cookie(COOKIE_SESSAO).value})
+
+    for caminho, (status, corpo) in zip(caminhos, respostas):
+        assert status == 200, caminho
+        assert corpo == cliente.get(caminho).get_json(), caminho
+
+
+def test_sem_sessao_ou_parametro_invalido(cliente, ler):
+    cookie = {COOKIE_SESSAO: cliente.get_cookie(COOKIE_SESSAO).value}
+
+    assert ler(['/pedidos'])[0][0] == 401
+    assert ler(['/pedidos'], {COOKIE_SESSAO: 'inexistente'})[0][0] == 401
+    assert [status for status, _ in ler(['/api/alteracoes?desde=x', '/api/pedidos/busca?q=PV&limite=x'], cookie)] == [400, 400]
@@ -0,0 +1,23 @@
+import itertools
+
+from sqlalchemy import text
+
+from armazem_pedidos import SQL_ORDEM_FILA, ArmazemPedidos
+
+
+def test_ordem_do_armazem_igual_a_da_consulta(banco):
+    # Todas as combinações de urgente e prioridade, inclusive NULL, e empates desfeitos pelo id
+    combinacoes = list(itertools.product([True, False, None], [2, 1, None])) * 2
+    with banco.begin() as conn:
+        for numero, (urgente, prioridade) in enumerate(reversed(combinacoes)):
+            conn.execute(text("INSERT INTO pedidos_tb (pv, status_id, urgente, prioridade) "
+                              "VALUES (:pv, 1, :urgente, :prioridade)"),
+                         {"pv": f"PV-{numero}", "urgente": urgente, "prioridade": prioridade})
+    with banco.connect() as conn:
+        linhas = conn.execute(text(f"SELECT p.id, p.versao, p.urgente, p.prioridade FROM pedidos_tb p "
+                                   f"ORDER BY {SQL_ORDEM_FILA}")).mappings().all()
+    armazem = ArmazemPedidos()
+    armazem.atualizar(dict(linha) for linha in reversed(linhas))
+
+    assert armazem.para_dataframe()['id'].tolist() == [linha['id'] for linha in linhas]
+    assert [(linha['urgente'], linha['prioridade']) for linha in linhas[:3]] == [(None, 1), (None, 1), (None, 2)]
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+import autenticacao
+from autenticacao import BaldeTokens, LimitadorTaxa, LoginSobrecarregado, executar_hash
+
+
+def test_balde_esgota_a_rajada_e_repoe_com_o_tempo():
+    balde = BaldeTokens(capacidade=3, taxa_por_segundo=0.5, agora=100.0)
+
+    assert [balde.consumir(100.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert balde.consumir(100.0) == pytest.approx(2.0)  # um token a cada 2 s
+    assert balde.consumir(101.0) == pytest.approx(1.0)
+    assert balde.consumir(102.0) == 0.0
+    # Parado por muito tempo, volta só até a capacidade
+    balde.consumir(1000.0)
+    assert balde.tokens == pytest.approx(2.0)
+
+
+def test_limitador_separa_as_chaves_e_libera_baldes_cheios():
+    limitador = LimitadorTaxa(capacidade=2, por_minuto=60, max_chaves=2)
+
+    assert [limitador.consumir("ana") for _ in range(2)] == [0.0, 0.0]
+    assert limitador.consumir("ana") > 0
+    assert limitador.consumir("bruno") == 0.0
+    # No máximo de chaves, sai o balde que já se encheu de novo (bruno); o de ana, vazio, fica
+    limitador._baldes["bruno"].tokens = 2
+    limitador.consumir("carla")
+    assert set(limitador._baldes) == {"ana", "carla"}
+
+
+def test_login_alem_do_limite_responde_429(cliente, monkeypatch):
+    monkeypatch.setattr(autenticacao, 'limitador_usuario', LimitadorTaxa(capacidade=2, por_minuto=1))
+
+    respostas = [cliente.post('/login', data={'username': 'teste', 'password': 'errada'}) for _ in range(3)]
+
+    assert [resposta.status_code for resposta in respostas] == [302, 302, 429]
+    # Outro usuário não é afetado
+    assert cliente.post('/login', data={'username': 'outro', 'password': 'x'}).status_code == 302
+
+
+def test_hash_com_executor_cheio_e_recusado(monkeypatch):
+    monkeypatch.setattr(autenticacao, '_vagas', threading.BoundedSemaphore(1))
+    comecou, liberar = threading.Event(), threading.Event()
+
+    def hash_lento():
+        comecou.set()
+        liberar.wait(5)
+
+    ocupado = threading.Thread(target=executar_hash, args=(hash_lento,))
+    ocupado.start()
+    comecou.wait(5)
+    try:
+        with pytest.raises(LoginSobrecarregado):
+            executar_hash(len, "senha")
+    finally:
+        liberar.set()
+        ocupado.join()
+
+
+def test_login_com_executor_cheio_responde_503(cliente, monkeypatch):
+    vagas = threading.BoundedSemaphore(1)
+    vagas.acquire()
+    monkeypatch.setattr(autenticacao, '_vagas', vagas)
+
+    resposta = cliente.post('/login', data={'username': 'teste', 'password': 'senha'})
+
+    assert resposta.status_code == 503
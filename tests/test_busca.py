@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import text
+
+PEDIDO = {"equipamento": "Notebook Dell", "quantidade": 1, "descricao_servico": "Montagem", "status_id": 2, "imagem_id": 1}
+
+
+@pytest.fixture
+def pedidos(cliente, banco):
+    if banco.dialect.name == 'postgresql':
+        with banco.connect() as conn:
+            if conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is None:
+                pytest.skip("a busca no PostgreSQL precisa da extensão pg_trgm")
+    cadastrados = {}
+    for pv, campos in [("PV-5501", {}), ("PV-55012", {}), ("PV-7755", {}),
+                       ("PV-9000", {"equipamento": "TERAVIX T300"}), ("PV-9001", {"status_id": 4}),
+                       ("PV-50%", {})]:
+        resposta = cliente.post('/pedidos', json=dict(PEDIDO, pv=pv, **campos))
+        assert resposta.status_code == 201
+        cadastrados[pv] = resposta.get_json()['id']
+    return cadastrados
+
+
+def buscar(cliente, consulta):
+    resposta = cliente.get('/api/pedidos/busca?' + consulta)
+    assert resposta.status_code == 200
+    return [pedido['pv'] for pedido in resposta.get_json()]
+
+
+def test_exato_e_prefixo_antes_de_parcial(cliente, pedidos):
+    assert buscar(cliente, 'q=PV-5501') == ["PV-5501", "PV-55012"]
+    assert buscar(cliente, 'q=5501') == ["PV-5501", "PV-55012"]
+    assert buscar(cliente, 'q=55') == []  # curto: só prefixo do PV
+    assert buscar(cliente, 'q=pv-77') == ["PV-7755"]
+
+
+def test_busca_no_equipamento_e_respeita_a_aba(cliente, pedidos):
+    assert buscar(cliente, 'q=teravix') == ["PV-9000"]
+    assert buscar(cliente, 'q=PV-900&filtro=andamento') == ["PV-9000"]
+    assert buscar(cliente, 'q=PV-900&filtro=concluido') == ["PV-9001"]
+
+
+def test_curingas_do_like_sao_literais(cliente, pedidos):
+    assert buscar(cliente, 'q=PV-50%25') == ["PV-50%"]
+    assert buscar(cliente, 'q=PV-_5') == []
+
+
+def test_limite_e_termo_vazio(cliente, pedidos):
+    assert len(buscar(cliente, 'q=PV-&limite=2')) == 2
+    assert buscar(cliente, 'q=') == []
+    assert cliente.get('/api/pedidos/busca?q=PV&limite=x').status_code == 400
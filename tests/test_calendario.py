@@ -0,0 +1,56 @@
+import os
+import json
+from datetime import date
+
+import numpy as np
+
+import calendario
+from calendario import CalendarioProducao, feriados_nacionais, obter_calendario, pascoa
+
+
+def test_pascoa_e_feriados_moveis():
+    assert pascoa(2026) == date(2026, 4, 5)
+    assert pascoa(2027) == date(2027, 3, 28)
+    feriados = feriados_nacionais(2026, moveis=("carnaval", "sexta_feira_santa", "corpus_christi"))
+    assert {date(2026, 2, 17), date(2026, 4, 3), date(2026, 6, 4), date(2026, 4, 21)} <= set(feriados)
+
+
+def test_feriados_locais_e_paradas_nao_sao_dias_uteis():
+    cal = CalendarioProducao.de_config({"feriados": ["2026-03-19"],
+                                        "paradas": [{"inicio": "2026-03-23", "fim": "2026-03-25"}]}, ano_base=2026)
+
+    # Março/2026: 22 dias de semana, menos o feriado local e os três dias de parada
+    assert cal.dias_uteis(date(2026, 3, 1), date(2026, 4, 1)) == 18
+    assert not cal.eh_dia_util(date(2026, 4, 3))  # sexta-feira santa
+    assert cal.somar_dias_uteis(date(2026, 3, 20), 1) == np.datetime64('2026-03-26')
+
+
+def test_contagem_pre_calculada_igual_ao_busday_count():
+    cal = CalendarioProducao.de_config({"dias_semana": "1111110"}, ano_base=2026)
+    inicio = np.arange(np.datetime64('2023-01-01'), np.datetime64('2030-01-01'), 97, dtype='datetime64[D]')
+    fim = inicio + 45
+
+    esperado = np.busday_count(inicio, fim, busdaycal=cal.calendario)
+    assert (cal.dias_uteis(inicio, fim) == esperado).all()
+    # Fora da faixa pré-calculada cai no np.busday_count
+    assert cal.dias_uteis(date(2040, 1, 1), date(2040, 2, 1)) == np.busday_count('2040-01-01', '2040-02-01', busdaycal=cal.calendario)
+
+
+def test_calendario_compartilhado_recarrega_quando_o_arquivo_muda(tmp_path, monkeypatch):
+    monkeypatch.setattr(calendario, '_cache', {"chave": None, "calendario": None})
+    caminho = tmp_path / 'calendario.json'
+    caminho.write_text(json.dumps({"feriados": ["2026-03-19"]}))
+
+    primeiro = obter_calendario(str(caminho))
+    assert obter_calendario(str(caminho)) is primeiro
+    assert not primeiro.eh_dia_util(date(2026, 3, 19))
+
+    caminho.write_text(json.dumps({"feriados": []}))
+    os.utime(caminho, (0, os.path.getmtime(caminho) + 10))
+    segundo = obter_calendario(str(caminho))
+    assert segundo is not primeiro and segundo.eh_dia_util(date(2026, 3, 19))
+
+    # Arquivo inválido: só os feriados nacionais
+    caminho.write_text("{")
+    os.utime(caminho, (0, os.path.getmtime(caminho) + 20))
+    assert not obter_calendario(str(caminho)).eh_dia_util(date(2026, 4, 21))
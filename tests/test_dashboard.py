@@ -0,0 +1,67 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+st = pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PEDIDO = {"descricao_servico": "Montagem", "status_id": 2, "imagem_id": 1}
+
+
+@pytest.fixture
+def dashboard(cliente, banco, monkeypatch):
+    """teste.py rodando contra o banco do teste (engine e consultas em cache zeradas)."""
+    monkeypatch.setenv('DATABASE_URL', banco.url.render_as_string(hide_password=False))
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    yield AppTest.from_file(os.path.join(RAIZ, 'teste.py'), default_timeout=30)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+def criar(cliente, status_id=None, **campos):
+    pedido_id = cliente.post('/pedidos', json=dict(PEDIDO, **campos)).get_json()['id']
+    if status_id is not None:
+        assert cliente.put(f'/pedidos/{pedido_id}', json={"versao": 1, "status_id": status_id}).status_code == 200
+    return pedido_id
+
+
+def test_vazao_e_fila_agregadas_no_banco(cliente, dashboard):
+    criar(cliente, 4, pv="OP-1", equipamento="TERAVIX T300", quantidade=3)
+    criar(cliente, 4, pv="PV-2", equipamento="Notebook", quantidade=2)
+    criar(cliente, 6, pv="PV-3", equipamento="Notebook", quantidade=7)
+    criar(cliente, pv="PV-4", equipamento="Notebook", quantidade=5)
+
+    dashboard.run()
+
+    assert not dashboard.exception and not dashboard.error
+    assert [m.value for m in dashboard.metric] == ["2", "5", "5.0 máq."]
+    por_tipo, fila, pedidos = (df.value for df in dashboard.dataframe)
+    assert por_tipo[['tipo', 'pedidos', 'unidades']].values.tolist() == [['OP', 1, 3], ['PV', 1, 2]]
+    assert fila[['status', 'pedidos', 'unidades']].values.tolist() == [['Backlog', 1, 5]]
+    assert pedidos['pv'].tolist() == ["PV-4"]
+
+    dashboard.radio[0].set_value("Concluídos").run()
+    assert dashboard.dataframe[-1].value['pv'].tolist() == ["PV-2", "OP-1"]
+
+
+def test_filtro_de_linha(cliente, banco, dashboard):
+    with banco.begin() as conn:
+        linha_2 = conn.execute(text("SELECT id FROM linha_td WHERE nome = 'Linha 2'")).scalar()
+        if linha_2 is None:
+            linha_2 = conn.execute(text("INSERT INTO linha_td (nome, meta_semanal) VALUES ('Linha 2', 50) RETURNING id")).scalar_one()
+    criar(cliente, 4, pv="PV-1", equipamento="Notebook", quantidade=2)
+    criar(cliente, 4, pv="PV-2", equipamento="Notebook", quantidade=4, linha_id=linha_2)
+    criar(cliente, pv="PV-3", equipamento="Notebook", quantidade=1, linha_id=linha_2)
+    dashboard.run()
+    assert dashboard.metric[1].value == "6"
+
+    dashboard.sidebar.selectbox[0].set_value("Linha 2").run()
+
+    assert [m.value for m in dashboard.metric[:2]] == ["1", "4"]
+    assert dashboard.dataframe[1].value['status'].tolist() == ["Backlog"]
+    assert dashboard.dataframe[-1].value['pv'].tolist() == ["PV-3"]
+    dashboard.sidebar.selectbox[0].set_value("Linha 1").run()
+    assert dashboard.metric[1].value == "2" and dashboard.dataframe[-1].value.empty
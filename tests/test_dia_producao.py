@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+# 01:00 UTC ainda é o dia anterior em Brasília (UTC-3)
+MADRUGADA_UTC = datetime(2026, 3, 1, 1, 0, tzinfo=timezone.utc)
+FIM_DO_MES_UTC = datetime(2026, 4, 1, 2, 30, tzinfo=timezone.utc)
+
+
+def inserir(banco, pv, status_id, criacao, conclusao=None):
+    with banco.begin() as conn:
+        return conn.execute(text(
+            "INSERT INTO pedidos_tb (pv, equipamento, quantidade, status_id, data_criacao, data_conclusao) "
+            "VALUES (:pv, 'Notebook', 1, :status, :criacao, :conclusao) RETURNING id"),
+            {"pv": pv, "status": status_id, "criacao": criacao, "conclusao": conclusao}).scalar_one()
+
+
+def dias(banco, pedido_id):
+    with banco.connect() as conn:
+        linha = conn.execute(text("SELECT dia_criacao, dia_conclusao FROM pedidos_tb WHERE id = :id"),
+                             {"id": pedido_id}).first()
+    return tuple(None if dia is None else str(dia) for dia in linha)
+
+
+def listados(cliente, consulta):
+    return [p['pv'] for p in cliente.get('/pedidos?' + consulta).get_json()]
+
+
+def test_dia_de_producao_e_o_de_brasilia(cliente, banco):
+    aberto = inserir(banco, "PV-1", 2, MADRUGADA_UTC)
+    concluido = inserir(banco, "PV-2", 4, MADRUGADA_UTC, FIM_DO_MES_UTC)
+
+    assert dias(banco, aberto) == ("2026-02-28", None)
+    assert dias(banco, concluido) == ("2026-02-28", "2026-03-31")
+
+
+def test_filtro_de_mes_usa_o_dia_de_brasilia(cliente, banco):
+    inserir(banco, "PV-1", 2, MADRUGADA_UTC)
+    inserir(banco, "PV-2", 4, MADRUGADA_UTC, FIM_DO_MES_UTC)
+
+    assert listados(cliente, 'mes=2&ano=2026') == ["PV-1"]
+    assert listados(cliente, 'mes=3&ano=2026') == []
+    # Concluídos filtram pelo dia da conclusão
+    assert listados(cliente, 'filtro=concluido&mes=3&ano=2026') == ["PV-2"]
+    assert listados(cliente, 'filtro=concluido&mes=3') == ["PV-2"]
+    assert listados(cliente, 'filtro=concluido&mes=4&ano=2026') == []
+
+
+def test_conclusao_pela_api_preenche_o_dia(cliente, banco):
+    resposta = cliente.post('/pedidos', json={"pv": "PV-3", "equipamento": "Notebook", "quantidade": 1,
+                                              "descricao_servico": "Montagem", "status_id": 2, "imagem_id": 1})
+    pedido_id = resposta.get_json()['id']
+
+    assert cliente.put(f'/pedidos/{pedido_id}', json={"versao": 1, "status_id": 4}).status_code == 200
+
+    with banco.connect() as conn:
+        conclusao = conn.execute(text("SELECT data_conclusao FROM pedidos_tb WHERE id = :id"), {"id": pedido_id}).scalar()
+    if not isinstance(conclusao, datetime):
+        conclusao = datetime.fromisoformat(conclusao).replace(tzinfo=timezone.utc)
+    assert dias(banco, pedido_id)[1] == (conclusao.astimezone(timezone.utc) - timedelta(hours=3)).date().isoformat()
@@ -0,0 +1,51 @@
+import random
+import threading
+
+import pytest
+from sqlalchemy import text
+
+PEDIDO = {"pv": "PV-100", "equipamento": "TERAVIX T1", "quantidade": 1, "descricao_servico": "Montagem",
+          "status_id": 2, "imagem_id": 1}
+ESCRITORES, ESCRITAS = 6, 40
+
+
+def escrever(banco, pedidos, falhas):
+    try:
+        for _ in range(ESCRITAS):
+            with banco.begin() as conn:
+                conn.execute(text("UPDATE pedidos_tb SET quantidade = quantidade + 1, versao = versao + 1 "
+                                  "WHERE id = :id"), {"id": random.choice(pedidos)})
+                # Demora entre a escrita e o COMMIT: é nessa janela que um seq tirado na escrita
+                # ficaria visível fora de ordem
+                conn.execute(text("SELECT pg_sleep(:s)"), {"s": random.random() / 200})
+    except Exception as erro:
+        falhas.append(erro)
+
+
+def test_leitores_nao_pulam_entradas_com_escritas_concorrentes(cliente, banco):
+    if banco.dialect.name != 'postgresql':
+        pytest.skip("o SQLite serializa as escritas")
+    pedidos = [cliente.post('/pedidos', json=dict(PEDIDO, pv=f"PV-{i}")).get_json()['id'] for i in range(4)]
+    falhas = []
+    escritores = [threading.Thread(target=escrever, args=(banco, pedidos, falhas)) for _ in range(ESCRITORES)]
+    for escritor in escritores:
+        escritor.start()
+
+    lidas, desde = [], 0
+    while True:
+        terminaram = not any(escritor.is_alive() for escritor in escritores)
+        corpo = cliente.get(f'/api/alteracoes?desde={desde}&limite=7').get_json()
+        lidas += corpo['alteracoes']
+        desde = corpo['ultima']
+        if terminaram and not corpo['mais']:
+            break
+
+    assert falhas == []
+    with banco.connect() as conn:
+        todas = [linha[0] for linha in conn.execute(text("SELECT seq FROM pedidos_alteracoes_tb ORDER BY seq"))]
+    # Lendo aos poucos durante as escritas, o leitor viu exatamente o que uma leitura no fim vê
+    assert [alteracao['seq'] for alteracao in lidas] == todas
+    assert len(todas) == len(pedidos) + ESCRITORES * ESCRITAS
+    for pedido_id in pedidos:
+        versoes = [alteracao['versao'] for alteracao in lidas if alteracao['pedido_id'] == pedido_id]
+        assert versoes == list(range(1, len(versoes) + 1))
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import text
+
+from esquema import preparar_esquema
+
+PEDIDO = {"pv": "PV-100", "equipamento": "Notebook", "quantidade": 1, "descricao_servico": "Montagem",
+          "status_id": 2, "imagem_id": 1}
+
+
+def hoje():
+    return datetime.now(ZoneInfo('America/Sao_Paulo')).date().isoformat()
+
+
+def finalizados(banco):
+    with banco.connect() as conn:
+        return sorted((pedido_id, status_id, str(dia)) for pedido_id, status_id, dia in conn.execute(text(
+            "SELECT pedido_id, status_id, dia FROM pedidos_finalizados_dia_tb")))
+
+
+def criar(cliente, **campos):
+    return cliente.post('/pedidos', json=dict(PEDIDO, **campos)).get_json()['id']
+
+
+def mudar_status(cliente, pedido_id, versao, status_id):
+    assert cliente.put(f'/pedidos/{pedido_id}', json={"versao": versao, "status_id": status_id}).status_code == 200
+
+
+def test_gatilhos_acompanham_conclusao_cancelamento_e_reabertura(cliente, banco):
+    pedido_id = criar(cliente)
+    assert finalizados(banco) == []
+
+    mudar_status(cliente, pedido_id, 1, 4)
+    assert finalizados(banco) == [(pedido_id, 4, hoje())]
+    mudar_status(cliente, pedido_id, 2, 6)
+    assert finalizados(banco) == [(pedido_id, 6, hoje())]
+    mudar_status(cliente, pedido_id, 3, 3)
+    assert finalizados(banco) == []
+
+    concluido = criar(cliente, pv="PV-200")
+    mudar_status(cliente, concluido, 1, 4)
+    assert finalizados(banco) == [(concluido, 4, hoje())]
+    assert cliente.delete(f'/pedidos/{concluido}').status_code == 200
+    assert finalizados(banco) == []
+
+
+def test_so_entram_os_do_dia_e_a_virada_limpa_os_antigos(cliente, banco):
+    ontem = datetime.now(timezone.utc) - timedelta(days=1)
+    with banco.begin() as conn:
+        antigo = conn.execute(text(
+            "INSERT INTO pedidos_tb (pv, equipamento, quantidade, status_id, data_criacao, data_conclusao) "
+            "VALUES ('PV-1', 'Notebook', 1, 4, :ontem, :ontem) RETURNING id"), {"ontem": ontem}).scalar_one()
+    assert finalizados(banco) == []
+    with banco.begin() as conn:
+        # Linha que sobrou de ontem (o dia virou sem escritas)
+        conn.execute(text("INSERT INTO pedidos_finalizados_dia_tb (pedido_id, status_id, dia) VALUES (:id, 4, :dia)"),
+                     {"id": antigo, "dia": (datetime.now(ZoneInfo('America/Sao_Paulo')) - timedelta(days=1)).date()})
+
+    pedido_id = criar(cliente)
+    mudar_status(cliente, pedido_id, 1, 6)
+
+    assert finalizados(banco) == [(pedido_id, 6, hoje())]
+
+
+def test_inicializacao_refaz_a_tabela(cliente, banco):
+    concluido = criar(cliente)
+    mudar_status(cliente, concluido, 1, 4)
+    criar(cliente, pv="PV-200")
+    with banco.begin() as conn:
+        conn.execute(text("DELETE FROM pedidos_finalizados_dia_tb"))
+
+    preparar_esquema(banco)
+
+    assert finalizados(banco) == [(concluido, 4, hoje())]
@@ -0,0 +1,59 @@
+import sys
+
+import pandas as pd
+from sqlalchemy import text
+
+from app import gerar_dados_sinteticos
+from app.gerar_dados_sinteticos import CANCELADO, CONCLUIDO, ORIGEM
+
+
+def gerar(monkeypatch, *argumentos):
+    monkeypatch.setattr(sys, 'argv', ['gerar_dados_sinteticos.py', '--anos', '1', *argumentos])
+    gerar_dados_sinteticos.main()
+
+
+def consultar(banco, sql):
+    with banco.connect() as conn:
+        return pd.read_sql(text(sql), conn)
+
+
+def test_pedidos_gerados_tem_historico_coerente(cliente, banco, monkeypatch):
+    gerar(monkeypatch, '--pedidos', '300', '--linhas', '2', '--cancelados', '0.2', '--pendencias', '0.3')
+
+    pedidos = consultar(banco, "SELECT * FROM pedidos_tb").set_index('id')
+    historico = consultar(banco, "SELECT * FROM historico_status_tb ORDER BY pedido_id, data_mudanca, id")
+    assert len(pedidos) == 300 and set(pedidos['perfil_alteracao']) == {ORIGEM}
+    assert set(pedidos['linha_id']) == {1, 2}
+    # Cada linha com sua fila 1..n
+    for _, fila in pedidos.groupby('linha_id'):
+        assert sorted(fila['prioridade']) == list(range(1, len(fila) + 1))
+
+    for pedido_id, transicoes in historico.groupby('pedido_id'):
+        status = transicoes['status_alterado'].tolist()
+        anteriores = transicoes['status_anterior'].tolist()
+        assert pd.isna(anteriores[0]) and anteriores[1:] == status[:-1]
+        assert status[-1] == pedidos.at[pedido_id, 'status_id']
+    assert set(historico['pedido_id']) == set(pedidos.index)
+
+    finalizados = pedidos['status_id'].isin([CONCLUIDO, CANCELADO])
+    assert finalizados.any() and (pedidos['status_id'] == CANCELADO).any()
+    assert pedidos.loc[finalizados, 'data_conclusao'].notna().all()
+    assert pedidos.loc[~finalizados, 'data_conclusao'].isna().all()
+
+
+def test_limpar_remove_so_os_sinteticos(cliente, banco, monkeypatch):
+    resposta = cliente.post('/pedidos', json={"pv": "PV-REAL", "equipamento": "Notebook", "quantidade": 1,
+                                              "descricao_servico": "Montagem", "status_id": 2, "imagem_id": 1})
+    assert resposta.status_code == 201
+    gerar(monkeypatch, '--pedidos', '50')
+
+    gerar(monkeypatch, '--pedidos', '20', '--limpar', '--semente', '7')
+
+    pedidos = consultar(banco, "SELECT id, pv, prioridade FROM pedidos_tb ORDER BY prioridade")
+    assert len(pedidos) == 21 and pedidos['pv'].iloc[0] == "PV-REAL"
+    assert pedidos['prioridade'].tolist() == list(range(1, 22))
+    # A sequência continua depois dos ids explícitos
+    assert cliente.post('/pedidos', json={"pv": "PV-NOVO", "equipamento": "Notebook", "quantidade": 1,
+                                          "descricao_servico": "Montagem", "status_id": 2,
+                                          "imagem_id": 1}).status_code == 201
+
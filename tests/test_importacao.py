@@ -0,0 +1,48 @@
+import pandas as pd
+from sqlalchemy import text
+
+from app import migracao_dados
+
+PLANILHA = [
+    {"codigo_pedido": "OP-1", "equipamento": "TERAVIX T1", "pv": "PV-1", "descricao_servico": "Montagem", "quantidade": 2},
+    {"codigo_pedido": "OP-2", "equipamento": "TERAVIX T2", "pv": "PV-2", "descricao_servico": "Imagem", "quantidade": 5},
+]
+
+
+def importar(banco, monkeypatch, linhas):
+    planilha = pd.DataFrame(linhas)
+    planilha['prioridade'] = range(1, len(planilha) + 1)
+    monkeypatch.setattr(migracao_dados, 'ler_planilha', lambda caminho: planilha)
+    return migracao_dados.importar_pedidos(banco, planilha_path=None)
+
+
+def versoes(banco):
+    with banco.connect() as conn:
+        return dict(conn.execute(text("SELECT codigo_pedido, versao FROM pedidos_tb")).all())
+
+
+def diario(banco):
+    with banco.connect() as conn:
+        return conn.execute(text("SELECT operacao, COUNT(*) FROM pedidos_alteracoes_tb GROUP BY operacao "
+                                 "ORDER BY operacao")).all()
+
+
+def test_reimportar_mesma_planilha_nao_gera_versao(banco, monkeypatch):
+    importar(banco, monkeypatch, PLANILHA)
+
+    assert importar(banco, monkeypatch, PLANILHA) == 2
+
+    assert versoes(banco) == {"OP-1": 1, "OP-2": 1}
+    assert [tuple(linha) for linha in diario(banco)] == [('I', 2)]
+
+
+def test_reimportar_com_alteracao_incrementa_versao(banco, monkeypatch):
+    importar(banco, monkeypatch, PLANILHA)
+    alterada = [dict(PLANILHA[0]), dict(PLANILHA[1], quantidade=7)]
+
+    importar(banco, monkeypatch, alterada)
+
+    assert versoes(banco) == {"OP-1": 1, "OP-2": 2}
+    assert [tuple(linha) for linha in diario(banco)] == [('I', 2), ('U', 1)]
+    with banco.connect() as conn:
+        assert conn.execute(text("SELECT quantidade FROM pedidos_tb WHERE codigo_pedido = 'OP-2'")).scalar() == 7
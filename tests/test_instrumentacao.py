@@ -0,0 +1,75 @@
+import logging
+
+import pytest
+from sqlalchemy import event
+
+import instrumentacao
+from instrumentacao import RegistroMetricas, redigir_sql
+
+
+@pytest.fixture
+def sql_instrumentado(banco):
+    """O instrumentar() do crud.py ouve o engine de produção; o de teste ganha os mesmos eventos."""
+    eventos = [("before_cursor_execute", instrumentacao._antes_do_cursor),
+               ("after_cursor_execute", instrumentacao._depois_do_cursor),
+               ("handle_error", instrumentacao._erro_no_cursor)]
+    for nome, funcao in eventos:
+        event.listen(banco, nome, funcao)
+    yield
+    for nome, funcao in eventos:
+        event.remove(banco, nome, funcao)
+
+
+def metrica(cliente, linha):
+    """Valor de uma série do /metrics (0 se ainda não existe)."""
+    for atual in cliente.get('/metrics').get_data(as_text=True).splitlines():
+        if atual.startswith(linha + " "):
+            return float(atual.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metricas_por_rota_com_consultas_sql(cliente, sql_instrumentado):
+    total = 'http_requisicoes_total{metodo="GET",rota="/pedidos",status="200"}'
+    consultas = 'sql_consultas_por_requisicao_count{rota="/pedidos"}'
+    comandos = 'sql_consultas_por_requisicao_sum{rota="/pedidos"}'
+    antes = metrica(cliente, total), metrica(cliente, consultas), metrica(cliente, comandos)
+
+    assert cliente.get('/pedidos').status_code == 200
+    assert cliente.get('/pedidos?filtro=concluido').status_code == 200
+
+    assert metrica(cliente, total) == antes[0] + 2
+    assert metrica(cliente, consultas) == antes[1] + 2
+    # Os comandos SQL de cada requisição são contados
+    assert metrica(cliente, comandos) >= antes[2] + 2
+
+
+def test_histograma_cumulativo_no_formato_do_prometheus():
+    registro = RegistroMetricas()
+    registro.descrever("duracao", "Duração.")
+    for valor in (0.003, 0.03, 0.03, 30):
+        registro.observar("duracao", (0.01, 0.1), valor, rota="/x")
+    registro.incrementar("total", rota="/x", status=200)
+
+    assert registro.exportar().splitlines() == [
+        '# HELP total total',
+        '# TYPE total counter',
+        'total{rota="/x",status="200"} 1',
+        '# HELP duracao Duração.',
+        '# TYPE duracao histogram',
+        'duracao_bucket{rota="/x",le="0.01"} 1',
+        'duracao_bucket{rota="/x",le="0.1"} 3',
+        'duracao_bucket{rota="/x",le="+Inf"} 4',
+        'duracao_sum{rota="/x"} 30.063',
+        'duracao_count{rota="/x"} 4',
+    ]
+
+
+def test_sql_lento_vai_ao_log_sem_dados(cliente, sql_instrumentado, monkeypatch, caplog):
+    monkeypatch.setattr(instrumentacao, 'LIMIAR_SQL_LENTO', 0.0)
+
+    with caplog.at_level(logging.WARNING, logger="painel.instrumentacao"):
+        cliente.get('/pedidos/12345/historico')
+
+    lentos = [registro.getMessage() for registro in caplog.records if "SQL lento" in registro.getMessage()]
+    assert lentos and not any("12345" in mensagem for mensagem in lentos)
+    assert redigir_sql("SELECT * FROM t WHERE pv = 'PV-1''2'  AND id = 42") == "SELECT * FROM t WHERE pv = '?' AND id = ?"
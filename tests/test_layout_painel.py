@@ -0,0 +1,71 @@
+import json
+import logging
+
+import pandas as pd
+import pytest
+
+import layout_painel
+from layout_painel import LAYOUT_PADRAO, LayoutPainel, obter_layout
+from painel_dados import particionar_secoes
+
+SECOES = [
+    {"id": "fila", "titulo": "FILA", "status": ["Backlog", "Em Montagem"], "capacidade": 2, "sem_cards": True},
+    {"id": "pendentes", "titulo": "PENDENTES", "status": ["Pendente"], "capacidade": 3, "coluna": 1},
+]
+
+
+def fila(*status):
+    return pd.DataFrame({"id": range(1, len(status) + 1), "pv": [f"PV-{n}" for n in range(1, len(status) + 1)],
+                         "quantidade": 1, "is_urgent": False, "nome_status": list(status)})
+
+
+def test_layout_declarado_no_json():
+    layout = LayoutPainel({"cards": {"quantidade": 1}, "secoes": SECOES, "laterais": [{"id": "concluidos", "titulo": "OK"}]})
+
+    assert layout.indice_por_status == {"backlog": 0, "em montagem": 0, "pendente": 1}
+    assert layout.capacidades == [2, 3] and layout.colunas == 2
+    assert layout.qtd_cards == 1 and layout.cards["titulo"] == LAYOUT_PADRAO["cards"]["titulo"]
+    assert layout.capacidade_lateral("concluidos") == 5 and layout.capacidade_lateral("cancelados") == 0
+    assert layout.laterais[0]["cor"] == "#2ECC71"
+
+
+@pytest.mark.parametrize("config", [
+    {"secoes": SECOES + [dict(SECOES[1], status=["Aguardando Chegada"])]},        # id repetido
+    {"secoes": SECOES + [{"id": "outra", "titulo": "X", "status": ["pendente"]}]},  # status em duas seções
+    {"secoes": SECOES, "laterais": [{"id": "atrasados", "titulo": "X"}]},           # lateral desconhecida
+])
+def test_layout_invalido_e_recusado(config):
+    with pytest.raises(ValueError):
+        LayoutPainel(config)
+
+
+def test_arquivo_invalido_cai_no_layout_padrao(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(layout_painel, '_cache', {})
+    quebrado, sem_status = tmp_path / 'quebrado.json', tmp_path / 'sem_status.json'
+    quebrado.write_text('{"secoes": [')
+    sem_status.write_text(json.dumps({"secoes": [{"id": "fila", "titulo": "FILA"}]}))
+
+    with caplog.at_level(logging.ERROR, logger="painel.layout"):
+        for caminho in (quebrado, sem_status, tmp_path / 'inexistente.json'):
+            assert [s["id"] for s in obter_layout(str(caminho)).secoes] == [s["id"] for s in LAYOUT_PADRAO["secoes"]]
+    assert len(caplog.records) == 2
+    assert obter_layout(str(quebrado)) is obter_layout(str(quebrado))
+
+
+def test_escala_automatica_acompanha_a_tela():
+    assert LayoutPainel({"escala": "auto"}).fator_escala(2160) == pytest.approx(1.6)
+    assert LayoutPainel({"escala": "auto"}).fator_escala(None) == pytest.approx(0.8)
+    assert LayoutPainel({"escala": 1}).fator_escala(2160) == 1.0
+
+
+def test_secoes_recebem_o_top_k_na_ordem_da_fila():
+    layout = LayoutPainel({"secoes": SECOES})
+    df = fila("Backlog", "Pendente", "Em Montagem", "Backlog", "Backlog", "Concluído", "Pendente")
+    nos_cards = df["id"].isin([1])
+
+    listas = particionar_secoes(df, df["nome_status"].str.lower(), nos_cards, layout)
+
+    # O pedido 1 já está nos cards: sobram 3 na seção, que mostra os 2 primeiros
+    assert ([i["id"] for i in listas["fila"]["itens"]], listas["fila"]["total"]) == ([3, 4], 3)
+    assert ([i["id"] for i in listas["pendentes"]["itens"]], listas["pendentes"]["total"]) == ([2, 7], 2)
+    assert listas["fila"]["itens"][0] == {"id": 3, "pv": "PV-3", "qtd": 1, "urgente": False}
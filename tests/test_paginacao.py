@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from layout_painel import LayoutPainel  # noqa: E402
+from prioridades import PainelMtec  # noqa: E402
+
+LAYOUT = {"rotacao_s": 5, "cards": {"quantidade": 0},
+          "secoes": [{"id": "backlog", "titulo": "BACKLOG", "status": ["Backlog"], "capacidade": 2, "paginar": True,
+                      "max_paginas": 3},
+                     {"id": "pendentes", "titulo": "PENDENTES", "status": ["Pendente"], "capacidade": 2}],
+          "laterais": []}
+
+
+class FonteVazia:
+    dados_desde = None
+
+    def obter(self, telemetria=None):
+        return None
+
+    def snapshot(self):
+        return None, None
+
+
+def secao(ids, total=None):
+    return {"itens": [{"id": n, "pv": f"PV-{n}", "qtd": 1, "urgente": False} for n in ids],
+            "total": len(ids) if total is None else total}
+
+
+@pytest.fixture
+def painel():
+    app = QApplication.instance() or QApplication([])
+    painel = PainelMtec(FonteVazia(), LayoutPainel(LAYOUT))
+    painel.update_timer.stop()
+    yield painel
+    painel.close()
+    painel.deleteLater()
+    app.processEvents()
+
+
+def visiveis(painel, id_secao):
+    refs = painel.secoes_widgets[id_secao]
+    pvs = [label.text().split("</b>")[0].removeprefix("<b>PV: ") for label in refs['labels'] if not label.isHidden()]
+    return pvs, None if refs['counter'].isHidden() else refs['counter'].text()
+
+
+def mostrar(painel, backlog, pendentes=secao([])):
+    painel.update_colunas({"cards": [], "listas": {"backlog": backlog, "pendentes": pendentes}, "laterais": {}})
+
+
+def test_secao_paginada_gira_pelas_paginas(painel):
+    assert painel.rotacao_timer.isActive() and painel.rotacao_timer.interval() == 5000
+    mostrar(painel, secao([1, 2, 3, 4, 5, 6], total=9), secao([7, 8, 9]))
+
+    assert visiveis(painel, "backlog") == (["PV-1", "PV-2"], "Página 1/3 · +3 pedidos...")
+    assert visiveis(painel, "pendentes") == (["PV-7", "PV-8"], "+1 pedidos...")
+    painel.avancar_paginas()
+    assert visiveis(painel, "backlog") == (["PV-3", "PV-4"], "Página 2/3 · +3 pedidos...")
+    painel.avancar_paginas()
+    painel.avancar_paginas()
+    assert visiveis(painel, "backlog")[0] == ["PV-1", "PV-2"]
+    # Seção sem "paginar" não gira
+    assert visiveis(painel, "pendentes")[0] == ["PV-7", "PV-8"]
+
+
+def test_pagina_atual_sobrevive_a_atualizacao(painel):
+    mostrar(painel, secao([1, 2, 3, 4, 5]))
+    painel.avancar_paginas()
+    painel.avancar_paginas()
+    assert visiveis(painel, "backlog") == (["PV-5"], "Página 3/3")
+
+    # Dado novo: a página continua a mesma (ou a última, se a lista encolheu)
+    mostrar(painel, secao([1, 2, 3, 4, 5, 10]))
+    assert visiveis(painel, "backlog") == (["PV-5", "PV-10"], "Página 3/3")
+    mostrar(painel, secao([1, 2, 3]))
+    assert visiveis(painel, "backlog") == (["PV-3"], "Página 2/2")
+    mostrar(painel, secao([1]))
+    assert visiveis(painel, "backlog") == (["PV-1"], None)
+
+
+def test_view_model_traz_a_lista_ate_max_paginas():
+    layout = LayoutPainel(LAYOUT)
+
+    assert layout.paginar == [True, False]
+    assert layout.limites == [6, 2]
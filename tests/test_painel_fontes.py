@@ -0,0 +1,62 @@
+import os
+import sys
+import json
+import subprocess
+
+import painel_dados
+import painel_fontes
+from painel_fontes import FonteBancoAdiada, FonteServidor, criar_fonte
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADOS = ("pandas", "numpy", "psycopg2", "sqlalchemy", "painel_dados")
+
+
+def test_abrir_o_painel_nao_importa_pandas_nem_o_banco(tmp_path):
+    snapshot = tmp_path / 'painel_snapshot.json'
+    snapshot.write_text(json.dumps({"cards": [{"id": 1}]}))
+    script = (
+        "import sys, json, prioridades, painel_fontes\n"
+        "fonte = painel_fontes.criar_fonte()\n"
+        "vm, _ = fonte.snapshot()\n"
+        f"print(json.dumps([type(fonte).__name__, vm['cards'], sorted(m for m in {PESADOS!r} if m in sys.modules)]))\n")
+    ambiente = dict(os.environ, PAINEL_SNAPSHOT=str(tmp_path / 'painel_snapshot'), QT_QPA_PLATFORM='offscreen')
+    ambiente.pop('PAINEL_SERVIDOR_URL', None)
+    ambiente.pop('PAINEL_LINHA', None)
+
+    saida = subprocess.run([sys.executable, '-c', script], cwd=RAIZ, env=ambiente, capture_output=True, text=True,
+                           check=True).stdout
+
+    assert json.loads(saida.strip().splitlines()[-1]) == ["FonteBancoAdiada", [{"id": 1}], []]
+
+
+class FonteBancoFalsa:
+    criadas = []
+
+    def __init__(self, linha=None):
+        FonteBancoFalsa.criadas.append(linha)
+        self.dados_desde = "agora"
+
+    def obter(self, telemetria=None):
+        return {"cards": []}
+
+
+def test_fonte_do_banco_so_e_criada_na_primeira_consulta(monkeypatch):
+    monkeypatch.setattr(painel_dados, 'FonteBanco', FonteBancoFalsa)
+    monkeypatch.setattr(FonteBancoFalsa, 'criadas', [])
+    fonte = FonteBancoAdiada(linha="2")
+    assert FonteBancoFalsa.criadas == [] and fonte.dados_desde is None
+
+    assert fonte.obter() == fonte.obter() == {"cards": []}
+    assert FonteBancoFalsa.criadas == ["2"] and fonte.dados_desde == "agora"
+
+
+def test_criar_fonte_pelo_ambiente(monkeypatch):
+    monkeypatch.setenv('PAINEL_SERVIDOR_URL', 'http://painel:5001/')
+    monkeypatch.setenv('PAINEL_LINHA', 'Linha 2')
+
+    fonte = criar_fonte()
+
+    assert isinstance(fonte, FonteServidor)
+    assert fonte.url == 'http://painel:5001/api/painel?linha=Linha+2'
+    monkeypatch.delenv('PAINEL_SERVIDOR_URL')
+    assert isinstance(criar_fonte(), painel_fontes.FonteBancoAdiada)
@@ -0,0 +1,248 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+import pytest
+from sqlalchemy import text
+
+PEDIDO = {"pv": "PV-100", "equipamento": "TERAVIX T1", "quantidade": 3, "descricao_servico": "Montagem",
+          "status_id": 2, "imagem_id": 1}
+TOLERANCIA = timedelta(seconds=2)
+
+
+def instante(valor):
+    """datetime em UTC, em segundos inteiros (a precisão do JSON do Flask).
+
+    O SQLite devolve texto (CURRENT_TIMESTAMP sem fuso, já em UTC); o jsonify escreve datetimes
+    no formato HTTP ('Mon, 19 Oct 2026 19:55:31 GMT').
+    """
+    if valor is None:
+        return None
+    if not isinstance(valor, datetime):
+        try:
+            valor = datetime.fromisoformat(str(valor))
+        except ValueError:
+            valor = parsedate_to_datetime(valor)
+    if valor.tzinfo is None:
+        valor = valor.replace(tzinfo=timezone.utc)
+    return valor.replace(microsecond=0)
+
+
+def agora():
+    return datetime.now(timezone.utc)
+
+
+def historico(banco, pedido_id):
+    with banco.connect() as conn:
+        return [tuple(linha) for linha in conn.execute(text(
+            "SELECT status_anterior, status_alterado, alterado_por FROM historico_status_tb "
+            "WHERE pedido_id = :id ORDER BY id"), {"id": pedido_id})]
+
+
+def pedido(banco, pedido_id):
+    with banco.connect() as conn:
+        return conn.execute(text("SELECT * FROM pedidos_tb WHERE id = :id"), {"id": pedido_id}).mappings().first()
+
+
+def alteracoes(banco, pedido_id):
+    with banco.connect() as conn:
+        return [linha[0] for linha in conn.execute(text(
+            "SELECT operacao FROM pedidos_alteracoes_tb WHERE pedido_id = :id ORDER BY versao"), {"id": pedido_id})]
+
+
+def criar(cliente, **campos):
+    resposta = cliente.post('/pedidos', json=dict(PEDIDO, **campos))
+    assert resposta.status_code == 201
+    return resposta.get_json()['id']
+
+
+def editar(cliente, banco, pedido_id, **campos):
+    resposta = cliente.put(f'/pedidos/{pedido_id}', json=dict(campos, versao=pedido(banco, pedido_id)['versao']))
+    assert resposta.status_code == 200
+    return resposta.get_json()['pedido']
+
+
+def test_criar_registra_historico_de_criacao(cliente, banco):
+    pedido_id = criar(cliente)
+
+    assert historico(banco, pedido_id) == [(None, 2, 'teste')]
+    assert pedido(banco, pedido_id)['data_conclusao'] is None
+    assert alteracoes(banco, pedido_id) == ['I']
+
+
+def test_editar_sem_trocar_status_nao_registra_historico(cliente, banco):
+    pedido_id = criar(cliente)
+
+    resposta = editar(cliente, banco, pedido_id, equipamento="TERAVIX T2", quantidade=5)
+
+    assert resposta['versao'] == 2 and resposta['equipamento'] == "TERAVIX T2"
+    assert resposta['data_conclusao'] is None
+    assert historico(banco, pedido_id) == [(None, 2, 'teste')]
+
+
+@pytest.mark.parametrize('status_id', [4, "4"])
+def test_concluir_carimba_data_conclusao_no_proprio_update(cliente, banco, status_id):
+    pedido_id = criar(cliente)
+    antes = agora()
+
+    resposta = editar(cliente, banco, pedido_id, status_id=status_id)
+
+    conclusao = instante(resposta['data_conclusao'])
+    assert conclusao is not None and antes - TOLERANCIA <= conclusao <= agora() + TOLERANCIA
+    assert instante(pedido(banco, pedido_id)['data_conclusao']) == conclusao
+    assert resposta['status'] == "Concluído"
+    assert historico(banco, pedido_id) == [(None, 2, 'teste'), (2, 4, 'teste')]
+    # Uma única entrada U no diário por conclusão
+    assert alteracoes(banco, pedido_id) == ['I', 'U']
+
+
+def test_cancelar_pedido_em_aberto_carimba_conclusao(cliente, banco):
+    pedido_id = criar(cliente, status_id=3)
+
+    resposta = editar(cliente, banco, pedido_id, status_id=6)
+
+    assert instante(resposta['data_conclusao']) is not None
+    assert historico(banco, pedido_id) == [(None, 3, 'teste'), (3, 6, 'teste')]
+
+
+def test_cancelar_pedido_concluido_mantem_data_conclusao(cliente, banco):
+    pedido_id = criar(cliente)
+    concluido = editar(cliente, banco, pedido_id, status_id=4)
+
+    cancelado = editar(cliente, banco, pedido_id, status_id=6)
+
+    assert instante(cancelado['data_conclusao']) == instante(concluido['data_conclusao'])
+    assert historico(banco, pedido_id) == [(None, 2, 'teste'), (2, 4, 'teste'), (4, 6, 'teste')]
+
+
+def test_regravar_mesmo_status_nao_registra_historico(cliente, banco):
+    pedido_id = criar(cliente)
+    concluido = editar(cliente, banco, pedido_id, status_id=4)
+
+    repetido = editar(cliente, banco, pedido_id, status_id=4)
+
+    assert instante(repetido['data_conclusao']) == instante(concluido['data_conclusao'])
+    assert historico(banco, pedido_id) == [(None, 2, 'teste'), (2, 4, 'teste')]
+
+
+def test_versao_desatualizada_nao_altera_status(cliente, banco):
+    pedido_id = criar(cliente)
+
+    resposta = cliente.put(f'/pedidos/{pedido_id}', json={"versao": 99, "status_id": 4})
+
+    assert resposta.status_code == 409
+    assert pedido(banco, pedido_id)['data_conclusao'] is None
+    assert historico(banco, pedido_id) == [(None, 2, 'teste')]
+
+
+def test_excluir_apaga_pedido_e_historico(cliente, banco):
+    pedido_id = criar(cliente)
+    editar(cliente, banco, pedido_id, status_id=4)
+    outro_id = criar(cliente, pv="PV-200")
+
+    resposta = cliente.delete(f'/pedidos/{pedido_id}')
+
+    assert resposta.status_code == 200
+    assert pedido(banco, pedido_id) is None
+    assert historico(banco, pedido_id) == []
+    assert historico(banco, outro_id) == [(None, 2, 'teste')]
+
+
+def test_diario_numerado_em_sequencia_e_na_ordem_de_cada_pedido(cliente, banco):
+    primeiro, segundo = criar(cliente), criar(cliente, pv="PV-200")
+    editar(cliente, banco, primeiro, status_id=3)
+    editar(cliente, banco, segundo, quantidade=9)
+    editar(cliente, banco, primeiro, status_id=4)
+    cliente.delete(f'/pedidos/{segundo}')
+
+    corpo = cliente.get('/api/alteracoes?desde=0').get_json()
+
+    assert [alteracao['seq'] for alteracao in corpo['alteracoes']] == [1, 2, 3, 4, 5, 6]
+    assert corpo['atual'] == 6 and corpo['ultima'] == 6
+    assert [(a['operacao'], a['versao']) for a in corpo['alteracoes'] if a['pedido_id'] == primeiro] == [
+        ('I', 1), ('U', 2), ('U', 3)]
+    assert [(a['operacao'], a['versao']) for a in corpo['alteracoes'] if a['pedido_id'] == segundo] == [
+        ('I', 1), ('U', 2), ('D', 2)]
+    # Retomando do meio, só o que veio depois
+    assert [a['seq'] for a in cliente.get('/api/alteracoes?desde=4').get_json()['alteracoes']] == [5, 6]
+
+
+@pytest.mark.parametrize('linha_id', ["abc", 99, [1]])
+def test_linha_invalida_responde_400(cliente, banco, linha_id):
+    resposta = cliente.post('/pedidos', json=dict(PEDIDO, linha_id=linha_id))
+
+    assert resposta.status_code == 400 and resposta.get_json()['erro']
+    pedido_id = criar(cliente)
+    resposta = cliente.put(f'/pedidos/{pedido_id}', json={"versao": 1, "linha_id": linha_id})
+    assert resposta.status_code == 400 and resposta.get_json()['erro']
+    assert pedido(banco, pedido_id)['versao'] == 1
+
+
+@pytest.mark.parametrize('filtro, campos', [("andamento", {"quantidade": 7, "imagem_id": 2}),
+                                            ("concluido", {"status_id": 4})])
+def test_pedido_editado_igual_a_linha_da_listagem(cliente, banco, filtro, campos):
+    # A tabela troca só a linha editada pelo pedido da resposta, sem reler a listagem
+    pedido_id = criar(cliente)
+
+    resposta = editar(cliente, banco, pedido_id, **campos)
+
+    listados = {p['id']: p for p in cliente.get(f'/pedidos?filtro={filtro}').get_json()}
+    assert resposta == listados[pedido_id]
+
+
+def test_edicao_com_versao_antiga_responde_409_com_o_pedido_atual(cliente, banco):
+    pedido_id = criar(cliente)
+    # Dois usuários abriram o pedido na versão 1; o primeiro salva
+    assert cliente.put(f'/pedidos/{pedido_id}', json={"versao": 1, "quantidade": 8}).status_code == 200
+
+    resposta = cliente.put(f'/pedidos/{pedido_id}', json={"versao": 1, "equipamento": "TERAVIX T9"})
+
+    assert resposta.status_code == 409
+    corpo = resposta.get_json()
+    assert corpo['erro'] and corpo['pedido']['versao'] == 2 and corpo['pedido']['quantidade'] == 8
+    atual = pedido(banco, pedido_id)
+    assert (atual['versao'], atual['equipamento']) == (2, PEDIDO['equipamento'])
+    # Com a versão nova a edição passa e só o campo enviado muda
+    resposta = cliente.put(f'/pedidos/{pedido_id}', json={"versao": 2, "equipamento": "TERAVIX T9"})
+    assert resposta.status_code == 200
+    assert (resposta.get_json()['pedido']['versao'], resposta.get_json()['pedido']['quantidade']) == (3, 8)
+
+
+def test_edicao_sem_versao_ou_de_pedido_inexistente(cliente, banco):
+    pedido_id = criar(cliente)
+
+    assert cliente.put(f'/pedidos/{pedido_id}', json={"quantidade": 8}).status_code == 428
+    assert cliente.put(f'/pedidos/{pedido_id}', json={"versao": "x"}).status_code == 400
+    assert cliente.put('/pedidos/999999', json={"versao": 1, "quantidade": 8}).status_code == 404
+    assert pedido(banco, pedido_id)['versao'] == 1
+
+
+def linha_de_producao(banco, nome):
+    """id da linha `nome`, cadastrada se ainda não existir (linha_td não é esvaziada entre os testes)."""
+    with banco.begin() as conn:
+        linha_id = conn.execute(text("SELECT id FROM linha_td WHERE nome = :nome"), {"nome": nome}).scalar()
+        if linha_id is None:
+            linha_id = conn.execute(text("INSERT INTO linha_td (nome, meta_semanal) VALUES (:nome, 50) RETURNING id"),
+                                    {"nome": nome}).scalar_one()
+    return linha_id
+
+
+def test_listagem_filtra_pela_linha_e_cada_linha_tem_sua_fila(cliente, banco):
+    linha_2 = linha_de_producao(banco, "Linha 2")
+    primeiro = criar(cliente, pv="PV-1")
+    segundo = criar(cliente, pv="PV-2", linha_id=linha_2)
+    terceiro = criar(cliente, pv="PV-3", linha_id=linha_2)
+
+    def fila(consulta):
+        return [(p['id'], p['prioridade']) for p in cliente.get('/pedidos' + consulta).get_json()]
+
+    assert fila(f'?linha={linha_2}') == [(segundo, 1), (terceiro, 2)]
+    assert fila('?linha=1') == [(primeiro, 1)]
+    # Linha inválida é ignorada, como um filtro não informado
+    assert len(fila('')) == len(fila('?linha=abc')) == len(fila('?linha=0')) == 3
+    assert "Linha 2" in [linha['nome'] for linha in cliente.get('/linhas').get_json()]
+
+    # Movido sem prioridade explícita, entra no fim da fila da linha nova
+    movido = editar(cliente, banco, primeiro, linha_id=linha_2)
+    assert (movido['linha_id'], movido['prioridade']) == (linha_2, 3)
+    assert fila(f'?linha={linha_2}') == [(segundo, 1), (terceiro, 2), (primeiro, 3)]
+    assert fila('?linha=1') == []
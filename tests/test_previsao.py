@@ -0,0 +1,62 @@
+import numpy as np
+
+from calendario import CalendarioProducao
+from previsao import PrevisaoFila, data_iso, taxa_diaria
+
+# Sem feriados: só a semana de segunda a sexta
+CALENDARIO = CalendarioProducao(ano_base=2026)
+SEGUNDA = np.datetime64('2026-03-02')
+
+
+def dias(*isos):
+    return np.array(isos, dtype='datetime64[D]')
+
+
+def test_taxa_da_janela_ignora_hoje_e_pedidos_abertos():
+    conclusoes = dias('2026-03-02', '2026-03-06', '2026-03-09', 'NaT', '2026-02-27')
+    quantidades = np.array([2, 3, 10, 5, 7], dtype=float)
+
+    # Cinco dias úteis antes da segunda 09/03: de 02/03 a 06/03
+    assert taxa_diaria(conclusoes, quantidades, np.datetime64('2026-03-09'), janela=5, calendario=CALENDARIO) == 1.0
+
+
+def test_termino_pelo_acumulado_da_fila():
+    previsao = PrevisaoFila()
+
+    termino = previsao.atualizar([1, 2, 3, 4], [1, 1, 2, 3], taxa=2, hoje=SEGUNDA, calendario=CALENDARIO)
+    assert [data_iso(t) for t in termino] == ['2026-03-02', '2026-03-02', '2026-03-03', '2026-03-05']
+
+    # Com uma máquina já feita hoje, cada pedido anda meio dia útil
+    termino = previsao.atualizar([1, 2, 3, 4], [1, 1, 2, 3], taxa=2, hoje=SEGUNDA, produzido_hoje=1, calendario=CALENDARIO)
+    assert [data_iso(t) for t in termino] == ['2026-03-02', '2026-03-03', '2026-03-04', '2026-03-05']
+
+
+def test_termino_atravessa_o_fim_de_semana():
+    previsao = PrevisaoFila()
+
+    termino = previsao.atualizar([1], [10], taxa=2, hoje=np.datetime64('2026-03-05'), calendario=CALENDARIO)
+
+    assert data_iso(termino[0]) == '2026-03-11'  # qui, sex, seg, ter, qua
+
+
+def test_recalcula_so_a_partir_do_primeiro_pedido_alterado():
+    previsao = PrevisaoFila()
+    previsao.atualizar([1, 2, 3, 4], [1, 1, 2, 3], taxa=2, hoje=SEGUNDA, calendario=CALENDARIO)
+    assert previsao.recalculados == 4
+
+    previsao.atualizar([1, 2, 3, 4], [1, 1, 2, 3], taxa=2, hoje=SEGUNDA, calendario=CALENDARIO)
+    assert previsao.recalculados == 0
+
+    termino = previsao.atualizar([1, 2, 5, 3, 4], [1, 1, 4, 2, 3], taxa=2, hoje=SEGUNDA, calendario=CALENDARIO)
+    assert previsao.recalculados == 3
+    assert [data_iso(t) for t in termino] == ['2026-03-02', '2026-03-02', '2026-03-04', '2026-03-05', '2026-03-09']
+
+    # Outra taxa invalida a fila toda
+    previsao.atualizar([1, 2, 5, 3, 4], [1, 1, 4, 2, 3], taxa=4, hoje=SEGUNDA, calendario=CALENDARIO)
+    assert previsao.recalculados == 5
+
+
+def test_sem_taxa_nao_ha_previsao():
+    termino = PrevisaoFila().atualizar([1, 2], [1, np.nan], taxa=0, hoje=SEGUNDA, calendario=CALENDARIO)
+
+    assert [data_iso(t) for t in termino] == [None, None]
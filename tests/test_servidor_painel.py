@@ -0,0 +1,82 @@
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+import servidor_painel
+from painel_fontes import TZ
+from servidor_painel import PublicadorPainel
+
+VIEW_MODEL = {"linhas": 2, "cards": [{"id": 1}]}
+
+
+class FonteContada:
+    def __init__(self):
+        self.consultas = 0
+        self.dados_desde = None
+
+    def obter(self, telemetria=None):
+        self.consultas += 1
+        return VIEW_MODEL
+
+    def snapshot(self):
+        return None, None
+
+
+@pytest.fixture
+def publicador(monkeypatch):
+    publicador = PublicadorPainel(FonteContada())
+    monkeypatch.setattr(servidor_painel, 'publicador', publicador)
+    return publicador
+
+
+@pytest.fixture
+def tv():
+    return servidor_painel.app.test_client()
+
+
+def test_muitas_tvs_uma_consulta(publicador, tv):
+    assert tv.get('/api/painel').status_code == 503  # ainda sem dados
+    publicador.publicar(publicador.fonte.obter(), datetime.now(TZ))
+
+    respostas = [tv.get('/api/painel') for _ in range(20)]
+
+    assert {resposta.status_code for resposta in respostas} == {200}
+    assert respostas[0].get_json() == VIEW_MODEL
+    assert publicador.fonte.consultas == 1
+    etag = respostas[0].headers['ETag']
+    assert tv.get('/api/painel', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_so_muda_de_versao_quando_o_view_model_muda(publicador):
+    publicador.publicar(VIEW_MODEL, datetime.now(TZ))
+    versao = publicador.estado()[0]
+    acordou = []
+    espera = threading.Thread(target=lambda: acordou.append(publicador.aguardar_mudanca(versao, 5)[0]))
+    espera.start()
+
+    publicador.publicar(dict(VIEW_MODEL), datetime.now(TZ))
+    assert publicador.estado()[0] == versao
+    publicador.publicar(dict(VIEW_MODEL, linhas=3), datetime.now(TZ))
+    espera.join(5)
+
+    assert acordou == [versao + 1]
+
+
+def test_assinantes_sse_acima_do_limite_sao_recusados(publicador, tv, monkeypatch):
+    monkeypatch.setattr(servidor_painel, '_vagas_sse', threading.BoundedSemaphore(1))
+    publicador.publicar(VIEW_MODEL, datetime.now(TZ))
+
+    primeira = tv.get('/api/painel/eventos', buffered=False)
+    evento = next(iter(primeira.response)).decode('utf-8')
+    assert json.loads(evento[len("data: "):])['painel'] == VIEW_MODEL
+
+    recusada = tv.get('/api/painel/eventos')
+    assert recusada.status_code == 503 and recusada.headers['Retry-After'] == '30'
+
+    # A vaga volta quando a primeira TV desconecta
+    primeira.close()
+    segunda = tv.get('/api/painel/eventos', buffered=False)
+    assert segunda.status_code == 200
+    segunda.close()
@@ -0,0 +1,18 @@
+import threading
+
+import sessoes
+
+
+def test_chave_secreta_gerada_uma_vez_e_compartilhada(banco):
+    chaves = []
+    # Processos subindo juntos: todos ficam com a chave do primeiro que gravou
+    processos = [threading.Thread(target=lambda: chaves.append(sessoes.chave_secreta(banco))) for _ in range(4)]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join()
+
+    assert len(set(chaves)) == 1 and len(chaves[0]) == 64
+    # Reinício
+    assert sessoes.chave_secreta(banco) == chaves[0]
+
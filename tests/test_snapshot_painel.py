@@ -0,0 +1,74 @@
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import painel_fontes
+from painel_fontes import FonteServidor, carregar_snapshot
+
+VIEW_MODEL = {"linhas": 3, "cards": [{"id": 1, "pv": "PV-1"}], "linha": {"id": 2, "nome": "Linha 2"}}
+
+
+class ServidorPainel(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        corpo = json.dumps(VIEW_MODEL).encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ServidorPainel)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def snapshot_temporario(tmp_path, monkeypatch):
+    monkeypatch.setattr(painel_fontes, 'SNAPSHOT_PATH', str(tmp_path / 'dados' / 'painel_snapshot'))
+
+
+def test_ultimo_view_model_continua_disponivel_sem_servidor(servidor):
+    fonte = FonteServidor(f"http://127.0.0.1:{servidor.server_address[1]}", linha=2)
+
+    assert fonte.obter() == VIEW_MODEL
+    assert fonte.obter() is None  # 304: nada mudou
+    servidor.shutdown()
+    servidor.server_close()
+    with pytest.raises(Exception, match="servidor do painel"):
+        fonte.obter()
+
+    vm, gravado_em = fonte.snapshot()
+    assert vm == VIEW_MODEL and gravado_em is not None
+    assert os.listdir(os.path.dirname(fonte.caminho_snapshot)) == ['painel_snapshot_linha_2.json']
+
+
+def test_snapshot_invalido_e_ignorado(tmp_path):
+    caminho = tmp_path / 'quebrado.json'
+    caminho.write_bytes(b'{"cards": [')
+
+    assert carregar_snapshot(str(caminho)) == (None, None)
+    assert carregar_snapshot(str(tmp_path / 'inexistente.json')) == (None, None)
+
+
+def test_snapshot_sem_linha_mostra_a_linha_pedida(tmp_path):
+    caminho = tmp_path / 'antigo.json'
+    caminho.write_text(json.dumps({"cards": []}))
+
+    vm, _ = carregar_snapshot(str(caminho), linha="Linha 3")
+
+    assert vm['linha'] == {"id": None, "nome": "Linha 3"}
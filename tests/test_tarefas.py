@@ -0,0 +1,121 @@
+import io
+import json
+import os
+import time
+from datetime import timedelta
+
+from sqlalchemy import text
+
+import tarefas
+
+
+def criar_tarefa(banco, estado, dias_atras, parametros=None, resultado=None):
+    tarefa_id = tarefas.enfileirar(banco, 'limpar_sessoes', criado_por='teste')
+    concluida_em = tarefas.agora_utc() - timedelta(days=dias_atras) if estado != 'na_fila' else None
+    with banco.begin() as conn:
+        conn.execute(text("UPDATE tarefas_tb SET estado = :estado, concluida_em = :concluida_em, "
+                          "parametros = :parametros, resultado = :resultado WHERE id = :id"), {
+            "id": tarefa_id, "estado": estado, "concluida_em": concluida_em,
+            "parametros": json.dumps(parametros or {}), "resultado": json.dumps(resultado) if resultado else None,
+        })
+    return tarefa_id
+
+
+def criar_arquivo(diretorio, nome, dias_atras):
+    caminho = diretorio / nome
+    caminho.write_text("x")
+    instante = time.time() - dias_atras * 86400
+    os.utime(caminho, (instante, instante))
+    return caminho
+
+
+def test_limpar_tarefas_apaga_terminadas_antigas_e_seus_arquivos(banco, tmp_path, monkeypatch):
+    diretorio = tmp_path / 'tarefas'
+    diretorio.mkdir()
+    monkeypatch.setattr(tarefas, 'TAREFAS_DIR', str(diretorio))
+    antiga = criar_tarefa(banco, 'concluida', 40, resultado={"arquivo": "pedidos_1.csv"})
+    cancelada = criar_tarefa(banco, 'cancelada', 40, parametros={"arquivo": "entrada_a.xlsx"})
+    recente = criar_tarefa(banco, 'concluida', 1, resultado={"arquivo": "pedidos_3.csv"})
+    na_fila = criar_tarefa(banco, 'na_fila', 0, parametros={"arquivo": "entrada_b.xlsx"})
+    # Arquivos das tarefas apagadas saem mesmo sendo recentes; os das que ficam, mesmo antigos, não
+    criar_arquivo(diretorio, "pedidos_1.csv", 0)
+    criar_arquivo(diretorio, "entrada_a.xlsx", 40)
+    criar_arquivo(diretorio, "pedidos_3.csv", 40)
+    criar_arquivo(diretorio, "entrada_b.xlsx", 40)
+    criar_arquivo(diretorio, "pedidos_orfao.csv", 40)
+    criar_arquivo(diretorio, "pedidos_novo.csv", 0)
+
+    resultado = tarefas.limpar_tarefas(tarefas.ContextoTarefa(banco, None), retencao_dias=30)
+
+    assert resultado == {"removidas": 2, "arquivos": 3, "retencao_dias": 30}
+    with banco.connect() as conn:
+        restantes = {linha[0] for linha in conn.execute(text("SELECT id FROM tarefas_tb"))}
+    assert restantes == {recente, na_fila} and not restantes & {antiga, cancelada}
+    assert sorted(os.listdir(diretorio)) == ["entrada_b.xlsx", "pedidos_3.csv", "pedidos_novo.csv"]
+
+
+def test_limpar_tarefas_e_periodica():
+    assert tarefas.TAREFAS_PERIODICAS["limpar_tarefas"] == 24 * 3600
+    assert tarefas.TIPOS["limpar_tarefas"].somente_admin
+
+
+def tarefas_na_fila(banco):
+    with banco.connect() as conn:
+        return conn.execute(text("SELECT tipo, parametros FROM tarefas_tb ORDER BY id")).all()
+
+
+def test_enfileirar_recusa_parametros_fora_do_esquema(cliente, banco):
+    invalidos = [
+        {"tipo": "exportar_pedidos", "parametros": {"filtro": "concluido", "coluna": "x"}},
+        {"tipo": "compactar_alteracoes", "parametros": {"retencao_dias": "muitos"}},
+        {"tipo": "compactar_alteracoes", "parametros": {"retencao_dias": True}},
+        {"tipo": "relatorio_atividades", "parametros": ["2026-01-01"]},
+        # Nome de arquivo só vem do upload: senão uma importação apagaria a exportação de outro usuário
+        {"tipo": "importar_planilha", "parametros": {"arquivo": "pedidos_1.csv"}},
+    ]
+    for corpo in invalidos:
+        assert cliente.post('/api/tarefas', json=corpo).status_code == 400, corpo
+    assert tarefas_na_fila(banco) == []
+
+    resposta = cliente.post('/api/tarefas', json={"tipo": "exportar_pedidos", "parametros": {"filtro": "concluido", "mes": "3"}})
+
+    assert resposta.status_code == 202
+    assert resposta.get_json()['parametros'] == {"filtro": "concluido", "mes": "3"}
+
+
+def test_planilha_so_e_aceita_pela_importacao(cliente, banco, tmp_path, monkeypatch):
+    monkeypatch.setattr(tarefas, 'TAREFAS_DIR', str(tmp_path / 'tarefas'))
+
+    def enviar(tipo):
+        return cliente.post('/api/tarefas', data={"tipo": tipo, "arquivo": (io.BytesIO(b"planilha"), "pedidos.xlsx")},
+                            content_type='multipart/form-data')
+
+    assert enviar("exportar_pedidos").status_code == 400
+    assert not os.path.exists(tarefas.TAREFAS_DIR)
+
+    resposta = enviar("importar_planilha")
+
+    assert resposta.status_code == 202
+    arquivo = resposta.get_json()['parametros']['arquivo']
+    assert os.listdir(tarefas.TAREFAS_DIR) == [arquivo] and arquivo.endswith('.xlsx')
+
+
+def test_exportar_pedidos_com_filtros_numericos(cliente, banco, tmp_path, monkeypatch):
+    monkeypatch.setattr(tarefas, 'TAREFAS_DIR', str(tmp_path / 'tarefas'))
+    ano = tarefas.agora_utc().year
+    for pv in ("PV-1", "PV-2"):
+        assert cliente.post('/pedidos', json={"pv": pv, "equipamento": "TERAVIX", "quantidade": 1, "descricao_servico": "s",
+                                              "status_id": 2, "imagem_id": 1}).status_code == 201
+    parametros = {"filtro": "andamento", "linha": 1, "mes": tarefas.agora_utc().month, "ano": ano}
+    tarefa_id = tarefas.enfileirar(banco, 'exportar_pedidos', parametros, criado_por='teste')
+
+    executor = tarefas.ExecutorTarefas(banco, threads=0)
+    with banco.begin() as conn:
+        linha = conn.execute(executor.sql_pegar, {"agora": tarefas.agora_utc()}).mappings().first()
+    executor._executar(linha)
+
+    tarefa = tarefas.obter_tarefa(banco, tarefa_id)
+    assert tarefa['estado'] == 'concluida', tarefa['erro']
+    assert tarefa['resultado']['linhas'] == 2
+    with open(tarefas.caminho_resultado(tarefa), encoding='utf-8-sig') as f:
+        assert len(f.read().splitlines()) == 3
@@ -0,0 +1,58 @@
+import logging
+import time
+
+import telemetria
+from telemetria import CicloTelemetria, PerfilCiclos
+
+
+def test_ciclo_acumula_tempo_por_etapa():
+    ciclo = CicloTelemetria(7)
+    with ciclo.medir("consulta"):
+        time.sleep(0.01)
+    with ciclo.medir("consulta"):
+        time.sleep(0.01)
+    with ciclo.medir("render"):
+        pass
+    ciclo.linhas = 42
+
+    texto = ciclo.finalizar().como_texto()
+
+    assert 0.02 <= ciclo.tempos["consulta"] <= ciclo.total
+    assert texto.startswith("ciclo=7 total_ms=") and "linhas=42" in texto
+    assert "consulta_ms=" in texto and "render_ms=" in texto
+
+
+def test_etapa_com_erro_tambem_e_medida():
+    ciclo = CicloTelemetria(1)
+    try:
+        with ciclo.medir("consulta"):
+            raise ConnectionError("banco fora")
+    except ConnectionError as erro:
+        ciclo.erro = str(erro)
+
+    assert "consulta" in ciclo.tempos
+    assert "erro='banco fora'" in ciclo.finalizar().como_texto()
+
+
+def test_perfil_salvo_a_cada_n_ciclos(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetria, 'PROFILE_ATIVO', True)
+    monkeypatch.setattr(telemetria, 'PROFILE_CICLOS', 2)
+    monkeypatch.setattr(telemetria, 'LOG_DIR', str(tmp_path))
+    perfil = PerfilCiclos(logging.getLogger("painel.teste"))
+
+    for _ in range(3):
+        with perfil.ciclo():
+            sum(range(1000))
+
+    assert [caminho.suffix for caminho in tmp_path.iterdir()] == [".prof"]
+
+
+def test_perfil_desligado_nao_grava_nada(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetria, 'PROFILE_ATIVO', False)
+    monkeypatch.setattr(telemetria, 'LOG_DIR', str(tmp_path))
+    perfil = PerfilCiclos(logging.getLogger("painel.teste"))
+
+    with perfil.ciclo():
+        pass
+
+    assert perfil.perfil is None and list(tmp_path.iterdir()) == []
@@ -0,0 +1,41 @@
+import argparse
+import time
+
+import pytest
+
+from app.teste_carga import MISTURA_PADRAO, Registro, _mistura, comparar
+
+
+def test_mistura_padrao_ou_informada():
+    assert _mistura("") == MISTURA_PADRAO
+    assert _mistura("listar_andamento=3, buscar") == {"listar_andamento": 3.0, "buscar": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        _mistura("apagar_tudo=1")
+
+
+def test_resumo_ignora_o_aquecimento():
+    inicio = time.perf_counter()
+    registro = Registro(inicio_medicao=inicio)
+    registro.anotar("listar", inicio - 1)  # ainda aquecendo
+    for _ in range(4):
+        registro.anotar("listar", inicio)
+    registro.anotar("editar", inicio, ok=False, conflito=True)
+
+    resumo = registro.resumo(duracao_s=2)
+
+    assert resumo["listar"]["n"] == 4 and resumo["listar"]["por_s"] == 2.0
+    assert (resumo["editar"]["falhas"], resumo["editar"]["conflitos"]) == (1, 1)
+    assert resumo["listar"]["p50_ms"] <= resumo["listar"]["p99_ms"] <= resumo["listar"]["max_ms"]
+
+
+def test_comparacao_aponta_so_o_que_piorou(capsys):
+    base = {"listar": {"p95_ms": 100, "por_s": 10, "falhas": 0},
+            "buscar": {"p95_ms": 50, "por_s": 20, "falhas": 0},
+            "editar": {"p95_ms": 80, "por_s": 5, "falhas": 0}}
+    atual = {"listar": {"p95_ms": 115, "por_s": 10, "falhas": 0},   # dentro da tolerância
+             "buscar": {"p95_ms": 70, "por_s": 15, "falhas": 0},    # p95 +40%
+             "editar": {"p95_ms": 60, "por_s": 5, "falhas": 2},     # mais rápido, mas com falhas
+             "lead_time": {"p95_ms": 900, "por_s": 1, "falhas": 0}}  # sem linha de base
+
+    assert comparar(atual, base, tolerancia=0.2) == ["buscar", "editar"]
+    assert "PIOROU" in capsys.readouterr().out